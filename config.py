@@ -41,6 +41,10 @@ settings = Dynaconf(
             env=['development', 'production'],
             # Não obrigatório em testing pois pode usar console backend
         ),
+        Validator(
+            'cache_backend',
+            is_in=['locmem', 'arquivo', 'redis', 'dummy'],
+        ),
     ],
 )
 
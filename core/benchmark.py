@@ -0,0 +1,261 @@
+"""
+Benchmark das páginas principais: número de queries, latência e memória.
+
+Popula o banco com uma escala de dados (perfis, eventos e participações),
+acessa cada página pelo test client e mede:
+
+- queries: número de queries SQL da requisição
+- p50_ms / p95_ms: latência (mediana e percentil 95) em milissegundos
+- pico_memoria_kb: pico de memória alocada durante a requisição (tracemalloc)
+
+Rodando em duas ou mais escalas, uma página cujo número de queries cresce
+com o volume de dados indica um N+1 (ver paginas_com_queries_crescentes).
+
+Uso pelo comando (usa um banco de testes descartável):
+    python manage.py benchmark_paginas --escalas 1000 10000 --saida benchmark.json
+
+Uso direto (ex: em testes, com o banco de testes já criado):
+    relatorio = executar_benchmark([50, 200], repeticoes=1)
+"""
+import math
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.carga import CIDADES, TAMANHO_LOTE
+from core.models import Endereco
+from eventos.busca import reindexar_todos
+from eventos.models import Eventos, Participacao
+from perfil.busca import reindexar_nomes
+from perfil.models import Perfil, Usuario
+
+ESCALAS_PADRAO = [1000, 10000]
+
+FILTROS_MEUS_EVENTOS = ['all', 'created', 'enrolled', 'cancelled', 'completed']
+
+
+def limpar_dados():
+    """
+    Esvazia o banco entre as escalas. flush (TRUNCATE/DELETE por tabela) em
+    vez de delete() por objeto: os signals de exclusão deixariam a limpeza
+    de 100k perfis mais lenta que o próprio benchmark.
+    """
+    call_command('flush', interactive=False, verbosity=0)
+    cache.clear()
+
+
+def popular(escala, semente=42):
+    """
+    Cria `escala` perfis, escala/10 eventos e ~10 participações por evento,
+    com bulk_create. Retorna (visitante, evento_alvo):
+
+    - visitante: perfil logado nas páginas; organiza e participa de vários
+      eventos, para que todas as abas de meus_eventos tenham conteúdo
+    - evento_alvo: evento com escala/20 participantes, usado em
+      visualizar_evento e participantes_evento
+    """
+    aleatorio = random.Random(semente)
+    agora = timezone.now()
+    senha = make_password('benchmark')
+
+    usuarios = [
+        Usuario(
+            email=f'bench{i}@simbora.test',
+            username=f'bench{i}@simbora.test',
+            first_name=f'Pessoa{i}',
+            last_name='Benchmark',
+            password=senha,
+        )
+        for i in range(escala)
+    ]
+    Usuario.objects.bulk_create(usuarios, batch_size=TAMANHO_LOTE)
+
+    enderecos = Endereco.objects.bulk_create([
+        Endereco(rua='Rua do Benchmark', numero=str(i), bairro='Centro', cidade=cidade, estado=uf, cep='00000-000')
+        for i, (cidade, uf) in enumerate(CIDADES)
+    ])
+
+    perfis = Perfil.objects.bulk_create([
+        # Metade sem nome social: os templates caem no nome do usuário
+        Perfil(usuario=usuario, data_nascimento=date(1990, 1, 1), nome_social=usuario.first_name if i % 2 else None)
+        for i, usuario in enumerate(usuarios)
+    ], batch_size=TAMANHO_LOTE)
+    # bulk_create não passa pelo save(), que preenche o nome da busca da Rede
+    reindexar_nomes(Perfil.objects.all())
+    visitante = perfis[0]
+
+    categorias = [valor for valor, _ in Eventos.CATEGORIA_CHOICES]
+    total_eventos = max(escala // 10, 10)
+    eventos = []
+    for i in range(total_eventos):
+        # Metade no futuro, metade no passado; o visitante organiza 1 a cada 10
+        inicio = agora + timedelta(days=aleatorio.randint(-60, 60), hours=aleatorio.randint(0, 23))
+        eventos.append(Eventos(
+            nome_evento=f'Evento benchmark {i}',
+            descricao='Trilha, corrida e café depois do rolê.',
+            organizador=visitante if i % 10 == 0 else aleatorio.choice(perfis),
+            endereco=aleatorio.choice(enderecos),
+            data_inicio=inicio,
+            data_termino=inicio + timedelta(hours=4),
+            categoria=aleatorio.choice(categorias),
+            maximo_participantes=aleatorio.choice([None, 30, 100]),
+            status='CANCELADO' if i % 97 == 1 else 'ATIVO',
+        ))
+    eventos = Eventos.objects.bulk_create(eventos, batch_size=TAMANHO_LOTE)
+
+    # O evento alvo é futuro, ativo e tem muitos participantes
+    evento_alvo = eventos[0]
+    evento_alvo.data_inicio = agora + timedelta(days=3)
+    evento_alvo.data_termino = evento_alvo.data_inicio + timedelta(hours=4)
+    evento_alvo.status = 'ATIVO'
+    evento_alvo.maximo_participantes = None
+    evento_alvo.save()
+
+    # Um evento em andamento, para a seção de eventos já iniciados da home
+    em_andamento = eventos[1]
+    em_andamento.data_inicio = agora - timedelta(hours=1)
+    em_andamento.data_termino = agora + timedelta(hours=3)
+    em_andamento.status = 'ATIVO'
+    em_andamento.save()
+
+    participacoes = []
+    for i, evento in enumerate(eventos):
+        quantidade = max(escala // 20, 10) if evento is evento_alvo else 10
+        candidatos = aleatorio.sample(perfis[1:], min(quantidade, len(perfis) - 1))
+        # O visitante participa de 1 a cada 4 eventos (e cancelou alguns)
+        if i % 4 == 1:
+            candidatos.append(visitante)
+        for perfil in candidatos:
+            if perfil.pk == evento.organizador_id:
+                continue
+            status = 'CONFIRMADO'
+            if perfil is visitante and i % 12 == 1:
+                status = 'CANCELADO'
+            participacoes.append(Participacao(evento=evento, participante=perfil, status=status))
+    Participacao.objects.bulk_create(participacoes, batch_size=TAMANHO_LOTE)
+
+    # bulk_create não passa por save()/signals: contadores e busca à parte
+    Eventos.objects.all().recontar_participacoes()
+    reindexar_todos(Eventos.objects.all())
+
+    return visitante, evento_alvo
+
+
+def paginas(evento_alvo):
+    """Páginas medidas: (nome, url)"""
+    urls = [
+        ('home', reverse('home')),
+        ('lista_eventos', reverse('eventos:lista_eventos')),
+        ('lista_eventos_busca', reverse('eventos:lista_eventos') + '?busca=trilha'),
+        ('visualizar_evento', reverse('eventos:visualizar_evento', args=[evento_alvo.pk])),
+        ('participantes_evento', reverse('eventos:participantes_evento', args=[evento_alvo.pk])),
+        ('listar_usuarios', reverse('perfil:listar_usuarios')),
+    ]
+    for filtro in FILTROS_MEUS_EVENTOS:
+        urls.append((f'meus_eventos_{filtro}', reverse('eventos:meus_eventos') + f'?filtro={filtro}'))
+    return urls
+
+
+def _percentil(valores, percentual):
+    """Percentil pelo método nearest-rank"""
+    ordenados = sorted(valores)
+    indice = max(math.ceil(percentual / 100 * len(ordenados)) - 1, 0)
+    return ordenados[indice]
+
+
+def medir_pagina(client, url, repeticoes=5):
+    """Mede uma página: queries, latência (p50/p95) e pico de memória"""
+    # Aquecimento: cache de templates, facetas etc. não entram na medição
+    resposta = client.get(url)
+
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    # Lido já: cada requisição seguinte zera connection.queries (request_started)
+    total_queries = len(queries)
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        client.get(url)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+
+    # tracemalloc deixa a requisição mais lenta: medido em uma rodada separada
+    tracemalloc.start()
+    try:
+        client.get(url)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'url': url,
+        'status': resposta.status_code,
+        'queries': total_queries,
+        'p50_ms': round(_percentil(tempos, 50), 2),
+        'p95_ms': round(_percentil(tempos, 95), 2),
+        'pico_memoria_kb': round(pico / 1024, 1),
+    }
+
+
+def medir_escala(escala, repeticoes=5, saida=None):
+    """Popula o banco na escala pedida e mede todas as páginas"""
+    limpar_dados()
+    visitante, evento_alvo = popular(escala)
+
+    client = Client()
+    client.force_login(visitante.usuario)
+
+    resultados = {}
+    for nome, url in paginas(evento_alvo):
+        resultados[nome] = medir_pagina(client, url, repeticoes)
+        if saida:
+            r = resultados[nome]
+            saida(f"  {nome:<28} {r['queries']:>4} queries  p50 {r['p50_ms']:>8.2f} ms  "
+                  f"p95 {r['p95_ms']:>8.2f} ms  {r['pico_memoria_kb']:>9.1f} KB")
+    return resultados
+
+
+def paginas_com_queries_crescentes(escalas_medidas):
+    """
+    Páginas cujo número de queries aumenta da menor para a maior escala.
+    Recebe {escala: {pagina: resultado}} e retorna {pagina: {escala: queries}}.
+    """
+    if len(escalas_medidas) < 2:
+        return {}
+    ordem = sorted(escalas_medidas, key=int)
+    menor, maior = escalas_medidas[ordem[0]], escalas_medidas[ordem[-1]]
+    return {
+        pagina: {escala: escalas_medidas[escala][pagina]['queries'] for escala in ordem}
+        for pagina in menor
+        if pagina in maior and maior[pagina]['queries'] > menor[pagina]['queries']
+    }
+
+
+def executar_benchmark(escalas=None, repeticoes=5, saida=None):
+    """
+    Roda o benchmark em cada escala e monta o relatório (serializável em JSON).
+    Atenção: apaga todos os dados do banco em uso (flush).
+    """
+    escalas_medidas = {}
+    for escala in escalas or ESCALAS_PADRAO:
+        if saida:
+            saida(f'Escala {escala}:')
+        escalas_medidas[str(escala)] = medir_escala(escala, repeticoes, saida)
+
+    return {
+        'gerado_em': timezone.now().isoformat(),
+        'banco': connection.vendor,
+        'repeticoes': repeticoes,
+        'escalas': escalas_medidas,
+        'queries_crescentes': paginas_com_queries_crescentes(escalas_medidas),
+    }
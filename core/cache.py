@@ -0,0 +1,63 @@
+"""
+Chaves de cache com namespace e versão.
+
+O backend vem de settings.toml (cache_backend: locmem, arquivo, redis ou
+dummy) e todas as chaves já recebem o prefixo e a versão globais do
+CACHES (KEY_PREFIX / VERSION): trocar cache_versao invalida tudo de uma
+vez, por exemplo quando o formato dos dados em cache muda num deploy.
+
+Dentro da aplicação, cada funcionalidade usa o próprio namespace
+('facetas', 'home', ...), que tem uma versão guardada no próprio cache.
+invalidar_namespace() incrementa essa versão: todas as chaves antigas do
+namespace deixam de ser lidas (e expiram sozinhas), sem precisar
+conhecer ou apagar uma por uma.
+
+Uso:
+    facetas = obter_ou_calcular(chave('facetas'), calcular_facetas, timeout=300)
+    dados = obter_ou_calcular(chave('home', 'comunidade'), calcular, timeout=60)
+    invalidar_namespace('facetas')
+
+No backend "arquivo" (FileBasedCache) incr() lê e regrava o arquivo sem
+trava entre processos: duas invalidações simultâneas podem resultar num só
+incremento. A versão ainda muda (o que basta para invalidar), mas contagens
+exatas ou exclusividade via add() exigem Redis ou Memcached.
+"""
+from django.core.cache import cache
+
+# A versão do namespace não expira sozinha: se sumir (LRU/reinício), volta a 1
+# e chaves antigas com a mesma versão podem ser lidas até o próprio timeout
+_CHAVE_VERSAO = 'ns:{namespace}:versao'
+
+
+def versao_namespace(namespace):
+    return cache.get_or_set(_CHAVE_VERSAO.format(namespace=namespace), 1, timeout=None)
+
+
+def chave(namespace, *partes, versao=None):
+    """
+    Chave 'namespace:v<versão>:parte1:parte2...' na versão atual do namespace.
+    Para montar muitas chaves de uma vez, leia versao_namespace() uma vez só
+    e passe em `versao`.
+    """
+    if versao is None:
+        versao = versao_namespace(namespace)
+    return ':'.join([namespace, f'v{versao}', *(str(parte) for parte in partes)])
+
+
+def invalidar_namespace(namespace):
+    """Descarta todas as chaves do namespace (passa para a próxima versão)"""
+    chave_versao = _CHAVE_VERSAO.format(namespace=namespace)
+    try:
+        cache.incr(chave_versao)
+    except ValueError:
+        # Versão ainda não existe no cache: nada para invalidar
+        cache.set(chave_versao, 2, timeout=None)
+
+
+def obter_ou_calcular(chave_cache, calcular, timeout):
+    """Valor do cache, ou calcular() guardado por `timeout` segundos"""
+    valor = cache.get(chave_cache)
+    if valor is None:
+        valor = calcular()
+        cache.set(chave_cache, valor, timeout)
+    return valor
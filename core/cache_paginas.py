@@ -0,0 +1,132 @@
+"""
+Cache da resposta inteira para visitantes anônimos (home e listagem).
+
+Só GET/HEAD de usuários não logados, com querystring contendo apenas os
+parâmetros declarados na view (os demais, como cursor ou diagnostico,
+passam direto pela view). A chave usa os parâmetros normalizados: vazios
+descartados, espaços colapsados e ordem fixa.
+
+Cada página declara tags ('eventos', 'perfis'). Cada tag é um namespace
+de core/cache.py: invalidar_paginas('eventos') troca a versão da tag e
+todas as páginas que a usam ficam vencidas, sem apagar nada.
+
+Stale-while-revalidate: a entrada guarda as versões das tags e quando foi
+gerada. Vencida (por tempo ou por tag), apenas a requisição que conseguir a
+trava (cache.add) renderiza de novo; as demais continuam recebendo a versão
+anterior enquanto isso, em vez de todas irem ao banco ao mesmo tempo. Só a
+ausência total da entrada (primeiro acesso ou descarte pelo cache) faz a
+requisição renderizar sem trava.
+
+A trava só é exclusiva se cache.add() for atômico entre processos, como no
+Redis ou no Memcached. No backend "arquivo" (FileBasedCache, o padrão de
+produção) o add() é um has_key() seguido de set(): dois workers podem pegar
+a trava juntos e renderizar a mesma página. O resultado continua correto,
+só a proteção contra o estouro de renderizações fica parcial.
+
+Uso:
+    @cache_anonimo(tags=['eventos'], parametros=['categoria', 'cidade', 'busca'])
+    def lista_eventos(request): ...
+
+O header X-Cache-Pagina informa HIT, STALE ou MISS.
+"""
+import hashlib
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from .cache import chave, invalidar_namespace, versao_namespace
+
+NAMESPACE_PAGINAS = 'paginas'
+
+# Tempo máximo (segundos) de uma regeneração; depois disso outra requisição assume
+TRAVA_TIMEOUT = 30
+
+
+def _namespace_tag(tag):
+    return f'{NAMESPACE_PAGINAS}:{tag}'
+
+
+def invalidar_paginas(*tags):
+    """Marca como vencidas todas as páginas com alguma das tags"""
+    for tag in tags:
+        invalidar_namespace(_namespace_tag(tag))
+
+
+def parametros_normalizados(request, parametros):
+    """
+    Querystring canônica com os `parametros` da página, ou None se a
+    requisição tiver outros parâmetros (não pode usar o cache).
+    """
+    if set(request.GET) - set(parametros):
+        return None
+    valores = []
+    for nome in sorted(parametros):
+        valor = ' '.join(request.GET.get(nome, '').split())
+        if valor:
+            valores.append((nome, valor))
+    return urlencode(valores)
+
+
+def _pode_usar_cache(request):
+    return request.method in ('GET', 'HEAD') and not request.user.is_authenticated
+
+
+def _resposta_do_cache(entrada, estado):
+    resposta = HttpResponse(entrada['conteudo'], status=entrada['status'], content_type=entrada['content_type'])
+    resposta['X-Cache-Pagina'] = estado
+    return resposta
+
+
+def _guardar(chave_pagina, resposta, versoes_tags):
+    # Respostas com cookies (sessão, CSRF) são de um visitante específico
+    if resposta.status_code != 200 or resposta.cookies or resposta.streaming:
+        return
+    cache.set(chave_pagina, {
+        'conteudo': resposta.content,
+        'status': resposta.status_code,
+        'content_type': resposta['Content-Type'],
+        'versoes_tags': versoes_tags,
+        'gerada_em': time.time(),
+    }, settings.PAGINAS_CACHE_VALIDADE_MAXIMA)
+
+
+def cache_anonimo(tags, parametros=()):
+    """Decorator de view: cache da resposta para anônimos, vencido pelas `tags`"""
+    def decorator(view):
+        @wraps(view)
+        def view_com_cache(request, *args, **kwargs):
+            querystring = parametros_normalizados(request, parametros)
+            if querystring is None or not _pode_usar_cache(request):
+                return view(request, *args, **kwargs)
+
+            parte_url = hashlib.md5(f'{request.path}?{querystring}'.encode()).hexdigest()
+            chave_pagina = chave(NAMESPACE_PAGINAS, view.__module__, view.__name__, parte_url)
+            versoes_tags = {tag: versao_namespace(_namespace_tag(tag)) for tag in tags}
+
+            entrada = cache.get(chave_pagina)
+            if entrada is not None:
+                vencida = (
+                    entrada['versoes_tags'] != versoes_tags
+                    or time.time() - entrada['gerada_em'] > settings.PAGINAS_CACHE_TIMEOUT
+                )
+                if not vencida:
+                    return _resposta_do_cache(entrada, 'HIT')
+                # Outra requisição já está regenerando: entrega a versão anterior
+                if not cache.add(f'{chave_pagina}:trava', 1, TRAVA_TIMEOUT):
+                    return _resposta_do_cache(entrada, 'STALE')
+
+            try:
+                resposta = view(request, *args, **kwargs)
+                if request.method == 'GET':
+                    _guardar(chave_pagina, resposta, versoes_tags)
+            finally:
+                if entrada is not None:
+                    cache.delete(f'{chave_pagina}:trava')
+            resposta['X-Cache-Pagina'] = 'MISS'
+            return resposta
+        return view_com_cache
+    return decorator
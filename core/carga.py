@@ -0,0 +1,244 @@
+"""
+Gerador de dados sintéticos para testes de carga.
+
+Perfis, eventos e participações são gerados por iteradores e gravados com
+bulk_create em lotes: nenhum momento tem a carga inteira em memória, só o
+lote atual e os ids já gravados. A senha é hasheada uma única vez e
+reaproveitada por todos os usuários (o hasher custa ~centenas de ms por
+chamada, o que inviabilizaria 100k usuários).
+
+Com a mesma semente a carga gerada é sempre a mesma.
+
+Uso:
+    from core.carga import gerar_carga
+    totais = gerar_carga(perfis=100_000, eventos=20_000, participacoes=1_000_000)
+"""
+import random
+import uuid
+from collections import namedtuple
+from datetime import date, timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Endereco
+from eventos.busca import reindexar_todos
+from eventos.facetas import invalidar_facetas
+from eventos.models import Eventos, Participacao
+from perfil.busca import nome_busca
+from perfil.models import Perfil, Usuario
+
+TAMANHO_LOTE = 2000
+
+SENHA_PADRAO = 'simbora123'
+
+CIDADES = [
+    ('São Paulo', 'SP'), ('Rio de Janeiro', 'RJ'), ('Belo Horizonte', 'MG'),
+    ('Recife', 'PE'), ('Salvador', 'BA'), ('Porto Alegre', 'RS'),
+    ('Curitiba', 'PR'), ('Fortaleza', 'CE'), ('Manaus', 'AM'), ('Brasília', 'DF'),
+]
+
+BAIRROS = ['Centro', 'Vila Nova', 'Jardim América', 'Bela Vista', 'Boa Vista', 'Santa Cecília']
+
+NOMES = [
+    'Ana', 'Bruno', 'Carla', 'Diego', 'Elisa', 'Felipe', 'Gabriela', 'Heitor',
+    'Isabela', 'João', 'Karina', 'Lucas', 'Marina', 'Nicolas', 'Olívia', 'Pedro',
+    'Rafaela', 'Samuel', 'Tainá', 'Vitor',
+]
+
+SOBRENOMES = [
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Costa', 'Pereira', 'Almeida',
+    'Ferreira', 'Rodrigues', 'Lima', 'Gomes', 'Ribeiro',
+]
+
+ATIVIDADES = {
+    'ESPORTE': ['Trilha', 'Corrida', 'Pedalada', 'Futevôlei', 'Yoga'],
+    'LAZER': ['Piquenique', 'Caminhada', 'Jogos de tabuleiro', 'Karaokê'],
+    'CULTURA': ['Sarau', 'Cinema ao ar livre', 'Clube do livro', 'Visita ao museu'],
+    'TECNOLOGIA': ['Meetup de Python', 'Hackathon', 'Oficina de robótica'],
+    'EDUCACAO': ['Roda de conversa', 'Aula de idiomas', 'Oficina de escrita'],
+}
+
+GENEROS = [valor for valor, _ in Perfil._meta.get_field('genero').choices]
+
+# Linha leve de um evento já gravado, usada para gerar as participações
+EventoGerado = namedtuple('EventoGerado', ['id', 'organizador_id', 'status', 'maximo_participantes'])
+
+
+def em_lotes(iteravel, tamanho=TAMANHO_LOTE):
+    """Agrupa um iterador em listas de até `tamanho` itens"""
+    iterador = iter(iteravel)
+    while lote := list(islice(iterador, tamanho)):
+        yield lote
+
+
+def gerar_enderecos(aleatorio, total):
+    for i in range(total):
+        cidade, estado = CIDADES[i % len(CIDADES)]
+        yield Endereco(
+            nome_do_local=f'Ponto de encontro {i}',
+            rua=f'Rua {aleatorio.choice(SOBRENOMES)}',
+            numero=str(aleatorio.randint(1, 3000)),
+            bairro=aleatorio.choice(BAIRROS),
+            cidade=cidade,
+            estado=estado,
+            cep=f'{aleatorio.randint(10000, 99999)}-{aleatorio.randint(0, 999):03d}',
+        )
+
+
+def gerar_usuarios(aleatorio, total, senha, prefixo):
+    for i in range(total):
+        email = f'{prefixo}{i}@simbora.test'
+        yield Usuario(
+            # uuid4 gerado pela semente, para a carga ser reproduzível
+            id=uuid.UUID(int=aleatorio.getrandbits(128), version=4),
+            email=email,
+            username=email,
+            first_name=aleatorio.choice(NOMES),
+            last_name=aleatorio.choice(SOBRENOMES),
+            password=senha,
+        )
+
+
+def gerar_perfis(aleatorio, usuarios, endereco_ids):
+    for usuario in usuarios:
+        # Parte sem nome social: os templates caem no nome do usuário
+        nome_social = usuario.first_name if aleatorio.random() < 0.3 else None
+        yield Perfil(
+            usuario=usuario,
+            nome_social=nome_social,
+            # bulk_create não passa pelo save(), que preenche o nome da busca
+            nome_busca=nome_busca(nome_social, usuario.first_name, usuario.last_name, usuario.email),
+            data_nascimento=date(aleatorio.randint(1960, 2005), aleatorio.randint(1, 12), aleatorio.randint(1, 28)),
+            genero=aleatorio.choice(GENEROS),
+            is_pcd=aleatorio.random() < 0.05,
+            neurodiversidade=aleatorio.random() < 0.1,
+            endereco_id=aleatorio.choice(endereco_ids),
+        )
+
+
+def gerar_eventos(aleatorio, total, perfil_ids, endereco_ids):
+    agora = timezone.now()
+    for i in range(total):
+        categoria = aleatorio.choice(list(ATIVIDADES))
+        atividade = aleatorio.choice(ATIVIDADES[categoria])
+        # Metade já aconteceu (FINALIZADO), metade no futuro
+        inicio = agora + timedelta(days=aleatorio.randint(-180, 180), hours=aleatorio.randint(6, 21))
+        termino = inicio + timedelta(hours=aleatorio.randint(1, 6))
+        if aleatorio.random() < 0.05:
+            status = 'CANCELADO'
+        elif termino < agora:
+            status = 'FINALIZADO'
+        else:
+            status = 'ATIVO'
+        yield Eventos(
+            nome_evento=f'{atividade} #{i}',
+            descricao=f'{atividade} aberto a todos. Traga água e disposição!',
+            organizador_id=aleatorio.choice(perfil_ids),
+            endereco_id=aleatorio.choice(endereco_ids),
+            data_inicio=inicio,
+            data_termino=termino,
+            status=status,
+            categoria=categoria,
+            minimo_participantes=aleatorio.choice([None, 3, 5]),
+            maximo_participantes=aleatorio.choice([None, 10, 20, 50, 100]),
+            aceita_participantes=status == 'ATIVO',
+        )
+
+
+def _status_participacao(aleatorio, evento, vagas_ocupadas):
+    """Status coerente com o evento: histórico nos encerrados, fila nos lotados"""
+    if evento.status == 'CANCELADO':
+        return 'CANCELADO'
+    if evento.status == 'FINALIZADO':
+        return 'PRESENTE' if aleatorio.random() < 0.8 else 'AUSENTE'
+    if aleatorio.random() < 0.1:
+        return 'CANCELADO'
+    # O organizador ocupa uma das vagas
+    if evento.maximo_participantes is not None and vagas_ocupadas + 1 >= evento.maximo_participantes:
+        return 'LISTA_ESPERA'
+    return 'CONFIRMADO' if aleatorio.random() < 0.7 else 'INSCRITO'
+
+
+def gerar_participacoes(aleatorio, total, eventos, perfil_ids):
+    """
+    Distribui `total` participações entre os eventos (cada evento recebe em
+    torno da média, com variação), sem repetir o par evento/participante.
+    """
+    restantes = total
+    for posicao, evento in enumerate(eventos):
+        eventos_restantes = len(eventos) - posicao
+        media = restantes / eventos_restantes
+        quantidade = restantes if eventos_restantes == 1 else round(media * aleatorio.uniform(0.2, 1.8))
+        quantidade = max(min(quantidade, restantes, len(perfil_ids) - 1), 0)
+        restantes -= quantidade
+
+        # Um a mais no sorteio, caso o organizador seja sorteado
+        # (sample() sobre range não materializa a lista de perfis)
+        sorteados = [perfil_ids[i] for i in aleatorio.sample(range(len(perfil_ids)), quantidade + 1)]
+        participantes = [perfil_id for perfil_id in sorteados if perfil_id != evento.organizador_id][:quantidade]
+
+        vagas_ocupadas = 0
+        for participante_id in participantes:
+            status = _status_participacao(aleatorio, evento, vagas_ocupadas)
+            if status in Participacao.STATUS_OCUPAM_VAGA:
+                vagas_ocupadas += 1
+            yield Participacao(evento_id=evento.id, participante_id=participante_id, status=status)
+
+
+def gerar_carga(perfis, eventos, participacoes, semente=42, prefixo='carga', tamanho_lote=TAMANHO_LOTE, saida=None):
+    """
+    Grava a carga sintética e retorna os totais criados por modelo.
+    `prefixo` compõe os emails ({prefixo}{n}@simbora.test) e permite gerar
+    mais de uma carga no mesmo banco.
+    """
+    def informar(mensagem):
+        if saida:
+            saida(mensagem)
+
+    aleatorio = random.Random(semente)
+    senha = make_password(SENHA_PADRAO)
+    totais = {}
+
+    with transaction.atomic():
+        enderecos = Endereco.objects.bulk_create(gerar_enderecos(aleatorio, max(eventos // 20, len(CIDADES))))
+        endereco_ids = [endereco.pk for endereco in enderecos]
+        totais['enderecos'] = len(endereco_ids)
+
+        perfil_ids = []
+        for lote in em_lotes(gerar_usuarios(aleatorio, perfis, senha, prefixo), tamanho_lote):
+            Usuario.objects.bulk_create(lote)
+            criados = Perfil.objects.bulk_create(gerar_perfis(aleatorio, lote, endereco_ids))
+            perfil_ids.extend(perfil.pk for perfil in criados)
+            informar(f'  perfis: {len(perfil_ids)}/{perfis}')
+        totais['perfis'] = len(perfil_ids)
+
+        eventos_gerados = []
+        for lote in em_lotes(gerar_eventos(aleatorio, eventos, perfil_ids, endereco_ids), tamanho_lote):
+            eventos_gerados.extend(
+                EventoGerado(evento.pk, evento.organizador_id, evento.status, evento.maximo_participantes)
+                for evento in Eventos.objects.bulk_create(lote)
+            )
+            informar(f'  eventos: {len(eventos_gerados)}/{eventos}')
+        totais['eventos'] = len(eventos_gerados)
+
+        total_participacoes = 0
+        if eventos_gerados and len(perfil_ids) > 1:
+            for lote in em_lotes(gerar_participacoes(aleatorio, participacoes, eventos_gerados, perfil_ids), tamanho_lote):
+                Participacao.objects.bulk_create(lote)
+                total_participacoes += len(lote)
+                informar(f'  participações: {total_participacoes}/{participacoes}')
+        totais['participacoes'] = total_participacoes
+
+        # bulk_create não passa por save()/signals: contadores e busca à parte
+        if eventos_gerados:
+            informar('  recontando participações e indexando a busca...')
+            # Os ids do bulk_create são sequenciais: um intervalo evita IN (...) gigante
+            gerados = Eventos.objects.filter(pk__range=(eventos_gerados[0].id, eventos_gerados[-1].id))
+            gerados.recontar_participacoes()
+            reindexar_todos(gerados)
+        transaction.on_commit(invalidar_facetas)
+
+    return totais
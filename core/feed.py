@@ -0,0 +1,91 @@
+"""
+Dados da home: feed de eventos e widgets da comunidade.
+
+Feed: os N eventos ativos mais próximos em uma única query ordenada e
+limitada (LIMIT N). Uma chave calculada coloca os eventos futuros primeiro
+(do mais próximo ao mais distante) e depois os já iniciados (do mais
+recente ao mais antigo). Os avatares dos participantes vêm em uma única
+query (eventos/participantes.py), e a relação do usuário logado com cada
+evento (organizador, inscrito) em uma única consulta para todos os cards
+(eventos/visitante.py).
+A parte de cada card que não depende do visitante é renderizada uma vez e
+guardada em cache (eventos/cards.py).
+
+Comunidade: últimos perfis e total de perfis da semana, em cache por
+HOME_COMUNIDADE_CACHE_TIMEOUT segundos.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from core.cache import chave, obter_ou_calcular
+from eventos.cards import anotar_versoes_cards
+from eventos.models import Eventos
+from eventos.participantes import participantes_sob_demanda
+from eventos.visitante import status_do_visitante
+from perfil.models import Perfil
+
+NAMESPACE_HOME = 'home'
+
+TAMANHO_FEED = 6
+
+
+def eventos_do_feed(agora, limite=TAMANHO_FEED):
+    """Os `limite` eventos ativos mais próximos: futuros primeiro, depois os já iniciados"""
+    grupo_feed = Case(
+        When(data_inicio__lt=agora, then=Value(1)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    # Só uma das duas chaves é preenchida em cada evento (a outra fica NULL)
+    inicio_futuro = Case(When(data_inicio__gte=agora, then=F('data_inicio')))
+    inicio_passado = Case(When(data_inicio__lt=agora, then=F('data_inicio')))
+
+    return list(
+        Eventos.objects.ativos()
+        .annotate(grupo_feed=grupo_feed, inicio_futuro=inicio_futuro, inicio_passado=inicio_passado)
+        .order_by('grupo_feed', F('inicio_futuro').asc(), F('inicio_passado').desc(), 'id')
+        .para_card()[:limite]
+    )
+
+
+def montar_feed(perfil_usuario, limite=TAMANHO_FEED):
+    """Cards da home no mesmo formato usado em lista_eventos"""
+    eventos = eventos_do_feed(timezone.now(), limite)
+
+    # Organizador/inscrito e avatares para todos os cards: uma consulta cada
+    # (a dos avatares só se algum card não estiver no cache)
+    visitante = status_do_visitante(eventos, perfil_usuario)
+    participantes = participantes_sob_demanda(eventos)
+
+    cards = [
+        {
+            'evento': evento,
+            'total_participantes': evento.total_participantes,
+            'participantes_para_exibicao': participantes[evento.id],
+            'visitante': visitante[evento.id],
+        }
+        for evento in eventos
+    ]
+    return anotar_versoes_cards(cards)
+
+
+def calcular_comunidade():
+    """Últimos 5 perfis criados e quantos perfis entraram na última semana (sem cache)"""
+    uma_semana_atras = timezone.now() - timedelta(days=7)
+    com_usuario = Perfil.objects.filter(usuario__isnull=False)
+    return {
+        'ultimos_perfis': list(
+            com_usuario.para_listagem().order_by('-usuario__date_joined')[:5]
+        ),
+        'perfis_semana': com_usuario.filter(usuario__date_joined__gte=uma_semana_atras).count(),
+    }
+
+
+def obter_comunidade():
+    """Widgets da comunidade a partir do cache, recalculando se necessário"""
+    return obter_ou_calcular(
+        chave(NAMESPACE_HOME, 'comunidade'), calcular_comunidade, settings.HOME_COMUNIDADE_CACHE_TIMEOUT
+    )
@@ -0,0 +1,192 @@
+"""
+Variantes redimensionadas das fotos enviadas (perfil e evento).
+
+Ao salvar uma foto nova, as variantes são geradas fora da requisição (num
+pool de threads, depois do commit) com o Pillow:
+
+- thumb (160px), card (480px) e full (1280px) no maior lado, sem ampliar;
+- em WebP e em JPEG, com a orientação do EXIF aplicada e os metadados
+  (EXIF, GPS) descartados;
+- gravadas no mesmo storage, ao lado do original, com nomes determinísticos:
+  eventos/fotos/praia.jpg -> eventos/fotos/praia__card.webp
+
+Cada campo monitorado tem um booleano <campo>_variantes no modelo, marcado
+quando as variantes ficam prontas (e desmarcado a cada foto nova). Os
+templates só apontam para as variantes com ele marcado; até lá, usam o
+original (filtros `variante` e `srcset` em core/templatetags/imagens.py).
+
+Ao terminar, o signal variantes_geradas avisa quem tem a foto em cache.
+Fotos anteriores a este pipeline (ou cujo processamento se perdeu num
+restart do servidor) são processadas por `make gerar-variantes`.
+
+Uso:
+    monitorar_imagem(Eventos, 'foto')      # no ready() do app
+    url_variante(evento.foto, 'card')      # URL da variante (sem I/O)
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import Signal
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# (nome, maior lado em pixels), da menor para a maior
+VARIANTES = (
+    ('thumb', 160),
+    ('card', 480),
+    ('full', 1280),
+)
+
+# (extensão, formato do Pillow)
+FORMATOS = (
+    ('webp', 'WEBP'),
+    ('jpg', 'JPEG'),
+)
+
+QUALIDADE = 80
+
+# Enviado com sender=modelo, nome (arquivo original) e pks (linhas atualizadas)
+variantes_geradas = Signal()
+
+# [(modelo, campo)] registrados por monitorar_imagem
+IMAGENS_MONITORADAS = []
+
+_executor = None
+
+
+def campo_variantes(campo):
+    """Nome do booleano que marca as variantes do campo como prontas"""
+    return f'{campo}_variantes'
+
+
+def nome_variante(nome, variante, extensao='webp'):
+    base, _ = os.path.splitext(nome)
+    return f'{base}__{variante}.{extensao}'
+
+
+def variantes_prontas(arquivo):
+    """Se a foto (FieldFile) já tem as variantes geradas"""
+    if not arquivo:
+        return False
+    return bool(getattr(arquivo.instance, campo_variantes(arquivo.field.name), False))
+
+
+def url_variante(arquivo, variante, extensao='webp'):
+    """URL da variante se estiver pronta, senão a do original (sem I/O)"""
+    if not variantes_prontas(arquivo):
+        return arquivo.url
+    return arquivo.storage.url(nome_variante(arquivo.name, variante, extensao))
+
+
+def _em_rgb(imagem):
+    # JPEG não tem transparência: a área transparente vira fundo branco
+    if imagem.mode in ('RGBA', 'LA') or (imagem.mode == 'P' and 'transparency' in imagem.info):
+        imagem = imagem.convert('RGBA')
+        fundo = Image.new('RGB', imagem.size, (255, 255, 255))
+        fundo.paste(imagem, mask=imagem.getchannel('A'))
+        return fundo
+    return imagem.convert('RGB')
+
+
+def gerar_variantes(storage, nome):
+    """Gera e grava as variantes do arquivo `nome`; retorna os nomes gravados"""
+    with storage.open(nome) as original:
+        imagem = Image.open(original)
+        # Aplica a rotação do EXIF antes de descartá-lo (a câmera não gira os pixels)
+        imagem = _em_rgb(ImageOps.exif_transpose(imagem))
+
+    gravados = []
+    for variante, lado in VARIANTES:
+        copia = imagem.copy()
+        copia.thumbnail((lado, lado), Image.LANCZOS)
+        for extensao, formato in FORMATOS:
+            conteudo = BytesIO()
+            # Sem exif=...: o Pillow não copia os metadados do original
+            copia.save(conteudo, formato, quality=QUALIDADE)
+            destino = nome_variante(nome, variante, extensao)
+            # Nome determinístico: sobrescreve a versão anterior
+            storage.delete(destino)
+            gravados.append(storage.save(destino, ContentFile(conteudo.getvalue())))
+    return gravados
+
+
+def processar_imagem(modelo, campo, nome):
+    """
+    Gera as variantes de `nome` e marca como prontas as linhas que ainda têm
+    essa foto. Retorna quantas linhas foram marcadas (0 se falhou).
+    """
+    storage = modelo._meta.get_field(campo).storage
+    try:
+        gerar_variantes(storage, nome)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        logger.warning('Variantes não geradas para %s (%s.%s)', nome, modelo._meta.label, campo, exc_info=True)
+        return 0
+
+    # Só as linhas que ainda têm esta foto: outra pode ter sido enviada nesse meio tempo
+    linhas = modelo._base_manager.filter(**{campo: nome, campo_variantes(campo): False})
+    pks = list(linhas.values_list('pk', flat=True))
+    if pks:
+        modelo._base_manager.filter(pk__in=pks).update(**{campo_variantes(campo): True})
+        variantes_geradas.send(sender=modelo, nome=nome, pks=pks)
+    return len(pks)
+
+
+def _processar_em_segundo_plano(modelo, campo, nome):
+    try:
+        processar_imagem(modelo, campo, nome)
+    except Exception:
+        logger.exception('Erro ao processar %s (%s.%s)', nome, modelo._meta.label, campo)
+    finally:
+        # Conexão aberta por esta thread do pool
+        connection.close()
+
+
+def _obter_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.IMAGENS_WORKERS, thread_name_prefix='imagens')
+    return _executor
+
+
+def agendar_processamento(modelo, campo, nome):
+    """Processa a foto depois do commit: no pool de threads ou, se desligado, na hora"""
+    if settings.IMAGENS_EM_SEGUNDO_PLANO:
+        transaction.on_commit(lambda: _obter_executor().submit(_processar_em_segundo_plano, modelo, campo, nome))
+    else:
+        transaction.on_commit(lambda: processar_imagem(modelo, campo, nome))
+
+
+def monitorar_imagem(modelo, campo):
+    """Gera as variantes de `campo` a cada foto nova salva em `modelo`"""
+    if (modelo, campo) in IMAGENS_MONITORADAS:
+        return
+    IMAGENS_MONITORADAS.append((modelo, campo))
+    flag = campo_variantes(campo)
+
+    def marcar_foto_nova(sender, instance, raw=False, **kwargs):
+        # Campo adiado (only/defer) não foi alterado; upload novo ainda não foi gravado
+        if raw or campo not in instance.__dict__:
+            return
+        arquivo = getattr(instance, campo)
+        instance._foto_nova = bool(arquivo) and not arquivo._committed
+        if instance._foto_nova or not arquivo:
+            setattr(instance, flag, False)
+
+    def agendar_foto_nova(sender, instance, raw=False, update_fields=None, **kwargs):
+        if raw or not getattr(instance, '_foto_nova', False):
+            return
+        instance._foto_nova = False
+        # save(update_fields=[campo]) não grava o booleano desmarcado acima
+        if update_fields is not None and flag not in update_fields:
+            sender._base_manager.filter(pk=instance.pk).update(**{flag: False})
+        agendar_processamento(sender, campo, getattr(instance, campo).name)
+
+    pre_save.connect(marcar_foto_nova, sender=modelo, weak=False, dispatch_uid=f'imagens_pre_{modelo._meta.label}_{campo}')
+    post_save.connect(agendar_foto_nova, sender=modelo, weak=False, dispatch_uid=f'imagens_post_{modelo._meta.label}_{campo}')
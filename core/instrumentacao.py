@@ -0,0 +1,198 @@
+"""
+Instrumentação das requisições: queries, tempo de banco, de template e da view.
+
+InstrumentacaoMiddleware mede cada requisição e:
+
+- acumula agregados por view (obter_agregados), expostos em JSON para a
+  equipe em /instrumentacao/ (os números são por processo: cada worker do
+  gunicorn tem os seus)
+- registra uma amostra das requisições (INSTRUMENTACAO_AMOSTRAGEM) como log
+  estruturado (JSON) no logger 'core.instrumentacao'; requisições acima de
+  INSTRUMENTACAO_LIMITE_LENTO_MS são sempre registradas, como WARNING
+
+Medições:
+    queries / db_ms: via connection.execute_wrapper (funciona com DEBUG=False)
+    template_ms: render dos templates pelo backend TemplatesInstrumentados,
+                 sem as queries disparadas durante o render
+    view_ms: tempo restante (código Python da view e dos middlewares)
+    total_ms: tempo total da requisição
+
+O middleware fica logo depois do SecurityMiddleware e do WhiteNoise, para
+que as queries de sessão, usuário e perfil entrem na conta.
+
+Diagnóstico por requisição: com ?diagnostico=1 (só equipe, ou DEBUG=True)
+o middleware marca request.diagnostico = True, sempre registra a requisição
+e devolve o header Server-Timing. A marcação é feita em process_view, quando
+request.user já foi carregado pelos middlewares seguintes. Verificações extras das views (queries só
+para depuração) devem rodar apenas quando request.diagnostico for True.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connection
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger(__name__)
+
+# Medições da requisição em andamento (None fora de uma requisição)
+_medicao_atual = ContextVar('medicao_atual', default=None)
+
+_agregados = {}
+_trava_agregados = threading.Lock()
+
+
+class Medicao:
+    __slots__ = ('queries', 'db', 'template')
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Wrapper de execução de SQL (connection.execute_wrapper)"""
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - inicio
+            self.queries += 1
+
+
+class TemplateInstrumentado(Template):
+    def render(self, context=None, request=None):
+        medicao = _medicao_atual.get()
+        if medicao is None:
+            return super().render(context, request)
+        inicio = time.perf_counter()
+        db_antes = medicao.db
+        try:
+            return super().render(context, request)
+        finally:
+            # Queries disparadas pelo template (querysets lazy) contam como banco
+            medicao.template += time.perf_counter() - inicio - (medicao.db - db_antes)
+
+
+class TemplatesInstrumentados(DjangoTemplates):
+    """
+    Backend de templates do Django que mede o tempo de render. Só os
+    templates carregados pelo backend (render, render_to_string) são
+    medidos; os {% include %} já entram no tempo do template que os inclui.
+    """
+
+    def from_string(self, template_code):
+        return TemplateInstrumentado(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TemplateInstrumentado(template.template, self)
+
+
+def _pode_diagnosticar(request):
+    if request.GET.get('diagnostico') != '1':
+        return False
+    if settings.DEBUG:
+        return True
+    usuario = getattr(request, 'user', None)
+    return bool(usuario and usuario.is_staff)
+
+
+def _acumular(view, registro):
+    with _trava_agregados:
+        agregado = _agregados.setdefault(view, {
+            'requisicoes': 0, 'queries': 0, 'db_ms': 0.0, 'template_ms': 0.0,
+            'view_ms': 0.0, 'total_ms': 0.0, 'max_total_ms': 0.0, 'max_queries': 0,
+        })
+        agregado['requisicoes'] += 1
+        for campo in ['queries', 'db_ms', 'template_ms', 'view_ms', 'total_ms']:
+            agregado[campo] += registro[campo]
+        agregado['max_total_ms'] = max(agregado['max_total_ms'], registro['total_ms'])
+        agregado['max_queries'] = max(agregado['max_queries'], registro['queries'])
+
+
+def obter_agregados():
+    """Médias e máximos por view desde o início do processo"""
+    with _trava_agregados:
+        copia = {view: dict(agregado) for view, agregado in _agregados.items()}
+
+    resultado = {}
+    for view, agregado in sorted(copia.items()):
+        total = agregado['requisicoes']
+        resultado[view] = {
+            'requisicoes': total,
+            'media_queries': round(agregado['queries'] / total, 1),
+            'media_db_ms': round(agregado['db_ms'] / total, 2),
+            'media_template_ms': round(agregado['template_ms'] / total, 2),
+            'media_view_ms': round(agregado['view_ms'] / total, 2),
+            'media_total_ms': round(agregado['total_ms'] / total, 2),
+            'max_total_ms': round(agregado['max_total_ms'], 2),
+            'max_queries': agregado['max_queries'],
+        }
+    return resultado
+
+
+def limpar_agregados():
+    with _trava_agregados:
+        _agregados.clear()
+
+
+class InstrumentacaoMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # Decidido em process_view; fica False se um middleware responder antes
+        request.diagnostico = False
+
+        medicao = Medicao()
+        token = _medicao_atual.set(medicao)
+        inicio = time.perf_counter()
+        try:
+            with connection.execute_wrapper(medicao):
+                response = self.get_response(request)
+        finally:
+            _medicao_atual.reset(token)
+        total = (time.perf_counter() - inicio) * 1000
+
+        db_ms = medicao.db * 1000
+        template_ms = medicao.template * 1000
+        match = getattr(request, 'resolver_match', None)
+        registro = {
+            'view': match.view_name if match else None,
+            'metodo': request.method,
+            'caminho': request.path,
+            'status': response.status_code,
+            'queries': medicao.queries,
+            'db_ms': round(db_ms, 2),
+            'template_ms': round(template_ms, 2),
+            'view_ms': round(max(total - db_ms - template_ms, 0.0), 2),
+            'total_ms': round(total, 2),
+        }
+        if registro['view']:
+            _acumular(registro['view'], registro)
+        self._registrar(request, registro)
+
+        if request.diagnostico:
+            response['Server-Timing'] = (
+                f"db;dur={registro['db_ms']};desc=\"{registro['queries']} queries\", "
+                f"template;dur={registro['template_ms']}, "
+                f"view;dur={registro['view_ms']}, "
+                f"total;dur={registro['total_ms']}"
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Aqui request.user já existe (AuthenticationMiddleware vem depois)
+        request.diagnostico = _pode_diagnosticar(request)
+
+    def _registrar(self, request, registro):
+        limite_lento = settings.INSTRUMENTACAO_LIMITE_LENTO_MS
+        if limite_lento and registro['total_ms'] >= limite_lento:
+            logger.warning('requisicao_lenta %s', json.dumps(registro, ensure_ascii=False))
+        elif request.diagnostico or random.random() < settings.INSTRUMENTACAO_AMOSTRAGEM:
+            logger.info('requisicao %s', json.dumps(registro, ensure_ascii=False))
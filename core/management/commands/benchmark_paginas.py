@@ -0,0 +1,70 @@
+"""
+Comando Django para medir queries, latência e memória das páginas principais.
+
+Cria um banco de testes descartável (o banco de desenvolvimento não é
+tocado), popula cada escala pedida e gera um relatório JSON. Termina com
+erro se alguma página fizer mais queries na escala maior do que na menor,
+sinal de N+1.
+
+Uso:
+    python manage.py benchmark_paginas
+    python manage.py benchmark_paginas --escalas 1000 10000 100000 --repeticoes 10
+    python manage.py benchmark_paginas --saida benchmark.json
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core.benchmark import ESCALAS_PADRAO, executar_benchmark
+
+
+class Command(BaseCommand):
+    help = 'Mede queries, latência (p50/p95) e memória das páginas principais em várias escalas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--escalas',
+            type=int,
+            nargs='+',
+            default=ESCALAS_PADRAO,
+            help='Quantidade de perfis em cada rodada (eventos = perfis/10). Padrão: 1000 10000',
+        )
+        parser.add_argument(
+            '--repeticoes',
+            type=int,
+            default=5,
+            help='Requisições cronometradas por página (padrão: 5)',
+        )
+        parser.add_argument(
+            '--saida',
+            default='benchmark.json',
+            help='Arquivo do relatório JSON (padrão: benchmark.json)',
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        nome_original = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            relatorio = executar_benchmark(
+                options['escalas'],
+                repeticoes=options['repeticoes'],
+                saida=self.stdout.write,
+            )
+        finally:
+            connection.creation.destroy_test_db(nome_original, verbosity=0)
+            teardown_test_environment()
+
+        with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+        self.stdout.write(f"Relatório salvo em {options['saida']}")
+
+        crescentes = relatorio['queries_crescentes']
+        if crescentes:
+            for pagina, queries in crescentes.items():
+                detalhe = ', '.join(f'{escala}: {total}' for escala, total in queries.items())
+                self.stderr.write(self.style.ERROR(f'✗ {pagina}: queries crescem com os dados ({detalhe})'))
+            raise CommandError('Número de queries cresce com o volume de dados (possível N+1)')
+
+        self.stdout.write(self.style.SUCCESS('✓ Número de queries constante em todas as páginas'))
@@ -0,0 +1,71 @@
+"""
+Comando Django para gerar uma carga sintética de perfis, eventos e participações.
+
+Grava tudo com bulk_create em lotes (ver core/carga.py). Com a mesma
+semente a carga é sempre a mesma. Todos os usuários gerados usam a senha
+'simbora123'.
+
+Uso:
+    python manage.py gerar_carga
+    python manage.py gerar_carga --perfis 100000 --eventos 20000 --participacoes 1000000
+    python manage.py gerar_carga --semente 7 --prefixo carga2
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.carga import SENHA_PADRAO, TAMANHO_LOTE, gerar_carga
+from perfil.models import Usuario
+
+
+class Command(BaseCommand):
+    help = 'Gera perfis, eventos e participações sintéticos em lote (testes de carga)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--perfis', type=int, default=1000, help='Perfis (e usuários) a criar (padrão: 1000)')
+        parser.add_argument('--eventos', type=int, default=200, help='Eventos a criar (padrão: 200)')
+        parser.add_argument(
+            '--participacoes',
+            type=int,
+            default=5000,
+            help='Participações a distribuir entre os eventos (padrão: 5000)',
+        )
+        parser.add_argument('--semente', type=int, default=42, help='Semente do gerador aleatório (padrão: 42)')
+        parser.add_argument(
+            '--prefixo',
+            default='carga',
+            help='Prefixo dos emails gerados, {prefixo}{n}@simbora.test (padrão: carga)',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANHO_LOTE,
+            help=f'Linhas por INSERT (padrão: {TAMANHO_LOTE})',
+        )
+
+    def handle(self, *args, **options):
+        if min(options['perfis'], options['eventos'], options['participacoes']) < 0:
+            raise CommandError('As quantidades não podem ser negativas')
+        if options['eventos'] and options['perfis'] < 1:
+            raise CommandError('Eventos precisam de ao menos um perfil para organizá-los')
+        if Usuario.objects.filter(email=f"{options['prefixo']}0@simbora.test").exists():
+            raise CommandError(
+                f"Já existe uma carga com o prefixo '{options['prefixo']}'. Use outro --prefixo."
+            )
+
+        self.stdout.write(self.style.SUCCESS('Gerando carga sintética...'))
+        inicio = time.perf_counter()
+        totais = gerar_carga(
+            perfis=options['perfis'],
+            eventos=options['eventos'],
+            participacoes=options['participacoes'],
+            semente=options['semente'],
+            prefixo=options['prefixo'],
+            tamanho_lote=options['lote'],
+            saida=self.stdout.write,
+        )
+        duracao = time.perf_counter() - inicio
+
+        resumo = ', '.join(f'{total} {modelo}' for modelo, total in totais.items())
+        self.stdout.write(self.style.SUCCESS(f'✅ Carga gerada em {duracao:.1f}s: {resumo}'))
+        self.stdout.write(f"Login: {options['prefixo']}0@simbora.test / {SENHA_PADRAO}")
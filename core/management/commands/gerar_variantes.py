@@ -0,0 +1,53 @@
+"""
+Comando Django para gerar as variantes redimensionadas das fotos já enviadas.
+
+As variantes de cada foto nova são geradas automaticamente depois do upload
+(ver core/imagens.py). Use este comando para as fotos anteriores ao pipeline,
+para as que se perderam num restart do servidor ou, com --todas, para refazer
+todas depois de mudar os tamanhos ou a qualidade.
+
+Cada arquivo é processado uma vez, mesmo que várias linhas o usem (ex: a
+foto padrão dos perfis).
+
+Uso:
+    python manage.py gerar_variantes
+    python manage.py gerar_variantes --todas --lote 200
+"""
+from django.core.management.base import BaseCommand
+
+from core.imagens import IMAGENS_MONITORADAS, campo_variantes, processar_imagem
+
+
+class Command(BaseCommand):
+    help = 'Gera as variantes (thumb, card, full) das fotos de perfis e eventos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--todas',
+            action='store_true',
+            help='Refaz também as fotos que já têm variantes',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=500,
+            help='Quantidade de nomes de arquivo lidos por vez do banco (padrão: 500)',
+        )
+
+    def handle(self, *args, **options):
+        for modelo, campo in IMAGENS_MONITORADAS:
+            flag = campo_variantes(campo)
+            linhas = modelo._base_manager.exclude(**{campo: ''}).exclude(**{f'{campo}__isnull': True})
+            if options['todas']:
+                modelo._base_manager.filter(pk__in=linhas.values('pk')).update(**{flag: False})
+            else:
+                linhas = linhas.filter(**{flag: False})
+
+            nomes = linhas.order_by(campo).values_list(campo, flat=True).distinct()
+            arquivos = marcadas = 0
+            for nome in nomes.iterator(chunk_size=options['lote']):
+                arquivos += 1
+                marcadas += processar_imagem(modelo, campo, nome)
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ {modelo._meta.label}.{campo}: {arquivos} arquivo(s), {marcadas} linha(s) com variantes'
+            ))
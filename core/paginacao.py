@@ -0,0 +1,150 @@
+"""
+Paginação por cursor (keyset) para listagens grandes.
+
+Em vez de OFFSET (que obriga o banco a percorrer todas as linhas anteriores),
+cada página é buscada a partir dos valores de ordenação do último item da
+página anterior: WHERE (data_inicio, id) < (cursor) ORDER BY ... LIMIT n.
+O custo por requisição fica constante, seja qual for a página.
+
+Uso:
+    pagina = paginar(
+        Eventos.objects.ativos(),
+        ordenacao=('-data_inicio', '-id'),
+        cursor=request.GET.get('cursor'),
+        tamanho=12,
+    )
+    pagina.itens           # lista com até `tamanho` objetos
+    pagina.proximo_cursor  # string opaca para a próxima página (ou None)
+
+A ordenação precisa terminar em um campo único (ex: id) para desempate.
+"""
+import base64
+import datetime
+import json
+from collections import namedtuple
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+Pagina = namedtuple('Pagina', ['itens', 'proximo_cursor'])
+
+
+class CursorInvalido(ValueError):
+    """Cursor malformado ou incompatível com a ordenação pedida"""
+
+
+class _EncoderCursor(DjangoJSONEncoder):
+    """
+    DjangoJSONEncoder com as datas/horas completas: o encoder do Django
+    corta os microssegundos em milissegundos, e o cursor pularia os itens
+    que caem no mesmo milissegundo do último da página.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def codificar_cursor(valores):
+    """Serializa os valores de ordenação em uma string segura para URL"""
+    dados = json.dumps(valores, cls=_EncoderCursor, separators=(',', ':'))
+    return base64.urlsafe_b64encode(dados.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """Inverso de codificar_cursor. Levanta CursorInvalido se não decodificar."""
+    try:
+        preenchimento = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+    except (ValueError, TypeError) as e:
+        raise CursorInvalido(str(e)) from e
+    if not isinstance(valores, list):
+        raise CursorInvalido('Cursor deve conter uma lista de valores')
+    return valores
+
+
+def _campo_do_modelo(modelo, caminho):
+    """Resolve 'a__b__c' até o campo final; None se for uma anotação"""
+    campo = None
+    for parte in caminho.split('__'):
+        if modelo is None:
+            return None
+        try:
+            campo = modelo._meta.get_field(parte)
+        except FieldDoesNotExist:
+            return None
+        modelo = campo.related_model
+    return campo
+
+
+def _converter(modelo, caminho, valor):
+    """Converte o valor vindo do JSON para o tipo Python do campo"""
+    campo = _campo_do_modelo(modelo, caminho)
+    if campo is None or valor is None:
+        return valor
+    if campo.is_relation:
+        campo = campo.target_field
+    try:
+        return campo.to_python(valor)
+    except ValidationError as e:
+        raise CursorInvalido(str(e)) from e
+
+
+def _valor_do_item(item, caminho):
+    """Lê 'a__b' de um objeto (atributos) ou de um dict (values())"""
+    if isinstance(item, dict):
+        return item[caminho]
+    valor = item
+    for parte in caminho.split('__'):
+        valor = getattr(valor, parte)
+    # Ordenação por FK: o cursor guarda a chave, não o objeto
+    if hasattr(valor, '_meta'):
+        return valor.pk
+    return valor
+
+
+def _filtro_apos(ordenacao, valores):
+    """
+    Monta o predicado "depois do cursor" para uma ordenação composta:
+    (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+    respeitando o sentido (asc/desc) de cada campo.
+    """
+    filtro = Q()
+    iguais = {}
+    for campo, valor in zip(ordenacao, valores):
+        nome = campo.lstrip('-')
+        operador = 'lt' if campo.startswith('-') else 'gt'
+        filtro |= Q(**iguais, **{f'{nome}__{operador}': valor})
+        iguais[nome] = valor
+    return filtro
+
+
+def paginar(queryset, ordenacao, cursor=None, tamanho=20):
+    """
+    Retorna uma Pagina com até `tamanho` itens a partir do cursor.
+
+    Busca tamanho + 1 linhas para saber se existe próxima página sem
+    precisar de um COUNT(*).
+    """
+    campos = [campo.lstrip('-') for campo in ordenacao]
+    queryset = queryset.order_by(*ordenacao)
+
+    if cursor:
+        valores = decodificar_cursor(cursor)
+        if len(valores) != len(ordenacao):
+            raise CursorInvalido('Cursor não corresponde à ordenação')
+        valores = [
+            _converter(queryset.model, campo, valor)
+            for campo, valor in zip(campos, valores)
+        ]
+        queryset = queryset.filter(_filtro_apos(ordenacao, valores))
+
+    itens = list(queryset[:tamanho + 1])
+    proximo_cursor = None
+    if len(itens) > tamanho:
+        itens = itens[:tamanho]
+        proximo_cursor = codificar_cursor([_valor_do_item(itens[-1], campo) for campo in campos])
+
+    return Pagina(itens, proximo_cursor)
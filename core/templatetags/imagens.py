@@ -0,0 +1,33 @@
+"""
+Filtros das variantes redimensionadas das fotos (ver core/imagens.py).
+
+Sem I/O: os nomes das variantes são determinísticos e o modelo sabe se elas
+já foram geradas; enquanto não foram, os filtros devolvem o original.
+
+    <img src="{{ evento.foto|variante:'card' }}" srcset="{{ evento.foto|srcset }}" sizes="...">
+    <div style="background-image: url('{{ evento.foto|variante:'full' }}')"></div>
+"""
+from django import template
+
+from core.imagens import VARIANTES, nome_variante, url_variante, variantes_prontas
+
+register = template.Library()
+
+
+@register.filter
+def variante(arquivo, nome='card'):
+    """URL da variante `nome` (thumb, card ou full) em WebP, ou do original"""
+    if not arquivo:
+        return ''
+    return url_variante(arquivo, nome)
+
+
+@register.filter
+def srcset(arquivo):
+    """srcset com todas as variantes em WebP ('' enquanto não foram geradas)"""
+    if not variantes_prontas(arquivo):
+        return ''
+    return ', '.join(
+        f'{arquivo.storage.url(nome_variante(arquivo.name, nome))} {lado}w'
+        for nome, lado in VARIANTES
+    )
@@ -1,3 +1,421 @@
-from django.test import TestCase
+import json
+import re
+import shutil
+import tempfile
+from datetime import date, timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from eventos.busca import buscar
+from eventos.models import Eventos, Participacao
+from perfil.models import Perfil, Usuario
+
+from .benchmark import executar_benchmark, paginas_com_queries_crescentes
+from .cache import chave, invalidar_namespace, obter_ou_calcular
+from .cache_paginas import cache_anonimo, invalidar_paginas
+from .feed import eventos_do_feed
+from .imagens import nome_variante
+from .instrumentacao import limpar_agregados, obter_agregados
+from .paginacao import CursorInvalido, codificar_cursor, decodificar_cursor, paginar
+
+# Escalas pequenas: o bastante para um N+1 aparecer, rápido para a suíte
+ESCALAS_TESTE = [40, 400]
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class BenchmarkPaginasTests(TransactionTestCase):
+    """
+    Roda o benchmark em duas escalas e falha se alguma página fizer mais
+    queries com mais dados. TransactionTestCase porque o benchmark faz flush.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.relatorio = executar_benchmark(ESCALAS_TESTE, repeticoes=1)
+
+    def test_todas_as_paginas_respondem(self):
+        for escala, resultados in self.relatorio['escalas'].items():
+            for pagina, resultado in resultados.items():
+                with self.subTest(escala=escala, pagina=pagina):
+                    self.assertEqual(resultado['status'], 200)
+
+    def test_relatorio_tem_metricas(self):
+        resultado = self.relatorio['escalas'][str(ESCALAS_TESTE[0])]['home']
+        for metrica in ['queries', 'p50_ms', 'p95_ms', 'pico_memoria_kb']:
+            self.assertIn(metrica, resultado)
+        self.assertLessEqual(resultado['p50_ms'], resultado['p95_ms'])
+
+    def test_queries_nao_crescem_com_os_dados(self):
+        self.assertEqual(self.relatorio['queries_crescentes'], {})
+
+    def test_detecta_queries_crescentes(self):
+        escalas = {
+            '10': {'home': {'queries': 5}, 'lista': {'queries': 3}},
+            '100': {'home': {'queries': 5}, 'lista': {'queries': 12}},
+        }
+        self.assertEqual(paginas_com_queries_crescentes(escalas), {'lista': {'10': 3, '100': 12}})
+
+
+class PaginacaoCursorTests(TestCase):
+    ORDENACAO = ('-data_inicio', '-id')
+
+    def setUp(self):
+        inicio = timezone.now().replace(microsecond=0) + timedelta(days=7)
+        # Três eventos na mesma data: o id desempata
+        self.eventos = [
+            Eventos.objects.create(
+                nome_evento=f'Evento {indice}',
+                data_inicio=inicio - timedelta(days=indice // 3),
+                data_termino=inicio + timedelta(days=1),
+            )
+            for indice in range(5)
+        ]
+
+    def paginas(self, tamanho):
+        ids, cursor = [], None
+        while True:
+            pagina = paginar(Eventos.objects.all(), self.ORDENACAO, cursor, tamanho)
+            ids.append([evento.id for evento in pagina.itens])
+            cursor = pagina.proximo_cursor
+            if cursor is None:
+                return ids
+
+    def test_cursor_ida_e_volta(self):
+        valores = ['2030-01-01T10:00:00Z', 42]
+        cursor = codificar_cursor(valores)
+        self.assertNotIn('=', cursor)
+        self.assertEqual(decodificar_cursor(cursor), valores)
+
+    def test_desempate_por_id_em_datas_iguais(self):
+        esperado = [evento.id for evento in sorted(self.eventos, key=lambda e: (e.data_inicio, e.id), reverse=True)]
+        for tamanho in (1, 2, 4):
+            paginas = self.paginas(tamanho)
+            # Sem repetir nem pular eventos entre as páginas
+            self.assertEqual(sum(paginas, []), esperado)
+            self.assertTrue(all(len(pagina) <= tamanho for pagina in paginas))
+
+    def test_cursor_guarda_os_microssegundos(self):
+        # Dois eventos no mesmo milissegundo: nenhum pode ficar de fora
+        Eventos.objects.all().delete()
+        inicio = timezone.now().replace(microsecond=123456)
+        for microssegundos in (123456, 123999):
+            Eventos.objects.create(
+                nome_evento='Evento', data_inicio=inicio.replace(microsecond=microssegundos),
+                data_termino=inicio + timedelta(days=1),
+            )
+        esperado = list(Eventos.objects.order_by(*self.ORDENACAO).values_list('id', flat=True))
+        self.assertEqual(sum(self.paginas(1), []), esperado)
+
+    def test_ultima_pagina_sem_cursor(self):
+        pagina = paginar(Eventos.objects.all(), self.ORDENACAO, None, 5)
+        self.assertEqual(len(pagina.itens), 5)
+        self.assertIsNone(pagina.proximo_cursor)
+
+    def test_cursor_adulterado_ou_invalido(self):
+        for cursor in ('não-é-base64', codificar_cursor({'a': 1}), codificar_cursor([1]), codificar_cursor(['ontem', 1])):
+            with self.subTest(cursor=cursor), self.assertRaises(CursorInvalido):
+                paginar(Eventos.objects.all(), self.ORDENACAO, cursor, 2)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class InstrumentacaoMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        limpar_agregados()
+        self.url = reverse('home')
+
+    def entrar(self, is_staff):
+        usuario = Usuario.objects.create_user(f'equipe{int(is_staff)}@simbora.test', 'senha', first_name='Equipe')
+        usuario.is_staff = is_staff
+        usuario.save(update_fields=['is_staff'])
+        Perfil.objects.create(usuario=usuario, data_nascimento=date(1990, 1, 1))
+        self.client.force_login(usuario)
+
+    def test_server_timing_so_para_a_equipe(self):
+        self.entrar(is_staff=False)
+        self.assertNotIn('Server-Timing', self.client.get(self.url, {'diagnostico': '1'}))
+
+        self.entrar(is_staff=True)
+        self.assertNotIn('Server-Timing', self.client.get(self.url))
+        self.assertIn('total;dur=', self.client.get(self.url, {'diagnostico': '1'})['Server-Timing'])
+
+    def test_conta_todas_as_queries_da_requisicao(self):
+        self.entrar(is_staff=True)
+        with CaptureQueriesContext(connection) as queries:
+            resposta = self.client.get(self.url, {'diagnostico': '1'})
+        # Inclui as queries de sessão, usuário e perfil feitas pelos middlewares
+        contadas = int(re.search(r'"(\d+) queries"', resposta['Server-Timing']).group(1))
+        self.assertEqual(contadas, len(queries))
+        self.assertEqual(obter_agregados()['home']['max_queries'], len(queries))
+
+    @override_settings(INSTRUMENTACAO_LIMITE_LENTO_MS=0.001)
+    def test_requisicao_lenta_vira_warning(self):
+        with self.assertLogs('core.instrumentacao', 'WARNING') as logs:
+            self.client.get(self.url)
+        registro = json.loads(logs.records[0].getMessage().split(' ', 1)[1])
+        self.assertEqual(registro['view'], 'home')
+        self.assertEqual(registro['status'], 200)
+        self.assertIn('requisicao_lenta', logs.output[0])
+
+
+class FeedHomeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.agora = timezone.now()
+
+    def evento(self, inicio_em_horas):
+        inicio = self.agora + timedelta(hours=inicio_em_horas)
+        return Eventos.objects.create(
+            nome_evento='Evento', data_inicio=inicio, data_termino=self.agora + timedelta(days=30),
+        ).id
+
+    def test_futuros_primeiro_depois_os_ja_iniciados(self):
+        iniciados = [self.evento(-2), self.evento(-1)]
+        futuros = [self.evento(5), self.evento(1), self.evento(3)]
+        Eventos.objects.create(
+            nome_evento='Vencido', data_inicio=self.agora - timedelta(days=2), data_termino=self.agora - timedelta(days=1),
+        )
+
+        feed = [evento.id for evento in eventos_do_feed(self.agora, limite=10)]
+        self.assertEqual(feed, [futuros[1], futuros[2], futuros[0], iniciados[1], iniciados[0]])
+        self.assertEqual([evento.id for evento in eventos_do_feed(self.agora, limite=2)], feed[:2])
+
+    def test_home_com_queries_constantes(self):
+        def contar_queries():
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(reverse('home')).status_code, 200)
+            return len(queries)
+
+        for horas in range(1, 3):
+            self.evento(horas)
+        poucos = contar_queries()
+        for horas in range(3, 30):
+            self.evento(horas)
+        self.assertEqual(contar_queries(), poucos)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class GerarCargaTests(TestCase):
+    QUANTIDADES = {'perfis': 30, 'eventos': 8, 'participacoes': 40, 'semente': 7}
+
+    def gerar(self):
+        """Gera uma carga pequena e retorna os eventos criados por ela"""
+        ultimo_id = Eventos.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        call_command('gerar_carga', stdout=StringIO(), **self.QUANTIDADES)
+        return Eventos.objects.filter(pk__gt=ultimo_id).order_by('pk')
+
+    def resumo(self, eventos):
+        """Carga sem ids nem datas (relativas a agora), para comparar duas gerações"""
+        return [
+            (
+                evento.nome_evento, evento.categoria, evento.status, evento.maximo_participantes,
+                evento.organizador.usuario.email,
+                [
+                    (participacao.participante.usuario.email, participacao.status)
+                    for participacao in evento.participacoes.order_by('pk')
+                ],
+            )
+            for evento in eventos.select_related('organizador__usuario')
+        ]
+
+    def test_quantidades_contadores_e_busca(self):
+        eventos = self.gerar()
+
+        self.assertEqual(Usuario.objects.filter(email__endswith='@simbora.test').count(), 30)
+        self.assertEqual(Perfil.objects.count(), 30)
+        self.assertEqual(eventos.count(), 8)
+        self.assertEqual(Participacao.objects.filter(evento__in=eventos).count(), 40)
+
+        # Contadores gravados pela carga == recontagem do zero
+        campos = ['pk', 'total_participantes_ativos', 'total_confirmados', 'total_lista_espera']
+        gravados = list(eventos.values_list(*campos))
+        self.assertGreater(sum(total for _, total, _, _ in gravados), 0)
+        eventos.update(total_participantes_ativos=0, total_confirmados=0, total_lista_espera=0)
+        eventos.recontar_participacoes()
+        self.assertEqual(list(eventos.values_list(*campos)), gravados)
+
+        # Todas as descrições trazem "disposição": todos os eventos indexados
+        self.assertEqual(buscar(Eventos.objects.all(), 'disposicao').count(), 8)
+
+    def test_mesma_semente_gera_a_mesma_carga(self):
+        # Mesma semente = mesmos ids de usuário: a primeira carga é desfeita
+        with transaction.atomic():
+            primeira = self.resumo(self.gerar())
+            transaction.set_rollback(True)
+        self.assertEqual(self.resumo(self.gerar()), primeira)
+        self.assertEqual(len(primeira), 8)
+
+
+class CacheNamespaceTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_chave_tem_namespace_e_versao(self):
+        self.assertEqual(chave('facetas'), 'facetas:v1')
+        self.assertEqual(chave('home', 'comunidade', 3), 'home:v1:comunidade:3')
+
+    def test_invalidar_namespace_descarta_so_o_namespace(self):
+        obter_ou_calcular(chave('facetas'), lambda: 'antigo', 60)
+        obter_ou_calcular(chave('home'), lambda: 'home', 60)
+
+        invalidar_namespace('facetas')
+
+        self.assertEqual(obter_ou_calcular(chave('facetas'), lambda: 'novo', 60), 'novo')
+        self.assertEqual(obter_ou_calcular(chave('home'), lambda: 'outro', 60), 'home')
+
+    def test_invalidar_namespace_sem_versao_no_cache(self):
+        invalidar_namespace('nunca-usado')
+        self.assertEqual(chave('nunca-usado'), 'nunca-usado:v2')
+
+    def test_sessao_usa_cache_com_banco(self):
+        self.assertEqual(settings.SESSION_ENGINE, 'django.contrib.sessions.backends.cached_db')
+
+
+class CacheAnonimoTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.renderizacoes = 0
+
+        @cache_anonimo(tags=['eventos'], parametros=['categoria', 'busca'])
+        def pagina(request):
+            self.renderizacoes += 1
+            return HttpResponse(f'render {self.renderizacoes}')
+
+        self.pagina = pagina
+
+    def get(self, url, usuario=None):
+        request = RequestFactory().get(url)
+        request.user = usuario or AnonymousUser()
+        return self.pagina(request)
+
+    def test_segunda_requisicao_vem_do_cache(self):
+        self.assertEqual(self.get('/eventos/')['X-Cache-Pagina'], 'MISS')
+        resposta = self.get('/eventos/')
+        self.assertEqual(resposta['X-Cache-Pagina'], 'HIT')
+        self.assertEqual(resposta.content, b'render 1')
+
+    def test_querystring_normalizada_compartilha_a_entrada(self):
+        self.get('/eventos/?busca=trilha%20%20noturna&categoria=ESPORTE')
+        resposta = self.get('/eventos/?categoria=ESPORTE&busca=+trilha+noturna&')
+        self.assertEqual(resposta['X-Cache-Pagina'], 'HIT')
+        self.assertEqual(self.get('/eventos/?categoria=LAZER')['X-Cache-Pagina'], 'MISS')
+
+    def test_outros_parametros_e_usuarios_logados_nao_usam_cache(self):
+        self.get('/eventos/')
+        self.assertFalse(self.get('/eventos/?cursor=abc').has_header('X-Cache-Pagina'))
+
+        usuario = type('Usuario', (), {'is_authenticated': True})()
+        self.assertFalse(self.get('/eventos/', usuario).has_header('X-Cache-Pagina'))
+        self.assertEqual(self.renderizacoes, 3)
+
+    def test_tag_invalidada_regenera_uma_vez_e_entrega_a_anterior_aos_demais(self):
+        self.get('/eventos/')
+        invalidar_paginas('eventos')
+
+        # Simula outra requisição regenerando a página: esta recebe a versão anterior
+        with mock.patch('core.cache_paginas.cache.add', return_value=False):
+            resposta = self.get('/eventos/')
+        self.assertEqual(resposta['X-Cache-Pagina'], 'STALE')
+        self.assertEqual(resposta.content, b'render 1')
+
+        resposta = self.get('/eventos/')
+        self.assertEqual(resposta['X-Cache-Pagina'], 'MISS')
+        self.assertEqual(resposta.content, b'render 2')
+        self.assertEqual(self.get('/eventos/')['X-Cache-Pagina'], 'HIT')
+
+
+def foto_jpeg(largura, altura, orientacao=None):
+    """JPEG de teste; com orientacao, grava o EXIF de rotação (e um GPS qualquer)"""
+    exif = Image.Exif()
+    if orientacao:
+        exif[0x0112] = orientacao
+        exif[0x8825] = {1: 'S'}
+    conteudo = BytesIO()
+    Image.new('RGB', (largura, altura), (200, 30, 30)).save(conteudo, 'JPEG', exif=exif)
+    return SimpleUploadedFile('foto.jpg', conteudo.getvalue(), content_type='image/jpeg')
+
+
+class VariantesImagemTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        configuracao = override_settings(MEDIA_ROOT=self.media, IMAGENS_EM_SEGUNDO_PLANO=False)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def criar_perfil(self, foto):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Perfil.objects.create(data_nascimento=date(1990, 1, 1), foto_perfil=foto)
+
+    def abrir(self, perfil, variante, extensao='webp'):
+        return Image.open(perfil.foto_perfil.storage.open(nome_variante(perfil.foto_perfil.name, variante, extensao)))
+
+    def test_variantes_geradas_apos_o_upload(self):
+        # Orientação 6: a foto 2000x1000 da câmera é, na verdade, 1000x2000
+        perfil = self.criar_perfil(foto_jpeg(2000, 1000, orientacao=6))
+        perfil.refresh_from_db()
+        self.assertTrue(perfil.foto_perfil_variantes)
+
+        for variante, lado in [('thumb', 160), ('card', 480), ('full', 1280)]:
+            for extensao in ('webp', 'jpg'):
+                imagem = self.abrir(perfil, variante, extensao)
+                self.assertEqual(imagem.size, (lado // 2, lado))
+                self.assertFalse(imagem.getexif())
+
+    def test_nao_amplia_fotos_pequenas(self):
+        perfil = self.criar_perfil(foto_jpeg(300, 200))
+        self.assertEqual(self.abrir(perfil, 'full').size, (300, 200))
+
+    def test_filtros_usam_o_original_ate_as_variantes_ficarem_prontas(self):
+        template = Template("{% load imagens %}{{ perfil.foto_perfil|variante:'card' }}|{{ perfil.foto_perfil|srcset }}")
+        perfil = Perfil.objects.create(data_nascimento=date(1990, 1, 1), foto_perfil=foto_jpeg(600, 600))
+
+        original, variantes = template.render(Context({'perfil': perfil})).split('|')
+        self.assertEqual((original, variantes), (perfil.foto_perfil.url, ''))
+
+        perfil.foto_perfil_variantes = True
+        card, variantes = template.render(Context({'perfil': perfil})).split('|')
+        self.assertTrue(card.endswith('__card.webp'))
+        self.assertIn('__thumb.webp 160w', variantes)
+        self.assertIn('__full.webp 1280w', variantes)
+
+    def test_foto_nova_desmarca_as_variantes(self):
+        perfil = self.criar_perfil(foto_jpeg(600, 600))
+        perfil.refresh_from_db()
+        perfil.foto_perfil = foto_jpeg(800, 800)
+        with mock.patch('core.imagens.processar_imagem') as processar:
+            with self.captureOnCommitCallbacks(execute=True):
+                perfil.save(update_fields=['foto_perfil'])
+        perfil.refresh_from_db()
+        self.assertFalse(perfil.foto_perfil_variantes)
+        processar.assert_called_once_with(Perfil, 'foto_perfil', perfil.foto_perfil.name)
+
+    def test_comando_gera_as_fotos_pendentes(self):
+        perfil = self.criar_perfil(foto_jpeg(600, 600))
+        # Foto anterior ao pipeline: sem variantes
+        Perfil.objects.filter(pk=perfil.pk).update(foto_perfil_variantes=False)
+        foto_invalida = Perfil.objects.create(
+            data_nascimento=date(1990, 1, 1), foto_perfil=SimpleUploadedFile('ruim.jpg', b'nao e imagem')
+        )
+
+        with self.assertLogs('core.imagens', 'WARNING'):
+            call_command('gerar_variantes', stdout=StringIO())
+
+        self.assertTrue(Perfil.objects.get(pk=perfil.pk).foto_perfil_variantes)
+        self.assertFalse(Perfil.objects.get(pk=foto_invalida.pk).foto_perfil_variantes)
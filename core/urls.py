@@ -8,4 +8,5 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('erroteste404/', views.teste, name='404'),
     path('quem-somos/', views.quem_somos_view, name='quem_somos'),
+    path('instrumentacao/', views.instrumentacao, name='instrumentacao'),
 ]
\ No newline at end of file
@@ -64,8 +64,8 @@ class EventosAdmin(admin.ModelAdmin):
         
         if eh_beta_teste:
             # Membros do Beta Teste só veem eventos onde são organizadores
-            if hasattr(request.user, 'perfil') and request.user.perfil:
-                return qs.filter(organizador=request.user.perfil)
+            if request.perfil:
+                return qs.filter(organizador=request.perfil)
             else:
                 # Se não tem perfil, não vê nenhum evento
                 return qs.none()
@@ -89,8 +89,8 @@ class EventosAdmin(admin.ModelAdmin):
         
         if eh_beta_teste:
             # Membros do Beta Teste só podem editar se forem organizadores
-            if hasattr(request.user, 'perfil') and request.user.perfil:
-                return obj.organizador == request.user.perfil
+            if request.perfil:
+                return obj.organizador == request.perfil
             return False
         
         # Outros usuários staff podem editar tudo
@@ -112,8 +112,8 @@ class EventosAdmin(admin.ModelAdmin):
         
         if eh_beta_teste:
             # Membros do Beta Teste só podem deletar se forem organizadores
-            if hasattr(request.user, 'perfil') and request.user.perfil:
-                return obj.organizador == request.user.perfil
+            if request.perfil:
+                return obj.organizador == request.perfil
             return False
         
         # Outros usuários staff podem deletar tudo
@@ -125,8 +125,8 @@ class EventosAdmin(admin.ModelAdmin):
         Para membros do Beta Teste, sempre define como organizador
         """
         if not change:  # Se está criando um novo evento
-            if hasattr(request.user, 'perfil') and request.user.perfil:
-                obj.organizador = request.user.perfil
+            if request.perfil:
+                obj.organizador = request.perfil
         
         # Verifica permissão antes de salvar (apenas para Beta Teste)
         eh_beta_teste = request.user.is_staff and request.user.groups.filter(name='Beta Teste').exists()
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class EventosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'eventos'
+
+    def ready(self):
+        # Registra os signals (índice de busca)
+        from . import signals  # noqa: F401
+
+        # Variantes redimensionadas das fotos de evento
+        from core.imagens import monitorar_imagem
+        monitorar_imagem(self.get_model('Eventos'), 'foto')
@@ -0,0 +1,161 @@
+"""
+Busca textual de eventos (parâmetro `busca` da listagem).
+
+Cada evento tem um documento de busca pré-calculado com nome, descrição e
+local, mantido em sincronia pelos signals de eventos/signals.py. Assim a
+busca usa um índice invertido em vez de vários LIKE '%termo%' com JOIN.
+
+- PostgreSQL (produção): coluna tsvector Eventos.documento_busca com índice
+  GIN e configuração de texto 'simbora_pt' (stemmer português + unaccent).
+- SQLite (desenvolvimento/testes): tabela virtual FTS5 'eventos_busca_fts'
+  com remoção de acentos. O FTS5 não tem stemmer em português, então cada
+  termo é buscado por prefixo ("trilh" encontra "trilha" e "trilhas").
+
+Pesos: nome do evento > descrição > local.
+
+Uso:
+    eventos = buscar(Eventos.objects.ativos(), 'trilha ibirapuera')
+    # filtra os eventos e anota rank_busca (maior = mais relevante)
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, FloatField, OuterRef, Subquery, Value
+from django.db.models.expressions import RawSQL
+
+CONFIGURACAO_PT = 'simbora_pt'
+TABELA_FTS = 'eventos_busca_fts'
+
+# Pesos do bm25 (FTS5) na ordem das colunas: nome, descricao, local
+PESOS_FTS = (10.0, 4.0, 1.0)
+
+# Campos que compõem o local do evento (mesma ordem de _textos)
+CAMPOS_LOCAL = (
+    'local_encontro',
+    'endereco__nome_do_local',
+    'endereco__rua',
+    'endereco__bairro',
+    'endereco__cidade',
+)
+
+
+def _usa_postgres():
+    return connection.vendor == 'postgresql'
+
+
+def _textos(evento):
+    """Retorna (nome, descricao, local) do evento para indexação"""
+    partes_local = [evento.local_encontro]
+    endereco = evento.endereco
+    if endereco:
+        partes_local += [endereco.nome_do_local, endereco.rua, endereco.bairro, endereco.cidade]
+    local = ' '.join(parte for parte in partes_local if parte)
+    return evento.nome_evento or '', evento.descricao or '', local
+
+
+def indexar_evento(evento):
+    """Recalcula o documento de busca de um evento"""
+    nome, descricao, local = _textos(evento)
+
+    if _usa_postgres():
+        documento = (
+            SearchVector(Value(nome), weight='A', config=CONFIGURACAO_PT)
+            + SearchVector(Value(descricao), weight='B', config=CONFIGURACAO_PT)
+            + SearchVector(Value(local), weight='C', config=CONFIGURACAO_PT)
+        )
+        # update() não dispara post_save novamente
+        type(evento)._base_manager.filter(pk=evento.pk).update(documento_busca=documento)
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABELA_FTS} WHERE rowid = %s', [evento.pk])
+        cursor.execute(
+            f'INSERT INTO {TABELA_FTS} (rowid, nome, descricao, local) VALUES (%s, %s, %s, %s)',
+            [evento.pk, nome, descricao, local],
+        )
+
+
+def remover_evento(evento_id):
+    """Remove o evento do índice (no PostgreSQL o documento sai junto com a linha)"""
+    if _usa_postgres():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABELA_FTS} WHERE rowid = %s', [evento_id])
+
+
+def _termos(texto):
+    return re.findall(r'\w+', texto.lower())
+
+
+def _consulta_fts(texto):
+    """Monta a expressão MATCH do FTS5: todos os termos, por prefixo"""
+    return ' '.join(f'"{termo}"*' for termo in _termos(texto))
+
+
+def buscar(queryset, texto):
+    """
+    Filtra o queryset de eventos pelo texto e anota `rank_busca`.
+
+    A ordenação fica a cargo de quem chama (ex: ('-rank_busca', '-id') na
+    listagem), para que a busca funcione junto com a paginação por cursor.
+    """
+    if not _termos(texto):
+        # Anotado mesmo vazio: quem chama ordena por rank_busca
+        return queryset.none().annotate(rank_busca=Value(0.0, output_field=FloatField()))
+
+    if _usa_postgres():
+        consulta = SearchQuery(texto, search_type='websearch', config=CONFIGURACAO_PT)
+        return queryset.filter(documento_busca=consulta).annotate(
+            rank_busca=SearchRank(F('documento_busca'), consulta),
+        )
+
+    consulta = _consulta_fts(texto)
+    tabela = queryset.model._meta.db_table
+    pesos = ', '.join(str(peso) for peso in PESOS_FTS)
+    # bm25() é negativo (menor = melhor); invertido para manter "maior = melhor"
+    rank = RawSQL(
+        f'SELECT -bm25({TABELA_FTS}, {pesos}) FROM {TABELA_FTS} '
+        f'WHERE {TABELA_FTS} MATCH %s AND rowid = "{tabela}"."id"',
+        [consulta],
+        output_field=FloatField(),
+    )
+    encontrados = RawSQL(f'SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s', [consulta])
+    return queryset.filter(id__in=encontrados).annotate(rank_busca=rank)
+
+
+def reindexar_todos(queryset):
+    """
+    Reconstrói o documento de busca de todos os eventos do queryset num
+    único comando: um UPDATE (PostgreSQL) ou um INSERT ... SELECT na tabela
+    FTS5 (SQLite), sem ler os eventos no Python. Retorna quantos foram
+    indexados.
+    """
+    ids = queryset.order_by().values('pk')
+
+    if _usa_postgres():
+        eventos = queryset.model._base_manager
+        documento = eventos.filter(pk=OuterRef('pk')).annotate(documento=(
+            SearchVector('nome_evento', weight='A', config=CONFIGURACAO_PT)
+            + SearchVector('descricao', weight='B', config=CONFIGURACAO_PT)
+            + SearchVector(*CAMPOS_LOCAL, weight='C', config=CONFIGURACAO_PT)
+        )).values('documento')
+        return eventos.filter(pk__in=ids).update(documento_busca=Subquery(documento))
+
+    sql_ids, parametros = ids.query.sql_with_params()
+    tabela = queryset.model._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABELA_FTS} WHERE rowid IN ({sql_ids})', parametros)
+        cursor.execute(
+            f"""
+            INSERT INTO {TABELA_FTS} (rowid, nome, descricao, local)
+            SELECT e.id, coalesce(e.nome_evento, ''), coalesce(e.descricao, ''),
+                   trim(coalesce(e.local_encontro, '') || ' ' || coalesce(en.nome_do_local, '') || ' '
+                        || coalesce(en.rua, '') || ' ' || coalesce(en.bairro, '') || ' ' || coalesce(en.cidade, ''))
+            FROM "{tabela}" AS e
+            LEFT JOIN core_endereco AS en ON en.id = e.endereco_id
+            WHERE e.id IN ({sql_ids})
+            """,
+            parametros,
+        )
+        return cursor.rowcount
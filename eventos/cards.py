@@ -0,0 +1,86 @@
+"""
+Cache dos fragmentos de card de evento (home, listagem e meus eventos).
+
+A parte do card que não depende de quem está vendo (foto, nome, data,
+local, avatares e contagem de participantes) é guardada já renderizada
+com {% cache %}, na chave do evento mais a versão do card:
+
+    {% cache item.timeout_card 'card_lista' evento.id item.versao_card %}
+
+A versão de cada evento fica no cache (namespace 'cards', core/cache.py) e
+é trocada pelos signals (eventos/signals.py) a cada mudança do evento, do
+endereço ou das participações: a chave muda e o fragmento antigo deixa de
+ser lido. Mudanças de Perfil/Usuario (nome, foto) podem aparecer em
+qualquer card, então invalidam o namespace inteiro.
+
+Badges e botões que dependem do visitante ficam fora dos fragmentos.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import chave, invalidar_namespace, versao_namespace
+
+NAMESPACE_CARDS = 'cards'
+
+
+def _chaves_versao(evento_ids):
+    """{chave da versão do card: evento_id}, com uma só leitura da versão do namespace"""
+    versao = versao_namespace(NAMESPACE_CARDS)
+    return {chave(NAMESPACE_CARDS, 'evento', evento_id, versao=versao): evento_id for evento_id in evento_ids}
+
+
+def versoes_cards(evento_ids):
+    """{evento_id: versão do card} para todos os eventos com um só get_many no cache"""
+    evento_ids = list(evento_ids)
+    if not evento_ids:
+        return {}
+    chaves = _chaves_versao(evento_ids)
+    versoes = cache.get_many(list(chaves))
+    faltando = [chave_versao for chave_versao in chaves if chave_versao not in versoes]
+    if faltando:
+        versoes.update(_semear_versoes(faltando))
+    # A chave do fragmento muda tanto com a versão do evento quanto com a do
+    # namespace (que já faz parte das chaves de versão)
+    return {
+        evento_id: f'{chave_versao}:{versoes[chave_versao]}'
+        for chave_versao, evento_id in chaves.items()
+    }
+
+
+def _semear_versoes(chaves_versao):
+    """
+    Versão nova para chaves que sumiram do cache (expulsas ou nunca criadas).
+
+    Voltar a um valor fixo (0) reapontaria para um fragmento ou ETag de antes
+    da expulsão, já vencido. Com add() quem chegar primeiro define a versão;
+    a releitura faz os demais processos usarem a mesma (no backend "arquivo"
+    o add() não é atômico: na corrida, vale a última gravação).
+    """
+    for chave_versao in chaves_versao:
+        cache.add(chave_versao, uuid.uuid4().hex[:12], timeout=None)
+    semeadas = cache.get_many(chaves_versao)
+    # Cache que não guarda nada (DummyCache): versão nova a cada leitura
+    return {chave_versao: semeadas.get(chave_versao) or uuid.uuid4().hex[:12] for chave_versao in chaves_versao}
+
+
+def anotar_versoes_cards(eventos_com_info):
+    """Acrescenta versao_card e timeout_card aos itens montados pelas views"""
+    versoes = versoes_cards(item['evento'].id for item in eventos_com_info)
+    for item in eventos_com_info:
+        item['versao_card'] = versoes[item['evento'].id]
+        item['timeout_card'] = settings.CARDS_CACHE_TIMEOUT
+    return eventos_com_info
+
+
+def invalidar_cards(evento_ids):
+    """Troca a versão do card dos eventos (os fragmentos antigos deixam de ser lidos)"""
+    # Um valor novo em vez de incr(): não depende da versão anterior ainda
+    # estar no cache e não repete uma versão já usada
+    nova_versao = uuid.uuid4().hex[:12]
+    cache.set_many(dict.fromkeys(_chaves_versao(evento_ids), nova_versao), timeout=None)
+
+
+def invalidar_todos_cards():
+    invalidar_namespace(NAMESPACE_CARDS)
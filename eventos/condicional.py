@@ -0,0 +1,95 @@
+"""
+GET condicional (ETag) das páginas de um evento.
+
+O validador sai de uma única query leve (só campos do evento e a última
+mudança de participação, pelo índice (evento, -updated_at)) e do cache:
+
+- Eventos.updated_at e a última Participacao.updated_at do evento
+- os contadores de participação (mudam também nas exclusões)
+- o status efetivo e se já começou (mudam com o tempo, sem gravação)
+- a versão do card do evento (eventos/cards.py), trocada pelos signals em
+  mudanças de endereço e de perfis (nomes e fotos)
+- quem está vendo (perfil, ou anônimo)
+
+Com If-None-Match batendo, a view responde 304 sem rodar as queries dos
+participantes. As respostas saem com Cache-Control: private, no-cache,
+então o navegador sempre revalida.
+
+Não há Last-Modified: uma data não cobre quem está vendo nem o status que
+muda com o tempo, e um If-Modified-Since sozinho responderia 304 com a
+página de outra situação. Com mensagens (django.contrib.messages)
+pendentes a página é sempre renderizada, para exibi-las.
+
+Uso:
+    @condicional_evento
+    def visualizar_evento(request, evento_id): ...
+"""
+import hashlib
+from functools import wraps
+
+from django.contrib import messages
+from django.db.models import OuterRef, Subquery
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .cards import versoes_cards
+from .models import Eventos, Participacao
+
+
+def validador_evento(request, evento_id):
+    """ETag do evento para quem está vendo, ou None se o evento não existe"""
+    # Uma query só por requisição, mesmo que o ETag seja pedido mais de uma vez
+    validadores = request.__dict__.setdefault('_validadores_evento', {})
+    if evento_id in validadores:
+        return validadores[evento_id]
+
+    ultima_participacao = (
+        Participacao.objects.filter(evento=OuterRef('pk'))
+        .order_by('-updated_at')
+        .values('updated_at')[:1]
+    )
+    evento = (
+        Eventos.objects.filter(pk=evento_id)
+        .only(
+            'updated_at', 'status', 'data_inicio', 'data_termino', 'organizador_id',
+            'total_participantes_ativos', 'total_confirmados', 'total_lista_espera',
+        )
+        .annotate(ultima_participacao=Subquery(ultima_participacao))
+        .first()
+    )
+    if evento is None:
+        validadores[evento_id] = None
+        return None
+
+    perfil = getattr(request, 'perfil', None)
+    partes = [
+        evento.updated_at.isoformat(),
+        evento.ultima_participacao.isoformat() if evento.ultima_participacao else '-',
+        evento.total_participantes_ativos, evento.total_confirmados, evento.total_lista_espera,
+        evento.status_efetivo, evento.ja_iniciou,
+        versoes_cards([evento.pk])[evento.pk],
+        perfil.pk if perfil else 'anonimo',
+    ]
+    validadores[evento_id] = hashlib.md5('|'.join(str(parte) for parte in partes).encode()).hexdigest()
+    return validadores[evento_id]
+
+
+def _etag(request, evento_id, **kwargs):
+    return validador_evento(request, evento_id)
+
+
+def condicional_evento(view):
+    """Decorator: 304 quando o ETag do evento bate com o do navegador"""
+    view_condicional = condition(etag_func=_etag)(view)
+
+    @wraps(view)
+    def view_com_validador(request, *args, **kwargs):
+        # Mensagens pendentes (ex: "Inscrição confirmada") só aparecem renderizando
+        if len(messages.get_messages(request)):
+            resposta = view(request, *args, **kwargs)
+        else:
+            resposta = view_condicional(request, *args, **kwargs)
+        # Página por usuário: só o navegador guarda, e sempre revalida antes de usar
+        patch_cache_control(resposta, private=True, no_cache=True)
+        return resposta
+    return view_com_validador
@@ -0,0 +1,61 @@
+"""
+Facetas dos filtros da listagem de eventos (cidades e categorias).
+
+As opções dos filtros não dependem dos filtros aplicados, então são
+calculadas uma vez (GROUP BY sobre os eventos ativos) e guardadas no cache,
+no namespace 'facetas' (core/cache.py). O namespace é invalidado pelos
+signals de Eventos/Endereco (eventos/signals.py);
+o timeout (FACETAS_CACHE_TIMEOUT) cobre os eventos que vencem sem ser salvos.
+
+Formato:
+    {
+        'cidades': [('Recife', 3), ('São Paulo', 12), ...],
+        'categorias': [('ESPORTE', 'Esporte', 5), ('LAZER', 'Lazer', 0), ...],
+    }
+"""
+from django.conf import settings
+from django.db.models import Count
+
+from core.cache import chave, invalidar_namespace, obter_ou_calcular
+
+from .models import Eventos
+
+NAMESPACE_FACETAS = 'facetas'
+
+
+def calcular_facetas():
+    """Conta eventos ativos por cidade e por categoria (sem cache)"""
+    ativos = Eventos.objects.ativos().order_by()
+
+    cidades = (
+        ativos.exclude(endereco__cidade__isnull=True)
+        .exclude(endereco__cidade='')
+        .values_list('endereco__cidade')
+        .annotate(total=Count('id'))
+        .order_by('endereco__cidade')
+    )
+
+    totais_categoria = dict(
+        ativos.exclude(categoria__isnull=True)
+        .values_list('categoria')
+        .annotate(total=Count('id'))
+    )
+    # Mantém todas as categorias no filtro, na ordem das choices
+    categorias = [
+        (valor, nome, totais_categoria.get(valor, 0))
+        for valor, nome in Eventos.CATEGORIA_CHOICES
+    ]
+
+    return {
+        'cidades': list(cidades),
+        'categorias': categorias,
+    }
+
+
+def obter_facetas():
+    """Facetas a partir do cache, recalculando se necessário"""
+    return obter_ou_calcular(chave(NAMESPACE_FACETAS), calcular_facetas, settings.FACETAS_CACHE_TIMEOUT)
+
+
+def invalidar_facetas():
+    invalidar_namespace(NAMESPACE_FACETAS)
@@ -0,0 +1,68 @@
+"""
+Comando Django para finalizar eventos vencidos em segundo plano.
+
+As páginas já tratam eventos com data_termino no passado como finalizados
+na própria consulta (EventosQuerySet.ativos / Eventos.status_efetivo), então
+nenhum GET precisa escrever no banco. Este comando apenas sincroniza o campo
+status, em lotes curtos.
+
+Uso:
+    python manage.py expirar_eventos                 # executa uma vez (cron)
+    python manage.py expirar_eventos --loop          # worker: repete a cada 60s
+    python manage.py expirar_eventos --loop --intervalo 300 --lote 1000
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from eventos.models import Eventos
+
+
+class Command(BaseCommand):
+    help = 'Atualiza para FINALIZADO, em lotes, os eventos ATIVOS cuja data de término já passou'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Executa continuamente, repetindo a cada --intervalo segundos',
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=int,
+            default=60,
+            help='Intervalo em segundos entre execuções no modo --loop (padrão: 60)',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=500,
+            help='Quantidade máxima de eventos atualizados por UPDATE (padrão: 500)',
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        if not options['loop']:
+            self.executar(options['lote'])
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Worker de expiração iniciado (intervalo: {options['intervalo']}s, lote: {options['lote']})"
+        ))
+        try:
+            while True:
+                # Descarta conexões quebradas/expiradas entre as execuções
+                close_old_connections()
+                self.executar(options['lote'])
+                time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            self.stdout.write('\nWorker de expiração encerrado.')
+
+    def executar(self, tamanho_lote):
+        total = Eventos.objects.finalizar_vencidos(tamanho_lote=tamanho_lote)
+        if total:
+            self.stdout.write(self.style.SUCCESS(f'✓ {total} evento(s) finalizado(s)'))
+        elif self.verbosity > 1:
+            self.stdout.write('Nenhum evento vencido encontrado.')
+        return total
@@ -0,0 +1,40 @@
+"""
+Comando Django para recalcular os contadores de participação dos eventos.
+
+Os contadores (total_participantes_ativos, total_confirmados e
+total_lista_espera) são mantidos a cada gravação de Participacao. Use este
+comando após cargas em massa que não passam pelo save() (bulk_create,
+update(), SQL direto) ou para corrigir divergências.
+
+Uso:
+    python manage.py recontar_participacoes
+    python manage.py recontar_participacoes --evento 42
+"""
+from django.core.management.base import BaseCommand
+
+from eventos.cards import invalidar_cards, invalidar_todos_cards
+from eventos.models import Eventos
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os contadores de participação dos eventos em um único UPDATE'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--evento',
+            type=int,
+            action='append',
+            help='ID do evento a recontar (pode repetir; padrão: todos)',
+        )
+
+    def handle(self, *args, **options):
+        eventos = Eventos.objects.all()
+        if options['evento']:
+            eventos = eventos.filter(pk__in=options['evento'])
+        total = eventos.recontar_participacoes()
+        # Os contadores aparecem nos cards em cache
+        if options['evento']:
+            invalidar_cards(options['evento'])
+        else:
+            invalidar_todos_cards()
+        self.stdout.write(self.style.SUCCESS(f'✓ {total} evento(s) recontado(s)'))
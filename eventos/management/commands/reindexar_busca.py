@@ -0,0 +1,24 @@
+"""
+Comando Django para reconstruir o índice de busca textual dos eventos.
+
+O índice é mantido automaticamente ao salvar eventos e endereços (ver
+eventos/signals.py). Use este comando após cargas em massa que não disparam
+signals (loaddata, bulk_create, update()) ou para recuperar o índice.
+
+A reconstrução é um único comando no banco (ver eventos.busca.reindexar_todos).
+
+Uso:
+    python manage.py reindexar_busca
+"""
+from django.core.management.base import BaseCommand
+
+from eventos.busca import reindexar_todos
+from eventos.models import Eventos
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o documento de busca textual de todos os eventos'
+
+    def handle(self, *args, **options):
+        total = reindexar_todos(Eventos.objects.all())
+        self.stdout.write(self.style.SUCCESS(f'✓ {total} evento(s) reindexado(s)'))
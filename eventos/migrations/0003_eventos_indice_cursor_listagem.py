@@ -0,0 +1,19 @@
+# Generated by Django 5.1.14 on 2026-10-18 17:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_endereco_nome_do_local'),
+        ('eventos', '0002_eventos_categoria'),
+        ('perfil', '0006_alter_perfil_imagem_url'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='eventos',
+            index=models.Index(fields=['status', '-data_inicio', '-id'], name='eventos_status_cursor_idx'),
+        ),
+    ]
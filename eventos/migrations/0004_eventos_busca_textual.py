@@ -0,0 +1,104 @@
+# Generated by Django 5.1.14 on 2026-10-18 17:46
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Estruturas da busca textual (ver eventos/busca.py). Dependem do banco:
+# PostgreSQL usa tsvector + GIN, SQLite usa uma tabela virtual FTS5.
+# O índice GIN fica declarado em Eventos.Meta (no SQLite, que ignora o
+# USING gin, vira um índice comum sobre uma coluna sempre vazia).
+
+POSTGRES_CRIAR = [
+    'CREATE EXTENSION IF NOT EXISTS unaccent',
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'simbora_pt') THEN
+            CREATE TEXT SEARCH CONFIGURATION simbora_pt (COPY = pg_catalog.portuguese);
+            ALTER TEXT SEARCH CONFIGURATION simbora_pt
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+        END IF;
+    END
+    $$
+    """,
+    # Indexa os eventos já existentes
+    """
+    UPDATE eventos_eventos AS e SET documento_busca =
+        setweight(to_tsvector('simbora_pt', coalesce(e.nome_evento, '')), 'A')
+        || setweight(to_tsvector('simbora_pt', coalesce(e.descricao, '')), 'B')
+        || setweight(to_tsvector('simbora_pt', concat_ws(' ',
+            e.local_encontro, en.nome_do_local, en.rua, en.bairro, en.cidade)), 'C')
+    FROM eventos_eventos AS ev
+    LEFT JOIN core_endereco AS en ON en.id = ev.endereco_id
+    WHERE ev.id = e.id
+    """,
+]
+
+POSTGRES_REMOVER = [
+    'DROP TEXT SEARCH CONFIGURATION IF EXISTS simbora_pt',
+]
+
+SQLITE_CRIAR = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS eventos_busca_fts USING fts5(
+        nome, descricao, local,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    # Indexa os eventos já existentes
+    """
+    INSERT INTO eventos_busca_fts (rowid, nome, descricao, local)
+    SELECT e.id, coalesce(e.nome_evento, ''), coalesce(e.descricao, ''),
+           trim(coalesce(e.local_encontro, '') || ' ' || coalesce(en.nome_do_local, '') || ' '
+                || coalesce(en.rua, '') || ' ' || coalesce(en.bairro, '') || ' ' || coalesce(en.cidade, ''))
+    FROM eventos_eventos AS e
+    LEFT JOIN core_endereco AS en ON en.id = e.endereco_id
+    """,
+]
+
+SQLITE_REMOVER = [
+    'DROP TABLE IF EXISTS eventos_busca_fts',
+]
+
+
+def _executar(schema_editor, comandos):
+    for sql in comandos:
+        schema_editor.execute(sql)
+
+
+def criar_estruturas_busca(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _executar(schema_editor, POSTGRES_CRIAR)
+    elif vendor == 'sqlite':
+        _executar(schema_editor, SQLITE_CRIAR)
+
+
+def remover_estruturas_busca(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _executar(schema_editor, POSTGRES_REMOVER)
+    elif vendor == 'sqlite':
+        _executar(schema_editor, SQLITE_REMOVER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_endereco_nome_do_local'),
+        ('eventos', '0003_eventos_indice_cursor_listagem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventos',
+            name='documento_busca',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(criar_estruturas_busca, remover_estruturas_busca),
+        migrations.AddIndex(
+            model_name='eventos',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['documento_busca'], name='eventos_documento_busca_gin'),
+        ),
+    ]
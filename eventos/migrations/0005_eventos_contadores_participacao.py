@@ -0,0 +1,56 @@
+# Generated by Django 5.1.14 on 2026-10-18 17:51
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+# Cópia de Participacao.STATUS_OCUPAM_VAGA no momento desta migração
+STATUS_OCUPAM_VAGA = ['INSCRITO', 'CONFIRMADO', 'PRESENTE']
+
+
+def preencher_contadores(apps, schema_editor):
+    """Mesmo cálculo de EventosQuerySet.recontar_participacoes"""
+    Eventos = apps.get_model('eventos', 'Eventos')
+    Participacao = apps.get_model('eventos', 'Participacao')
+
+    def contagem(**filtros):
+        participacoes = Participacao.objects.filter(
+            evento=OuterRef('pk'),
+            participante__isnull=False,
+            **filtros
+        ).exclude(
+            participante_id=Coalesce(OuterRef('organizador_id'), Value(0))
+        ).order_by().values('evento').annotate(total=Count('pk')).values('total')
+        return Coalesce(Subquery(participacoes, output_field=IntegerField()), Value(0))
+
+    Eventos.objects.update(
+        total_participantes_ativos=contagem(status__in=STATUS_OCUPAM_VAGA),
+        total_confirmados=contagem(status='CONFIRMADO'),
+        total_lista_espera=contagem(status='LISTA_ESPERA'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0004_eventos_busca_textual'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventos',
+            name='total_confirmados',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Participações com status CONFIRMADO'),
+        ),
+        migrations.AddField(
+            model_name='eventos',
+            name='total_lista_espera',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Participações na lista de espera'),
+        ),
+        migrations.AddField(
+            model_name='eventos',
+            name='total_participantes_ativos',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Participações que ocupam vaga (inscritos, confirmados e presentes)'),
+        ),
+        migrations.RunPython(preencher_contadores, migrations.RunPython.noop),
+    ]
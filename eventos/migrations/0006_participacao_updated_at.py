@@ -0,0 +1,23 @@
+# Generated by Django 5.1.14 on 2026-10-18 18:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0005_eventos_contadores_participacao'),
+        ('perfil', '0006_alter_perfil_imagem_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='participacao',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Data da última atualização'),
+        ),
+        migrations.AddIndex(
+            model_name='participacao',
+            index=models.Index(fields=['evento', '-updated_at'], name='eventos_par_evento__517386_idx'),
+        ),
+    ]
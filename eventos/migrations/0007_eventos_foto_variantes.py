@@ -0,0 +1,18 @@
+# Generated by Django 5.1.14 on 2026-10-18 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0006_participacao_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventos',
+            name='foto_variantes',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
@@ -14,7 +14,11 @@ Modelo de Eventos - Sistema Simbora
     - on_delete: O que fazer quando objeto relacionado é deletado
 """
 
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models import Case, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Left
 from perfil.models import Perfil
 from core.models import Endereco
 from django.utils import timezone
@@ -47,6 +51,12 @@ class Participacao(models.Model):
         ('AUSENTE', 'Ausente'),
     ]
     
+    # Status que não contam como participação ativa
+    STATUS_INATIVOS = ['CANCELADO', 'AUSENTE']
+    
+    # Status que ocupam uma vaga do evento (LISTA_ESPERA aguarda uma vaga)
+    STATUS_OCUPAM_VAGA = ['INSCRITO', 'CONFIRMADO', 'PRESENTE']
+    
     evento = models.ForeignKey(
         'Eventos',
         on_delete=models.CASCADE,
@@ -97,6 +107,11 @@ class Participacao(models.Model):
         help_text='Comentário sobre o host/organizador do evento'
     )
     
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text='Data da última atualização'
+    )
+    
     class Meta:
         verbose_name = 'Participação'
         verbose_name_plural = 'Participações'
@@ -105,8 +120,48 @@ class Participacao(models.Model):
         indexes = [
             models.Index(fields=['status']),
             models.Index(fields=['-data_inscricao']),
+            # Última mudança de participação do evento (ETag de visualizar_evento)
+            models.Index(fields=['evento', '-updated_at']),
         ]
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Guarda como a participação estava no banco, para o delta dos contadores
+        instancia._contagem_salva = instancia.chave_contagem()
+        return instancia
+    
+    def chave_contagem(self):
+        """
+        (evento_id, participante_id, contadores) desta participação: quais
+        contadores de Eventos ela incrementa. Participações de perfis
+        removidos não contam.
+        """
+        dados = self.__dict__
+        participante_id = dados.get('participante_id')
+        status = dados.get('status')
+        contadores = []
+        if participante_id is not None:
+            if status in self.STATUS_OCUPAM_VAGA:
+                contadores.append('total_participantes_ativos')
+            if status == 'CONFIRMADO':
+                contadores.append('total_confirmados')
+            if status == 'LISTA_ESPERA':
+                contadores.append('total_lista_espera')
+        return (dados.get('evento_id'), participante_id, tuple(contadores))
+    
+    def save(self, *args, **kwargs):
+        """Salva e ajusta os contadores do evento na mesma transação"""
+        antes = getattr(self, '_contagem_salva', None)
+        depois = self.chave_contagem()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if antes != depois:
+                if antes:
+                    atualizar_contadores(antes, -1)
+                atualizar_contadores(depois, 1)
+        self._contagem_salva = depois
+    
     def __str__(self):
         if self.participante:
             participante_nome = self.participante.nome_social or self.participante.usuario.nome_completo
@@ -116,6 +171,165 @@ class Participacao(models.Model):
         return f"{participante_nome} - {self.evento.nome_evento} ({self.get_status_display()})"
 
 
+def participacoes_ativas():
+    """
+    QuerySet base das participações que contam para o evento: as que ocupam
+    vaga (ver STATUS_OCUPAM_VAGA), sem participações de perfis removidos.
+    Mesmo critério de Eventos.total_participantes_ativos.
+    """
+    return Participacao.objects.filter(
+        status__in=Participacao.STATUS_OCUPAM_VAGA,
+        participante__isnull=False,
+    )
+
+
+def atualizar_contadores(chave_contagem, sinal):
+    """
+    Soma `sinal` (+1/-1) nos contadores do evento com um UPDATE atômico
+    (F() no banco, sem ler o valor antes). A participação do próprio
+    organizador não entra nos contadores: ele já é contado à parte.
+    """
+    evento_id, participante_id, contadores = chave_contagem
+    if not contadores or evento_id is None:
+        return
+    delta = Case(
+        When(organizador_id=participante_id, then=Value(0)),
+        default=Value(sinal),
+        output_field=IntegerField(),
+    )
+    Eventos.objects.filter(pk=evento_id).update(**{
+        campo: models.F(campo) + delta for campo in contadores
+    })
+
+
+# Início da descrição carregado para os cards (que mostram só 15 palavras)
+TAMANHO_DESCRICAO_CARD = 300
+
+# Colunas que os cards não usam (textos longos e dados sensíveis do organizador)
+CAMPOS_FORA_DO_CARD = (
+    'descricao',
+    'regras',
+    'documento_busca',
+    'organizador__cpf',
+    'organizador__cpf_hash',
+    'organizador__descricao',
+)
+
+
+class EventosQuerySet(models.QuerySet):
+
+    def ativos(self):
+        """
+        Eventos ATIVOS que ainda não terminaram.
+
+        Um evento com data_termino no passado é tratado como finalizado já
+        na consulta, mesmo que o comando expirar_eventos ainda não tenha
+        atualizado o status no banco. Assim as leituras nunca precisam escrever.
+        """
+        return self.filter(status='ATIVO', data_termino__gte=timezone.now())
+
+    def vencidos(self):
+        """Eventos ainda marcados como ATIVO cuja data_termino já passou"""
+        return self.filter(status='ATIVO', data_termino__lt=timezone.now())
+
+    def do_perfil(self, perfil):
+        """
+        Eventos que o perfil organiza ou em que tem alguma participação
+        (qualquer status). IN sobre as participações do perfil: sem JOIN,
+        então não há linhas repetidas nem necessidade de distinct().
+        """
+        return self.filter(
+            models.Q(organizador=perfil) |
+            models.Q(pk__in=Participacao.objects.filter(participante=perfil).values('evento_id'))
+        )
+
+    def com_status_visitante(self, perfil):
+        """
+        Anota status_visitante: o status da participação do perfil em cada
+        evento (None se não participa). Há no máximo uma participação por
+        evento/perfil (unique_together), então a subquery é escalar.
+        """
+        return self.annotate(status_visitante=Subquery(
+            Participacao.objects.filter(evento=OuterRef('pk'), participante=perfil).values('status')[:1]
+        ))
+
+    def finalizados(self):
+        """Eventos FINALIZADOS no banco ou vencidos (finalizados na leitura)"""
+        return self.filter(
+            models.Q(status='FINALIZADO') |
+            models.Q(status='ATIVO', data_termino__lt=timezone.now())
+        )
+
+    def finalizar_vencidos(self, tamanho_lote=500):
+        """
+        Atualiza para FINALIZADO os eventos vencidos, em lotes.
+
+        Cada lote é um UPDATE curto por chave primária, para não segurar
+        locks sobre a tabela inteira. Retorna o total de eventos atualizados.
+        """
+        total = 0
+        while True:
+            ids = list(self.vencidos().order_by('pk').values_list('pk', flat=True)[:tamanho_lote])
+            if not ids:
+                return total
+            total += self.filter(pk__in=ids, status='ATIVO').update(status='FINALIZADO')
+
+    def para_card(self):
+        """
+        Carrega o necessário para os cards de evento: organizador, usuário
+        do organizador e endereço (select_related).
+
+        Os totais vêm dos contadores do próprio evento (total_participantes)
+        e os avatares dos participantes de uma única query para a página
+        inteira (eventos/participantes.py), então o número de queries é
+        fixo, independente da quantidade de eventos retornados.
+
+        Os cards não mostram regras nem o documento de busca, e da descrição
+        só o começo (descricao_resumo): esses textos ficam fora da query,
+        assim como o CPF criptografado e a descrição do organizador.
+        """
+        return self.select_related(
+            'organizador__usuario',
+            'endereco',
+        ).defer(
+            *CAMPOS_FORA_DO_CARD,
+        ).annotate(
+            descricao_resumo=Left('descricao', TAMANHO_DESCRICAO_CARD),
+        )
+
+    def com_resumo_participacao(self):
+        """
+        Nome antigo de para_card(), mantido para quem ainda o chama. O resumo
+        de participação não é mais anotado: vem dos contadores do evento
+        (total_participantes, vagas_disponiveis, percentual_ocupacao).
+        """
+        return self.para_card()
+
+    def recontar_participacoes(self):
+        """
+        Recalcula os contadores de participação de todos os eventos do
+        queryset em um único UPDATE (subqueries correlacionadas).
+        """
+        def contagem(**filtros):
+            participacoes = Participacao.objects.filter(
+                evento=OuterRef('pk'),
+                participante__isnull=False,
+                **filtros
+            ).exclude(
+                # Participação do organizador não conta (ver atualizar_contadores)
+                participante_id=Coalesce(OuterRef('organizador_id'), Value(0))
+            ).order_by().values('evento').annotate(
+                total=models.Count('pk')
+            ).values('total')
+            return Coalesce(Subquery(participacoes, output_field=IntegerField()), Value(0))
+
+        return self.update(
+            total_participantes_ativos=contagem(status__in=Participacao.STATUS_OCUPAM_VAGA),
+            total_confirmados=contagem(status='CONFIRMADO'),
+            total_lista_espera=contagem(status='LISTA_ESPERA'),
+        )
+
+
 class Eventos(models.Model):
     """
     Modelo para gerenciar eventos criados pelos usuários
@@ -136,15 +350,22 @@ class Eventos(models.Model):
         - perfil.eventos_participando.all() => eventos que participa
         - endereco.eventos.all() => eventos neste local
     
+    Contadores (desnormalizados, sem queries; ver recontar_participacoes):
+        - total_participantes_ativos: Participações que ocupam vaga
+        - total_confirmados: Participações CONFIRMADO
+        - total_lista_espera: Participações na lista de espera
+    
     Properties:
-        TODO: vagas_disponiveis - Calcula vagas restantes
-        TODO: esta_lotado - Verifica se lotou ou fechou
+        total_participantes - Vagas ocupadas: total_participantes_ativos + organizador
+        vagas_disponiveis - Vagas restantes pelos contadores (None = ilimitado)
+        esta_lotado - Sem vagas ou fechado para inscrições
+        percentual_ocupacao - % de vagas ocupadas (0-100)
+        ja_iniciou - Se evento começou
+        ja_terminou - Se evento terminou
+        status_efetivo - Status considerando data_termino (ATIVO vencido => FINALIZADO)
         TODO: atingiu_minimo - Verifica se atingiu quórum mínimo
         TODO: status_quorum - Status do quórum ("Confirmado", "Aguardando N")
         TODO: percentual_atingido_minimo - % de progresso até mínimo
-        TODO: ja_iniciou - Se evento começou
-        TODO: ja_terminou - Se evento terminou
-        TODO: percentual_ocupacao - % de vagas ocupadas
         
     Validações implementadas:
         - data_termino > data_inicio
@@ -245,6 +466,9 @@ class Eventos(models.Model):
         null=True,
         help_text='Foto principal do evento'
     )
+
+    # Variantes redimensionadas da foto prontas (ver core/imagens.py)
+    foto_variantes = models.BooleanField(default=False, editable=False)
     
     foto_url = models.URLField(
         blank=True, 
@@ -269,6 +493,27 @@ class Eventos(models.Model):
         help_text='Se o evento ainda está aceitando novos participantes'
     )
     
+    # Contadores desnormalizados, mantidos por Participacao.save() e pelos
+    # signals de exclusão (recalcule com: manage.py recontar_participacoes).
+    # Não incluem o organizador; ver total_participantes.
+    total_participantes_ativos = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Participações que ocupam vaga (inscritos, confirmados e presentes)'
+    )
+    
+    total_confirmados = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Participações com status CONFIRMADO'
+    )
+    
+    total_lista_espera = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Participações na lista de espera'
+    )
+    
     CATEGORIA_CHOICES = [
         ('ESPORTE', 'Esporte'),
         ('LAZER', 'Lazer'),
@@ -295,6 +540,15 @@ class Eventos(models.Model):
         help_text='Data da última atualização'
     )
     
+    # Documento de busca textual no PostgreSQL (no SQLite fica vazio e o
+    # índice é a tabela FTS5). Mantido por eventos/busca.py via signals.
+    documento_busca = SearchVectorField(
+        null=True,
+        editable=False,
+    )
+    
+    objects = EventosQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Evento'
         verbose_name_plural = 'Eventos'
@@ -302,11 +556,53 @@ class Eventos(models.Model):
         indexes = [
             models.Index(fields=['-data_inicio']),
             models.Index(fields=['status']),
+            # Paginação por cursor da listagem: status + (data_inicio, id)
+            models.Index(fields=['status', '-data_inicio', '-id'], name='eventos_status_cursor_idx'),
+            # Busca textual no PostgreSQL (eventos/busca.py)
+            GinIndex(fields=['documento_busca'], name='eventos_documento_busca_gin'),
         ]
     
+    # Mantidos só por UPDATE com F() (ver atualizar_contadores)
+    CAMPOS_CONTADORES = ['total_participantes_ativos', 'total_confirmados', 'total_lista_espera']
+    
     def __str__(self):
         return f"{self.nome_evento} - {self.data_inicio.strftime('%d/%m/%Y')}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Guarda o organizador do banco: trocá-lo muda quem fica fora dos contadores
+        instancia._organizador_salvo = instancia.__dict__.get('organizador_id')
+        return instancia
+    
+    def save(self, *args, **kwargs):
+        """
+        Ao editar um evento, não grava os contadores: a instância em memória
+        pode estar desatualizada e sobrescreveria as inscrições feitas nesse
+        meio tempo.
+        
+        Se o organizador mudou, os contadores são recontados: a participação
+        do organizador não conta (ver atualizar_contadores).
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                campo.name for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.name not in self.CAMPOS_CONTADORES
+            ]
+        campos = kwargs.get('update_fields')
+        trocou_organizador = (
+            not self._state.adding
+            and hasattr(self, '_organizador_salvo')
+            and 'organizador_id' in self.__dict__
+            and self.organizador_id != self._organizador_salvo
+            and (campos is None or 'organizador' in campos or 'organizador_id' in campos)
+        )
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if trocou_organizador:
+                Eventos.objects.filter(pk=self.pk).recontar_participacoes()
+        self._organizador_salvo = self.__dict__.get('organizador_id')
+    
     def clean(self):
         """
         Validações customizadas do modelo
@@ -337,6 +633,29 @@ class Eventos(models.Model):
 
    
     
+    @property
+    def status_efetivo(self):
+        """
+        Status considerando a data de término: um evento ATIVO que já
+        terminou é exibido como FINALIZADO, mesmo antes do comando
+        expirar_eventos atualizar o banco.
+        """
+        if self.status == 'ATIVO' and self.ja_terminou:
+            return 'FINALIZADO'
+        return self.status
+
+    def get_status_efetivo_display(self):
+        """Rótulo legível de status_efetivo (equivalente ao get_status_display)"""
+        return dict(self.STATUS_CHOICES).get(self.status_efetivo, self.status_efetivo)
+
+    @property
+    def total_participantes(self):
+        """
+        Participantes ocupando vaga, contando o organizador (que ocupa uma
+        vaga mesmo sem participação registrada). Não faz queries.
+        """
+        return self.total_participantes_ativos + (1 if self.organizador_id else 0)
+    
     @property
     def vagas_disponiveis(self):
         """
@@ -351,8 +670,11 @@ class Eventos(models.Model):
         - 0: Lotado OU não aceita mais participantes
         - N: Número de vagas restantes
         """
-        # TODO: Implementar
-        pass
+        if not self.aceita_participantes:
+            return 0
+        if self.maximo_participantes is None:
+            return None
+        return max(self.maximo_participantes - self.total_participantes, 0)
     
     @property
     def esta_lotado(self):
@@ -363,8 +685,7 @@ class Eventos(models.Model):
         - Atingiu o máximo de participantes OU
         - Não aceita mais novos participantes
         """
-        # TODO: Implementar
-        pass
+        return self.vagas_disponiveis == 0
     
     @property
     def atingiu_minimo(self):
@@ -408,11 +729,9 @@ class Eventos(models.Model):
         """
         Verifica se o evento já iniciou
         
-        # TODO:
         Retorna: True se evento já começou, False caso contrário
         """
-        # TODO: Implementar
-        pass
+        return self.data_inicio is not None and self.data_inicio <= timezone.now()
     
     @property
     def ja_terminou(self):
@@ -422,8 +741,7 @@ class Eventos(models.Model):
         
         Uso: Mostrar badge "Encerrado" em eventos passados
         """
-        # TODO: Implementar
-        pass
+        return self.data_termino is not None and self.data_termino < timezone.now()
     
     
     @property
@@ -432,6 +750,7 @@ class Eventos(models.Model):
             Retorna o percentual de vagas ocupadas (0-100)
             Útil para barras de progresso e alertas
         """
-        #TODO: Implementar
-        pass
+        if not self.maximo_participantes:
+            return 0
+        return min(int(self.total_participantes * 100 / self.maximo_participantes), 100)
     
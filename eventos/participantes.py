@@ -0,0 +1,154 @@
+"""
+Participantes de eventos prontos para exibição (avatares e listas).
+
+ParticipanteCard guarda só o que os templates mostram (nome, avatar e
+status), montado a partir de values(): nada de instâncias de Participacao,
+Perfil e Usuario por participante, e nenhuma FK carregada pelo template.
+
+Nos cards das listagens só os primeiros avatares aparecem: uma única query
+com ROW_NUMBER() por evento traz no máximo `limite` participantes de cada
+evento da página, qualquer que seja o tamanho dos eventos.
+
+Nas páginas com cards em cache ({% cache %}, eventos/cards.py), use
+participantes_sob_demanda: a query só roda se algum fragmento for
+renderizado, então uma página com todos os cards no cache não a executa.
+
+Uso:
+    participantes = participantes_dos_cards(eventos)       # {evento.id: [ParticipanteCard]}
+    participantes = participantes_sob_demanda(eventos)     # idem, lazy
+    cards = cards_das_participacoes(evento.participacoes.filter(...))
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils.functional import SimpleLazyObject
+
+from perfil.avatar import url_avatar
+
+from .models import Participacao, participacoes_ativas
+
+# Avatares exibidos em cada card das listagens (home, lista de eventos)
+AVATARES_CARD = 3
+
+# Avatares exibidos na página do evento
+AVATARES_VISUALIZAR = 4
+
+# Campos lidos de cada participação (values())
+CAMPOS = (
+    'status',
+    'participante_id',
+    'participante__nome_social',
+    'participante__imagem_url',
+    'participante__usuario__first_name',
+    'participante__usuario__last_name',
+    'participante__usuario__email',
+)
+
+ROTULOS_STATUS = dict(Participacao.STATUS_CHOICES)
+
+
+@dataclass(frozen=True, slots=True)
+class ParticipanteCard:
+    perfil_id: int
+    nome: str
+    avatar_url: str
+    status: str
+
+    @property
+    def status_display(self):
+        return ROTULOS_STATUS.get(self.status, self.status)
+
+
+def _nome(perfil_id, nome_social, first_name, last_name, email):
+    """Mesma regra de Perfil.nome_completo, a partir dos valores já lidos"""
+    if nome_social:
+        return nome_social
+    # Com usuário (LEFT JOIN), o email sempre vem preenchido
+    if email is not None:
+        return f'{first_name} {last_name}'.strip() or email
+    return f'Perfil #{perfil_id}'
+
+
+def card_de_valores(linha):
+    """ParticipanteCard de uma linha de values(*CAMPOS)"""
+    nome = _nome(
+        linha['participante_id'],
+        linha['participante__nome_social'],
+        linha['participante__usuario__first_name'],
+        linha['participante__usuario__last_name'],
+        linha['participante__usuario__email'],
+    )
+    return ParticipanteCard(
+        perfil_id=linha['participante_id'],
+        nome=nome,
+        avatar_url=url_avatar(linha['participante__imagem_url'], nome),
+        status=linha['status'],
+    )
+
+
+def card_do_organizador(organizador):
+    """Card do organizador (carregado com select_related('organizador__usuario'))"""
+    nome = organizador.nome_completo
+    return ParticipanteCard(
+        perfil_id=organizador.pk,
+        nome=nome,
+        avatar_url=url_avatar(organizador.imagem_url, nome),
+        status='CONFIRMADO',
+    )
+
+
+def cards_das_participacoes(participacoes):
+    """ParticipanteCards de um queryset de Participacao (uma query)"""
+    return [card_de_valores(linha) for linha in participacoes.values(*CAMPOS)]
+
+
+def com_organizador(cards, evento):
+    """O organizador entra no início da lista se não tiver participação nela"""
+    if evento.organizador and not any(card.perfil_id == evento.organizador_id for card in cards):
+        return [card_do_organizador(evento.organizador), *cards]
+    return cards
+
+
+def participantes_dos_cards(eventos, limite=AVATARES_CARD):
+    """
+    {evento.id: [ParticipanteCard]} com os `limite` participantes ativos mais
+    recentes de cada evento (mais o organizador), em uma única query.
+    """
+    eventos = list(eventos)
+    por_evento = {evento.id: [] for evento in eventos}
+    if eventos:
+        linhas = (
+            participacoes_ativas()
+            .filter(evento_id__in=por_evento)
+            .annotate(posicao=Window(
+                RowNumber(),
+                partition_by=F('evento_id'),
+                order_by=[F('data_inscricao').desc(), F('id').desc()],
+            ))
+            .filter(posicao__lte=limite)
+            .order_by('posicao')
+            .values('evento_id', *CAMPOS)
+        )
+        for linha in linhas:
+            por_evento[linha['evento_id']].append(card_de_valores(linha))
+    return {evento.id: com_organizador(por_evento[evento.id], evento) for evento in eventos}
+
+
+def participantes_sob_demanda(eventos, limite=AVATARES_CARD):
+    """
+    Mesmo resultado de participantes_dos_cards, com cada lista lazy
+    (SimpleLazyObject): a única query, para todos os eventos, roda no
+    primeiro acesso a qualquer uma delas.
+    """
+    eventos = list(eventos)
+
+    @lru_cache(maxsize=None)
+    def carregar():
+        return participantes_dos_cards(eventos, limite)
+
+    return {
+        evento.id: SimpleLazyObject(lambda evento_id=evento.id: carregar()[evento_id])
+        for evento in eventos
+    }
@@ -0,0 +1,119 @@
+"""
+Reserva de vagas em eventos.
+
+A checagem de lotação e a gravação da participação acontecem na mesma
+transação curta, com a linha do evento travada (SELECT ... FOR UPDATE).
+Inscrições simultâneas no mesmo evento são serializadas e não há como duas
+requisições ocuparem a última vaga. As vagas ocupadas vêm dos contadores do
+próprio evento (Eventos.total_participantes), lidos junto com o lock.
+
+No SQLite o FOR UPDATE é ignorado; lá o mesmo efeito vem do BEGIN IMMEDIATE
+configurado em settings.DATABASES.
+
+Quem chega com o evento lotado entra na LISTA_ESPERA, e é promovido (por
+ordem de inscrição) quando alguém libera uma vaga.
+"""
+from collections import namedtuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Eventos, Participacao
+
+Reserva = namedtuple('Reserva', ['evento', 'participacao', 'vagas_ocupadas', 'ja_confirmado'])
+
+
+class InscricaoRecusada(Exception):
+    """Inscrição não permitida (organizador, evento encerrado...)"""
+
+    def __init__(self, mensagem):
+        super().__init__(mensagem)
+        self.mensagem = mensagem
+
+
+def _tem_vaga(evento, vagas_ocupadas):
+    return evento.maximo_participantes is None or vagas_ocupadas < evento.maximo_participantes
+
+
+def reservar_vaga(evento_id, perfil):
+    """
+    Inscreve o perfil no evento: CONFIRMADO se houver vaga, senão LISTA_ESPERA.
+
+    Levanta Eventos.DoesNotExist se o evento não existir e InscricaoRecusada
+    se a inscrição não for permitida.
+    """
+    with transaction.atomic():
+        evento = Eventos.objects.select_for_update().get(pk=evento_id)
+
+        if evento.organizador_id and evento.organizador_id == perfil.id:
+            raise InscricaoRecusada('Você é o organizador deste evento e já está automaticamente confirmado!')
+
+        participacao = Participacao.objects.filter(evento=evento, participante=perfil).first()
+
+        # Já ocupa uma vaga: apenas confirma (INSCRITO -> CONFIRMADO)
+        if participacao and participacao.status in Participacao.STATUS_OCUPAM_VAGA:
+            if participacao.status == 'INSCRITO':
+                participacao.status = 'CONFIRMADO'
+                participacao.save(update_fields=['status', 'updated_at'])
+            return Reserva(evento, participacao, evento.total_participantes, ja_confirmado=True)
+
+        # Novas inscrições (e reinscrições) só em eventos ativos
+        if evento.status_efetivo in ['CANCELADO', 'FINALIZADO']:
+            raise InscricaoRecusada(
+                f'Este evento não está mais disponível para inscrições. (Status: {evento.get_status_efetivo_display()})'
+            )
+
+        vagas_ocupadas = evento.total_participantes
+        if _tem_vaga(evento, vagas_ocupadas):
+            status = 'CONFIRMADO'
+            vagas_ocupadas += 1
+        else:
+            status = 'LISTA_ESPERA'
+
+        if participacao is None:
+            participacao = Participacao.objects.create(evento=evento, participante=perfil, status=status)
+        elif participacao.status != status:
+            # Reinscrição (CANCELADO/AUSENTE) ou nova tentativa de quem está na fila
+            participacao.status = status
+            participacao.data_cancelamento = None
+            participacao.save(update_fields=['status', 'data_cancelamento', 'updated_at'])
+
+        return Reserva(evento, participacao, vagas_ocupadas, ja_confirmado=False)
+
+
+def promover_lista_espera(evento_id):
+    """
+    Ocupa as vagas livres com a lista de espera, por ordem de inscrição.
+    Retorna as participações promovidas.
+    """
+    with transaction.atomic():
+        evento = Eventos.objects.select_for_update().get(pk=evento_id)
+        if evento.maximo_participantes is None:
+            livres = None
+        else:
+            livres = evento.maximo_participantes - evento.total_participantes
+            if livres <= 0:
+                return []
+
+        fila = evento.participacoes.filter(
+            status='LISTA_ESPERA',
+            participante__isnull=False,
+        ).order_by('data_inscricao', 'id')
+        promovidas = list(fila[:livres] if livres is not None else fila)
+        for participacao in promovidas:
+            participacao.status = 'CONFIRMADO'
+            participacao.save(update_fields=['status', 'updated_at'])
+        return promovidas
+
+
+def cancelar_participacao(participacao):
+    """Cancela a participação e repassa a vaga liberada para a lista de espera"""
+    with transaction.atomic():
+        # Trava o evento antes de mexer na participação (mesma ordem da reserva)
+        Eventos.objects.select_for_update().values_list('pk', flat=True).get(pk=participacao.evento_id)
+        ocupava_vaga = participacao.status in Participacao.STATUS_OCUPAM_VAGA
+        participacao.status = 'CANCELADO'
+        participacao.data_cancelamento = timezone.now()
+        participacao.save(update_fields=['status', 'data_cancelamento', 'updated_at'])
+        if ocupava_vaga:
+            promover_lista_espera(participacao.evento_id)
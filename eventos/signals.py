@@ -0,0 +1,126 @@
+"""
+Signals do app eventos.
+
+Mantêm em sincronia com os eventos e os endereços usados por eles:
+- o índice de busca textual (eventos/busca.py)
+- o cache das facetas da listagem (eventos/facetas.py)
+- a versão dos fragmentos de card em cache (eventos/cards.py)
+- as páginas em cache para anônimos (core/cache_paginas.py)
+- os contadores de participação de Eventos nas exclusões (criações e
+  mudanças de status são tratadas em Participacao.save)
+- os cards e páginas em cache quando as variantes da foto ficam prontas
+  (core/imagens.py)
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from core.cache_paginas import invalidar_paginas
+from core.imagens import variantes_geradas
+from core.models import Endereco
+from perfil.models import Perfil, Usuario
+
+from .busca import indexar_evento, reindexar_todos, remover_evento
+from .cards import invalidar_cards, invalidar_todos_cards
+from .facetas import invalidar_facetas
+from .models import Eventos, Participacao, atualizar_contadores
+
+
+@receiver(post_save, sender=Eventos)
+def indexar_evento_salvo(sender, instance, raw=False, **kwargs):
+    # Fixtures (loaddata) são indexadas depois com reindexar_busca
+    if raw:
+        return
+    indexar_evento(instance)
+
+
+@receiver(post_delete, sender=Eventos)
+def remover_evento_do_indice(sender, instance, **kwargs):
+    remover_evento(instance.pk)
+
+
+@receiver(post_save, sender=Endereco)
+def reindexar_eventos_do_endereco(sender, instance, raw=False, **kwargs):
+    # O local faz parte do documento de busca de cada evento no endereço
+    if raw:
+        return
+    reindexar_todos(instance.eventos.all())
+
+
+@receiver(post_save, sender=Eventos)
+@receiver(post_delete, sender=Eventos)
+@receiver(post_save, sender=Endereco)
+@receiver(post_delete, sender=Endereco)
+def invalidar_cache_facetas(sender, **kwargs):
+    # Após o commit, para que ninguém recalcule o cache com dados antigos
+    transaction.on_commit(invalidar_facetas)
+
+
+@receiver(post_save, sender=Eventos)
+@receiver(post_delete, sender=Eventos)
+@receiver(post_save, sender=Participacao)
+@receiver(post_delete, sender=Participacao)
+def invalidar_card_do_evento(sender, instance, **kwargs):
+    evento_id = instance.pk if sender is Eventos else instance.evento_id
+    if evento_id is not None:
+        transaction.on_commit(lambda: invalidar_cards([evento_id]))
+
+
+@receiver(post_save, sender=Endereco)
+def invalidar_cards_do_endereco(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    evento_ids = list(instance.eventos.values_list('pk', flat=True))
+    if evento_ids:
+        transaction.on_commit(lambda: invalidar_cards(evento_ids))
+
+
+@receiver(post_save, sender=Eventos)
+@receiver(post_delete, sender=Eventos)
+@receiver(post_save, sender=Participacao)
+@receiver(post_delete, sender=Participacao)
+@receiver(post_save, sender=Endereco)
+@receiver(post_delete, sender=Endereco)
+def invalidar_paginas_de_eventos(sender, **kwargs):
+    transaction.on_commit(lambda: invalidar_paginas('eventos'))
+
+
+@receiver(post_save, sender=Perfil)
+@receiver(post_delete, sender=Perfil)
+@receiver(post_save, sender=Usuario)
+def invalidar_caches_de_perfis(sender, update_fields=None, **kwargs):
+    # Nome e foto aparecem nos avatares de qualquer card. O login grava só
+    # last_login, que não aparece nos cards
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    transaction.on_commit(invalidar_todos_cards)
+    transaction.on_commit(lambda: invalidar_paginas('perfis'))
+
+
+@receiver(post_delete, sender=Participacao)
+def descontar_participacao_excluida(sender, instance, **kwargs):
+    # Vale também para exclusões em massa (queryset.delete e admin)
+    atualizar_contadores(getattr(instance, '_contagem_salva', instance.chave_contagem()), -1)
+
+
+@receiver(pre_delete, sender=Perfil)
+def guardar_eventos_do_perfil(sender, instance, **kwargs):
+    # O SET_NULL em participante/organizador é um UPDATE direto, sem passar
+    # por Participacao.save; os eventos afetados são recontados depois
+    instance._eventos_afetados = list(
+        Eventos.objects.filter(participacoes__participante=instance).values_list('pk', flat=True)
+    ) + list(instance.eventos_organizados.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Perfil)
+def recontar_eventos_do_perfil(sender, instance, **kwargs):
+    eventos_afetados = getattr(instance, '_eventos_afetados', None)
+    if eventos_afetados:
+        Eventos.objects.filter(pk__in=eventos_afetados).recontar_participacoes()
+
+
+@receiver(variantes_geradas, sender=Eventos)
+def invalidar_cards_com_foto_nova(sender, pks, **kwargs):
+    # Os cards passam a usar a variante redimensionada da foto
+    invalidar_cards(pks)
+    invalidar_paginas('eventos')
@@ -83,8 +83,25 @@ window.confirmarPresenca = function confirmarPresenca() {
   })
   .then(data => {
     console.log('Dados recebidos:', data);
-    if (data.success) {
+    if (data.success && data.lista_espera) {
+      // Evento lotado: inscrição ficou na lista de espera (sem grupo do WhatsApp)
+      alert(data.message);
+      const btnConfirmar = document.getElementById('btn-confirmar');
+      if (btnConfirmar) {
+        btnConfirmar.textContent = 'Lista de espera';
+        btnConfirmar.classList.add('btn-lista-espera');
+        btnConfirmar.disabled = true;
+      }
+    } else if (data.success) {
       confirmado = true;
+      // Link do grupo só vem na resposta de quem ganhou a vaga
+      if (data.grupo_whatsapp) {
+        window.GRUPO_WHATSAPP = data.grupo_whatsapp;
+        const linkModal = document.getElementById('modal-whatsapp-link');
+        if (linkModal) {
+          linkModal.href = data.grupo_whatsapp;
+        }
+      }
       // Atualiza o total de confirmados com o valor retornado pelo servidor
       confirmadosAtual = data.total_confirmados || confirmadosAtual + 1;
       console.log('Confirmação bem-sucedida! Total atualizado:', confirmadosAtual);
@@ -1,3 +1,807 @@
-from django.test import TestCase
+import threading
+from datetime import date, timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Endereco
+from perfil.models import Perfil, Usuario
+
+from .busca import buscar, reindexar_todos
+from .cards import _chaves_versao, versoes_cards
+from .facetas import obter_facetas
+from .models import Eventos, Participacao, participacoes_ativas
+from .participantes import ParticipanteCard, participantes_dos_cards
+from .reservas import cancelar_participacao
+from .visitante import SEM_RELACAO, status_anotado, status_do_visitante
+
+# Hash rápido: os testes criam muitos usuários
+HASH_RAPIDO = override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+
+
+def criar_perfil(indice):
+    usuario = Usuario.objects.create_user(
+        email=f'pessoa{indice}@simbora.test',
+        password='senha',
+        first_name=f'Pessoa{indice}',
+        last_name='Teste',
+    )
+    return Perfil.objects.create(usuario=usuario, data_nascimento=date(1990, 1, 1))
+
+
+def criar_evento(organizador, maximo_participantes):
+    inicio = timezone.now() + timedelta(days=7)
+    return Eventos.objects.create(
+        nome_evento='Trilha de teste',
+        organizador=organizador,
+        data_inicio=inicio,
+        data_termino=inicio + timedelta(hours=4),
+        maximo_participantes=maximo_participantes,
+    )
+
+
+@HASH_RAPIDO
+class ConfirmarPresencaTests(TestCase):
+    def setUp(self):
+        self.organizador = criar_perfil(0)
+        # Organizador ocupa uma das duas vagas
+        self.evento = criar_evento(self.organizador, maximo_participantes=2)
+        self.url = reverse('eventos:confirmar_presenca', args=[self.evento.id])
+
+    def confirmar(self, perfil):
+        self.client.force_login(perfil.usuario)
+        return self.client.post(self.url)
+
+    def test_confirma_enquanto_houver_vaga(self):
+        resposta = self.confirmar(criar_perfil(1))
+
+        self.assertEqual(resposta.status_code, 200)
+        self.assertFalse(resposta.json()['lista_espera'])
+        self.assertEqual(resposta.json()['total_confirmados'], 2)
+        self.assertEqual(Participacao.objects.get(evento=self.evento).status, 'CONFIRMADO')
+
+    def test_evento_lotado_vai_para_lista_de_espera(self):
+        self.confirmar(criar_perfil(1))
+        atrasado = criar_perfil(2)
+
+        resposta = self.confirmar(atrasado)
+
+        self.assertEqual(resposta.status_code, 200)
+        self.assertTrue(resposta.json()['lista_espera'])
+        self.assertIsNone(resposta.json()['grupo_whatsapp'])
+        participacao = Participacao.objects.get(evento=self.evento, participante=atrasado)
+        self.assertEqual(participacao.status, 'LISTA_ESPERA')
+
+    def test_confirmar_de_novo_nao_duplica(self):
+        perfil = criar_perfil(1)
+        self.confirmar(perfil)
+
+        resposta = self.confirmar(perfil)
+
+        self.assertTrue(resposta.json()['ja_confirmado'])
+        self.assertEqual(Participacao.objects.filter(evento=self.evento).count(), 1)
+
+    def test_organizador_nao_se_inscreve(self):
+        resposta = self.confirmar(self.organizador)
+
+        self.assertEqual(resposta.status_code, 400)
+        self.assertFalse(Participacao.objects.exists())
+
+    def test_lista_de_espera_nao_ve_no_role_nem_o_grupo(self):
+        Eventos.objects.filter(pk=self.evento.pk).update(grupo_whatsapp='https://chat.whatsapp.com/grupo')
+        self.confirmar(criar_perfil(1))
+        self.assertTrue(self.confirmar(criar_perfil(2)).json()['lista_espera'])
+
+        resposta = self.client.get(reverse('eventos:visualizar_evento', args=[self.evento.id]))
+        self.assertContains(resposta, 'Lista de espera')
+        self.assertNotContains(resposta, 'NO ROLÊ!')
+        self.assertNotContains(resposta, 'chat.whatsapp.com/grupo')
+        self.assertFalse(resposta.context['usuario_confirmado'])
+        self.assertTrue(resposta.context['na_lista_espera'])
+
+        # Quem tem vaga continua vendo o grupo
+        self.client.force_login(self.organizador.usuario)
+        self.assertContains(self.client.get(reverse('eventos:visualizar_evento', args=[self.evento.id])), 'chat.whatsapp.com/grupo')
+
+    def test_saida_promove_lista_de_espera(self):
+        primeiro = criar_perfil(1)
+        segundo = criar_perfil(2)
+        self.confirmar(primeiro)
+        self.confirmar(segundo)
+
+        cancelar_participacao(Participacao.objects.get(evento=self.evento, participante=primeiro))
+
+        participacao = Participacao.objects.get(evento=self.evento, participante=segundo)
+        self.assertEqual(participacao.status, 'CONFIRMADO')
+
+
+@HASH_RAPIDO
+class ConfirmarPresencaConcorrenciaTests(TransactionTestCase):
+    """Várias requisições simultâneas disputando as mesmas vagas"""
+
+    participantes = 12
+    vagas = 5
+
+    def test_inscricoes_simultaneas_nao_excedem_vagas(self):
+        organizador = criar_perfil(0)
+        evento = criar_evento(organizador, maximo_participantes=self.vagas)
+        perfis = [criar_perfil(i) for i in range(1, self.participantes + 1)]
+        url = reverse('eventos:confirmar_presenca', args=[evento.id])
+
+        largada = threading.Barrier(len(perfis))
+        respostas = []
+        erros = []
+
+        def inscrever(perfil):
+            client = Client()
+            client.force_login(perfil.usuario)
+            try:
+                largada.wait()
+                respostas.append(client.post(url))
+            except Exception as e:
+                erros.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=inscrever, args=(perfil,)) for perfil in perfis]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(erros, [])
+        self.assertEqual([r.status_code for r in respostas], [200] * len(perfis))
+        confirmados = Participacao.objects.filter(evento=evento, status='CONFIRMADO').count()
+        na_fila = Participacao.objects.filter(evento=evento, status='LISTA_ESPERA').count()
+        # Uma das vagas é do organizador
+        self.assertEqual(confirmados, self.vagas - 1)
+        self.assertEqual(na_fila, len(perfis) - (self.vagas - 1))
+
+
+@HASH_RAPIDO
+class ContadoresParticipacaoTests(TestCase):
+    def setUp(self):
+        self.organizador = criar_perfil(0)
+        self.evento = criar_evento(self.organizador, maximo_participantes=None)
+        self.perfis = [criar_perfil(indice) for indice in range(1, 4)]
+
+    def contadores(self):
+        self.evento.refresh_from_db()
+        return (
+            self.evento.total_participantes_ativos,
+            self.evento.total_confirmados,
+            self.evento.total_lista_espera,
+        )
+
+    def test_deltas_ao_salvar_e_excluir(self):
+        primeira = Participacao.objects.create(evento=self.evento, participante=self.perfis[0], status='CONFIRMADO')
+        segunda = Participacao.objects.create(evento=self.evento, participante=self.perfis[1], status='LISTA_ESPERA')
+        self.assertEqual(self.contadores(), (1, 1, 1))
+
+        # Lista de espera -> confirmado; confirmado -> cancelado
+        segunda.status = 'CONFIRMADO'
+        segunda.save()
+        primeira.status = 'CANCELADO'
+        primeira.save()
+        self.assertEqual(self.contadores(), (1, 1, 0))
+
+        # Salvar sem mudar o status não altera nada
+        segunda.save()
+        self.assertEqual(self.contadores(), (1, 1, 0))
+
+        segunda.delete()
+        primeira.delete()
+        self.assertEqual(self.contadores(), (0, 0, 0))
+
+    def test_participacao_do_organizador_nao_conta(self):
+        Participacao.objects.create(evento=self.evento, participante=self.organizador, status='CONFIRMADO')
+        self.assertEqual(self.contadores(), (0, 0, 0))
+
+    def test_exclusao_de_perfil_reconta(self):
+        Participacao.objects.create(evento=self.evento, participante=self.perfis[0], status='CONFIRMADO')
+        Participacao.objects.create(evento=self.evento, participante=self.perfis[1], status='LISTA_ESPERA')
+
+        # A participação fica com participante nulo (SET_NULL) e sai das contagens
+        self.perfis[0].delete()
+        self.assertEqual(self.contadores(), (0, 0, 1))
+        self.assertTrue(Participacao.objects.filter(evento=self.evento, participante__isnull=True).exists())
+
+    def test_troca_de_organizador_reconta(self):
+        Participacao.objects.create(evento=self.evento, participante=self.perfis[0], status='CONFIRMADO')
+        Participacao.objects.create(evento=self.evento, participante=self.organizador, status='CONFIRMADO')
+        self.assertEqual(self.contadores(), (1, 1, 0))
+
+        evento = Eventos.objects.get(pk=self.evento.pk)
+        evento.organizador = self.perfis[0]
+        evento.save()
+        # Sai a participação do novo organizador, entra a do antigo
+        self.assertEqual(self.contadores(), (1, 1, 0))
+
+        evento.organizador = self.perfis[1]
+        evento.save()
+        self.assertEqual(self.contadores(), (2, 2, 0))
+
+    def test_comando_recontar_participacoes(self):
+        Participacao.objects.create(evento=self.evento, participante=self.perfis[0], status='CONFIRMADO')
+        Participacao.objects.create(evento=self.evento, participante=self.perfis[1], status='LISTA_ESPERA')
+        # Cargas que não passam pelo save(): contadores divergentes
+        Eventos.objects.filter(pk=self.evento.pk).update(
+            total_participantes_ativos=7, total_confirmados=7, total_lista_espera=7,
+        )
+
+        saida = StringIO()
+        call_command('recontar_participacoes', evento=[self.evento.pk], stdout=saida)
+
+        self.assertEqual(self.contadores(), (1, 1, 1))
+        self.assertIn('1 evento(s)', saida.getvalue())
+
+    def test_participacoes_ativas_sem_lista_de_espera(self):
+        Participacao.objects.create(evento=self.evento, participante=self.perfis[0], status='CONFIRMADO')
+        Participacao.objects.create(evento=self.evento, participante=self.perfis[1], status='LISTA_ESPERA')
+        Participacao.objects.create(evento=self.evento, participante=self.perfis[2], status='CANCELADO')
+
+        ativas = participacoes_ativas().filter(evento=self.evento)
+        self.assertEqual(list(ativas.values_list('participante_id', flat=True)), [self.perfis[0].pk])
+
+
+@HASH_RAPIDO
+@override_settings(EVENTOS_POR_PAGINA=2)
+class CarregarMaisEventosTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        organizador = criar_perfil(0)
+        self.eventos = [criar_evento(organizador, maximo_participantes=None) for _ in range(5)]
+        self.url = reverse('eventos:carregar_mais_eventos')
+
+    def test_percorre_todas_as_paginas_sem_repetir(self):
+        primeira = self.client.get(reverse('eventos:lista_eventos'))
+        vistos = [info['evento'].id for info in primeira.context['eventos_com_info']]
+        cursor = primeira.context['proximo_cursor']
+        while cursor:
+            dados = self.client.get(self.url, {'cursor': cursor}).json()
+            self.assertTrue(dados['success'])
+            self.assertIn('Trilha de teste', dados['html'])
+            vistos += [
+                evento.id for evento in self.eventos
+                if f'"{reverse("eventos:visualizar_evento", args=[evento.id])}"' in dados['html']
+            ]
+            cursor = dados['proximo_cursor']
+        self.assertCountEqual(vistos, [evento.id for evento in self.eventos])
+
+    def test_cursor_invalido_responde_400(self):
+        resposta = self.client.get(self.url, {'cursor': 'xyz'})
+        self.assertEqual(resposta.status_code, 400)
+        self.assertFalse(resposta.json()['success'])
+
+
+@HASH_RAPIDO
+class BuscaEventosTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizador = criar_perfil(0)
+
+    def evento(self, nome, descricao='', endereco=None):
+        evento = criar_evento(self.organizador, maximo_participantes=None)
+        evento.nome_evento = nome
+        evento.descricao = descricao
+        evento.endereco = endereco
+        evento.save()
+        return evento
+
+    def encontrados(self, texto):
+        return list(buscar(Eventos.objects.all(), texto).order_by('-rank_busca', '-id').values_list('id', flat=True))
+
+    def test_nome_vale_mais_que_descricao_e_local(self):
+        parque = Endereco.objects.create(
+            nome_do_local='Parque da Trilha', rua='Rua A', numero='1', bairro='Centro',
+            cidade='Recife', estado='PE', cep='50000-000',
+        )
+        no_local = self.evento('Piquenique', endereco=parque)
+        na_descricao = self.evento('Caminhada', descricao='Uma trilha leve')
+        no_nome = self.evento('Trilha do Pico')
+        self.evento('Pedal noturno')
+
+        self.assertEqual(self.encontrados('trilha'), [no_nome.id, na_descricao.id, no_local.id])
+        # Sem acento e por prefixo
+        self.assertEqual(self.encontrados('TRÍLH'), [no_nome.id, na_descricao.id, no_local.id])
+        # Só pontuação: nenhum resultado, e a listagem não quebra
+        self.assertEqual(self.encontrados('!!!'), [])
+        self.assertEqual(self.client.get(reverse('eventos:lista_eventos'), {'busca': '!!!'}).status_code, 200)
+
+    def test_indice_acompanha_save_delete_e_endereco(self):
+        evento = self.evento('Pedal noturno')
+        self.assertEqual(self.encontrados('pedal'), [evento.id])
+
+        evento.nome_evento = 'Corrida noturna'
+        evento.save()
+        self.assertEqual(self.encontrados('pedal'), [])
+        self.assertEqual(self.encontrados('corrida'), [evento.id])
+
+        endereco = Endereco.objects.create(rua='Rua A', numero='1', bairro='Centro', cidade='Olinda', estado='PE', cep='53000-000')
+        evento.endereco = endereco
+        evento.save()
+        endereco.cidade = 'Recife'
+        endereco.save()
+        self.assertEqual(self.encontrados('olinda'), [])
+        self.assertEqual(self.encontrados('recife'), [evento.id])
+
+        evento.delete()
+        self.assertEqual(self.encontrados('corrida'), [])
+
+    def test_reindexar_todos_num_comando(self):
+        eventos = [self.evento(f'Trilha {indice}') for indice in range(3)]
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM eventos_busca_fts')
+        self.assertEqual(self.encontrados('trilha'), [])
+
+        with self.assertNumQueries(2):
+            self.assertEqual(reindexar_todos(Eventos.objects.all()), 3)
+        self.assertCountEqual(self.encontrados('trilha'), [evento.id for evento in eventos])
+
+    @override_settings(EVENTOS_POR_PAGINA=2)
+    def test_busca_com_paginacao_por_cursor(self):
+        eventos = [self.evento(f'Trilha {indice}', descricao='trilha ' * indice) for indice in range(5)]
+        self.evento('Pedal')
+
+        primeira = self.client.get(reverse('eventos:lista_eventos'), {'busca': 'trilha'})
+        vistos = [info['evento'].id for info in primeira.context['eventos_com_info']]
+        cursor = primeira.context['proximo_cursor']
+        while cursor:
+            resposta = self.client.get(reverse('eventos:lista_eventos'), {'busca': 'trilha', 'cursor': cursor})
+            vistos += [info['evento'].id for info in resposta.context['eventos_com_info']]
+            cursor = resposta.context['proximo_cursor']
+
+        # Todos os resultados, uma vez cada, na ordem de relevância
+        self.assertEqual(vistos, self.encontrados('trilha'))
+        self.assertCountEqual(vistos, [evento.id for evento in eventos])
+
+
+@HASH_RAPIDO
+class CardsEmCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizador = criar_perfil(0)
+        self.evento = criar_evento(self.organizador, maximo_participantes=None)
+        self.url = reverse('eventos:lista_eventos')
+
+    def test_card_vem_do_cache_ate_o_evento_mudar(self):
+        self.client.get(self.url)
+        # update() não dispara signals: o card em cache continua com o nome antigo
+        Eventos.objects.filter(pk=self.evento.pk).update(nome_evento='Nome sem signal')
+        self.assertContains(self.client.get(self.url), 'Trilha de teste')
+
+        self.evento.nome_evento = 'Trilha renomeada'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.evento.save()
+        self.assertContains(self.client.get(self.url), 'Trilha renomeada')
+
+    def test_versao_expulsa_do_cache_rerenderiza_o_card(self):
+        # Logado: fora do cache de página anônima, só os fragmentos em jogo
+        self.client.force_login(self.organizador.usuario)
+        self.client.get(self.url)
+        versao = versoes_cards([self.evento.id])[self.evento.id]
+        self.assertEqual(versoes_cards([self.evento.id])[self.evento.id], versao)
+        Eventos.objects.filter(pk=self.evento.pk).update(nome_evento='Nome sem signal')
+
+        # Chave da versão expulsa (LRU, reinício): versão nova, nunca a de antes
+        cache.delete_many(list(_chaves_versao([self.evento.id])))
+
+        self.assertContains(self.client.get(self.url), 'Nome sem signal')
+        self.assertNotEqual(versoes_cards([self.evento.id])[self.evento.id], versao)
+
+    def test_nova_participacao_troca_a_versao_do_card(self):
+        participante = criar_perfil(1)
+        outro_evento = criar_evento(self.organizador, maximo_participantes=None)
+        versoes = versoes_cards([self.evento.id, outro_evento.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            Participacao.objects.create(evento=self.evento, participante=participante, status='CONFIRMADO')
+
+        depois = versoes_cards([self.evento.id, outro_evento.id])
+        self.assertNotEqual(depois[self.evento.id], versoes[self.evento.id])
+        self.assertEqual(depois[outro_evento.id], versoes[outro_evento.id])
+
+    def test_cards_no_cache_nao_consultam_participantes(self):
+        Participacao.objects.create(evento=self.evento, participante=criar_perfil(1), status='CONFIRMADO')
+        self.client.force_login(self.organizador.usuario)
+        for url in (self.url, reverse('home')):
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as primeira:
+                    self.assertContains(self.client.get(url), 'Trilha de teste')
+                with CaptureQueriesContext(connection) as segunda:
+                    self.assertContains(self.client.get(url), 'Trilha de teste')
+                # Todos os fragmentos vieram do cache: a query dos avatares não roda
+                self.assertTrue(any('ROW_NUMBER' in q['sql'] for q in primeira))
+                self.assertFalse(any('ROW_NUMBER' in q['sql'] for q in segunda))
+
+    def test_badge_do_visitante_fica_fora_do_cache(self):
+        self.client.force_login(self.organizador.usuario)
+        self.assertContains(self.client.get(self.url), 'event-viewer-badge">Host')
+
+        self.client.force_login(criar_perfil(1).usuario)
+        resposta = self.client.get(self.url)
+        self.assertContains(resposta, 'Trilha de teste')
+        self.assertNotContains(resposta, 'event-viewer-badge">Host')
+
+
+@HASH_RAPIDO
+class GetCondicionalEventoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizador = criar_perfil(0)
+        self.evento = criar_evento(self.organizador, maximo_participantes=10)
+        self.url = reverse('eventos:visualizar_evento', args=[self.evento.id])
+        self.client.force_login(self.organizador.usuario)
+
+    def test_visita_repetida_responde_304_so_com_o_validador(self):
+        resposta = self.client.get(self.url)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIn('private', resposta['Cache-Control'])
+        self.assertIn('no-cache', resposta['Cache-Control'])
+
+        # Usuário + perfil da sessão e o validador; nada dos participantes
+        with self.assertNumQueries(2):
+            resposta = self.client.get(self.url, HTTP_IF_NONE_MATCH=resposta['ETag'])
+        self.assertEqual(resposta.status_code, 304)
+
+    def test_nova_participacao_muda_o_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        Participacao.objects.create(evento=self.evento, participante=criar_perfil(1), status='CONFIRMADO')
+
+        resposta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertNotEqual(resposta['ETag'], etag)
+
+    def test_if_modified_since_sozinho_nao_esconde_cancelamento(self):
+        participante = criar_perfil(1)
+        participacao = Participacao.objects.create(evento=self.evento, participante=participante, status='CONFIRMADO')
+        resposta = self.client.get(self.url)
+        self.assertNotIn('Last-Modified', resposta)
+        antes = participacao.updated_at
+
+        cancelar_participacao(participacao)
+        participacao.refresh_from_db()
+        self.assertGreater(participacao.updated_at, antes)
+
+        # Data no futuro: com Last-Modified, qualquer versão daria 304
+        resposta = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE='Sat, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(resposta.status_code, 200)
+
+    def test_etag_depende_de_quem_esta_vendo(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.force_login(criar_perfil(1).usuario)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_resumo_json_tambem_responde_304(self):
+        url = reverse('eventos:resumo_evento', args=[self.evento.id])
+        resposta = self.client.get(url)
+        self.assertEqual(resposta.json()['total_confirmados'], 1)
+        self.assertTrue(resposta.json()['eh_organizador'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=resposta['ETag']).status_code, 304)
+
+    def test_evento_inexistente_continua_404(self):
+        self.assertEqual(self.client.get(reverse('eventos:visualizar_evento', args=[999999])).status_code, 404)
+
+
+@HASH_RAPIDO
+class ParticipantesDosCardsTests(TestCase):
+    def setUp(self):
+        self.organizador = criar_perfil(0)
+        self.eventos = [criar_evento(self.organizador, maximo_participantes=None) for _ in range(2)]
+        perfis = [criar_perfil(indice) for indice in range(1, 6)]
+        for perfil in perfis:
+            Participacao.objects.create(evento=self.eventos[0], participante=perfil, status='CONFIRMADO')
+        Participacao.objects.create(evento=self.eventos[1], participante=perfis[0], status='CANCELADO')
+        self.perfis = perfis
+
+    def test_limite_por_evento_com_organizador_no_inicio(self):
+        eventos = list(Eventos.objects.filter(pk__in=[e.pk for e in self.eventos]).para_card())
+        with self.assertNumQueries(1):
+            participantes = participantes_dos_cards(eventos, limite=3)
+
+        cards = participantes[self.eventos[0].id]
+        self.assertEqual([card.perfil_id for card in cards], [self.organizador.id] + [p.id for p in self.perfis[:1:-1]])
+        self.assertIsInstance(cards[0], ParticipanteCard)
+        self.assertEqual(cards[1].nome, 'Pessoa5 Teste')
+        self.assertEqual(cards[1].status_display, 'Confirmado')
+        # Participação cancelada não aparece: só o organizador
+        self.assertEqual([card.perfil_id for card in participantes[self.eventos[1].id]], [self.organizador.id])
+
+    def test_nome_social_e_imagem_do_perfil(self):
+        perfil = self.perfis[-1]
+        perfil.nome_social = 'Apelido'
+        perfil.imagem_url = 'https://exemplo.test/foto.png'
+        perfil.save()
+
+        card = participantes_dos_cards([Eventos.objects.para_card().get(pk=self.eventos[0].pk)])[self.eventos[0].id][1]
+        self.assertEqual((card.nome, card.avatar_url), ('Apelido', 'https://exemplo.test/foto.png'))
+
+    def test_card_sem_textos_longos_nem_cpf_do_organizador(self):
+        Eventos.objects.filter(pk=self.eventos[0].pk).update(descricao='palavra ' * 200, regras='regra')
+        evento = Eventos.objects.para_card().get(pk=self.eventos[0].pk)
+
+        self.assertTrue({'descricao', 'regras', 'documento_busca'} <= evento.get_deferred_fields())
+        self.assertTrue({'cpf', 'descricao'} <= evento.organizador.get_deferred_fields())
+        self.assertEqual(len(evento.descricao_resumo), 300)
+        with self.assertNumQueries(0):
+            self.assertEqual(evento.organizador.nome_completo, 'Pessoa0 Teste')
+
+
+@HASH_RAPIDO
+class QueriesParticipantesTests(TestCase):
+    """Páginas com participantes: mesmo número de queries com 5 ou 500 pessoas"""
+
+    def criar_evento_com_participantes(self, total):
+        evento = criar_evento(self.organizador, maximo_participantes=None)
+        usuarios = Usuario.objects.bulk_create([
+            Usuario(
+                email=f'evento{evento.id}-{indice}@simbora.test',
+                username=f'evento{evento.id}-{indice}@simbora.test',
+                first_name=f'Pessoa{indice}',
+            )
+            for indice in range(total)
+        ])
+        perfis = Perfil.objects.bulk_create([
+            Perfil(usuario=usuario, data_nascimento=date(1990, 1, 1)) for usuario in usuarios
+        ])
+        Participacao.objects.bulk_create([
+            Participacao(evento=evento, participante=perfil, status='CONFIRMADO') for perfil in perfis
+        ])
+        Eventos.objects.filter(pk=evento.pk).recontar_participacoes()
+        return evento
+
+    def contar_queries(self, nome_url, evento):
+        with CaptureQueriesContext(connection) as queries:
+            resposta = self.client.get(reverse(nome_url, args=[evento.id]))
+        self.assertEqual(resposta.status_code, 200)
+        return len(queries)
+
+    def setUp(self):
+        cache.clear()
+        self.organizador = criar_perfil(0)
+        self.client.force_login(self.organizador.usuario)
+        self.pequeno = self.criar_evento_com_participantes(5)
+        self.grande = self.criar_evento_com_participantes(500)
+
+    def test_visualizar_evento_queries_constantes(self):
+        self.assertEqual(
+            self.contar_queries('eventos:visualizar_evento', self.pequeno),
+            self.contar_queries('eventos:visualizar_evento', self.grande),
+        )
+
+    def test_participantes_evento_queries_constantes(self):
+        pequeno = self.contar_queries('eventos:participantes_evento', self.pequeno)
+        self.assertEqual(pequeno, self.contar_queries('eventos:participantes_evento', self.grande))
+        self.assertContains(
+            self.client.get(reverse('eventos:participantes_evento', args=[self.grande.id])),
+            'class="participante-card"', count=501,
+        )
+
+
+@HASH_RAPIDO
+class ListaEventosCardsTests(TestCase):
+    """Cards da listagem: resumo anotado e queries fixas por página"""
+
+    def setUp(self):
+        self.organizador = criar_perfil(0)
+        self.perfis = [criar_perfil(indice) for indice in range(1, 4)]
+        self.client.force_login(self.organizador.usuario)
+
+    def criar_eventos(self, total):
+        for _ in range(total):
+            evento = criar_evento(self.organizador, maximo_participantes=None)
+            for perfil in self.perfis:
+                Participacao.objects.create(evento=evento, participante=perfil, status='CONFIRMADO')
+
+    def contar_queries(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            resposta = self.client.get(reverse('eventos:lista_eventos'))
+        self.assertEqual(resposta.status_code, 200)
+        return len(queries)
+
+    def test_resumo_do_card_sem_queries_extras(self):
+        evento = criar_evento(self.organizador, maximo_participantes=10)
+        Eventos.objects.filter(pk=evento.pk).update(descricao='x' * 1000)
+        Participacao.objects.create(evento=evento, participante=self.perfis[0], status='CONFIRMADO')
+        Participacao.objects.create(evento=evento, participante=self.perfis[1], status='CANCELADO')
+
+        card = Eventos.objects.para_card().get(pk=evento.pk)
+        with self.assertNumQueries(0):
+            # Organizador + um confirmado; o cancelado não conta
+            self.assertEqual(card.total_participantes, 2)
+            self.assertEqual(card.percentual_ocupacao, 20)
+            self.assertEqual(len(card.descricao_resumo), 300)
+            self.assertEqual(card.organizador.usuario.first_name, 'Pessoa0')
+
+        # Nome antigo: mesma query de para_card()
+        self.assertEqual(
+            str(Eventos.objects.com_resumo_participacao().query),
+            str(Eventos.objects.para_card().query),
+        )
+
+    def test_lista_com_queries_constantes(self):
+        self.criar_eventos(2)
+        poucos = self.contar_queries()
+        self.criar_eventos(8)
+        self.assertEqual(self.contar_queries(), poucos)
+
+
+@HASH_RAPIDO
+class ExpirarEventosTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizador = criar_perfil(0)
+        self.futuro = criar_evento(self.organizador, maximo_participantes=None)
+        self.vencidos = [criar_evento(self.organizador, maximo_participantes=None) for _ in range(3)]
+        ontem = timezone.now() - timedelta(days=1)
+        Eventos.objects.filter(pk__in=[evento.pk for evento in self.vencidos]).update(
+            data_inicio=ontem - timedelta(hours=4), data_termino=ontem,
+        )
+
+    def test_paginas_nao_escrevem_no_banco(self):
+        self.client.force_login(self.organizador.usuario)
+        urls = [
+            reverse('home'),
+            reverse('eventos:lista_eventos'),
+            reverse('eventos:visualizar_evento', args=[self.vencidos[0].id]),
+        ]
+        for url in urls:
+            with self.subTest(url=url), CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            self.assertFalse([q['sql'] for q in queries if q['sql'].startswith('UPDATE')])
+
+        # Vencido já sai da listagem e aparece como finalizado, sem gravar o status
+        self.assertEqual(list(Eventos.objects.ativos()), [self.futuro])
+        vencido = Eventos.objects.get(pk=self.vencidos[0].pk)
+        self.assertEqual((vencido.status, vencido.status_efetivo), ('ATIVO', 'FINALIZADO'))
+
+    def test_comando_finaliza_em_lotes(self):
+        saida = StringIO()
+        call_command('expirar_eventos', lote=2, stdout=saida)
+
+        self.assertIn('3 evento(s)', saida.getvalue())
+        self.assertEqual(Eventos.objects.filter(status='FINALIZADO').count(), 3)
+        self.assertEqual(Eventos.objects.get(pk=self.futuro.pk).status, 'ATIVO')
+        self.assertEqual(Eventos.objects.finalizar_vencidos(), 0)
+
+
+@HASH_RAPIDO
+class FacetasTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizador = criar_perfil(0)
+        self.recife = Endereco.objects.create(rua='Rua A', numero='1', bairro='Centro', cidade='Recife', estado='PE', cep='50000-000')
+
+    def evento(self, categoria, endereco=None):
+        evento = criar_evento(self.organizador, maximo_participantes=None)
+        evento.categoria = categoria
+        evento.endereco = endereco
+        evento.save()
+        return evento
+
+    def test_contagens_dos_eventos_ativos(self):
+        self.evento('ESPORTE', self.recife)
+        self.evento('ESPORTE')
+        cancelado = self.evento('ESPORTE', self.recife)
+        Eventos.objects.filter(pk=cancelado.pk).update(status='CANCELADO')
+
+        facetas = obter_facetas()
+        self.assertEqual(facetas['cidades'], [('Recife', 1)])
+        categorias = {valor: total for valor, _, total in facetas['categorias']}
+        self.assertEqual(categorias['ESPORTE'], 2)
+        # Todas as categorias aparecem no filtro, mesmo sem eventos
+        self.assertEqual(len(categorias), len(Eventos.CATEGORIA_CHOICES))
+
+    def test_vem_do_cache_ate_um_evento_mudar(self):
+        obter_facetas()
+        with self.assertNumQueries(0):
+            self.assertEqual(obter_facetas()['cidades'], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.evento('ESPORTE', self.recife)
+        self.assertEqual(obter_facetas()['cidades'], [('Recife', 1)])
+
+
+@HASH_RAPIDO
+class StatusVisitanteTests(TestCase):
+    def setUp(self):
+        self.organizador = criar_perfil(0)
+        self.visitante = criar_perfil(1)
+        self.eventos = [criar_evento(self.organizador, maximo_participantes=None) for _ in range(4)]
+        self.proprio = criar_evento(self.visitante, maximo_participantes=None)
+        for evento, status in zip(self.eventos, ['CONFIRMADO', 'LISTA_ESPERA', 'CANCELADO']):
+            Participacao.objects.create(evento=evento, participante=self.visitante, status=status)
+
+    def test_lista_inteira_em_uma_query(self):
+        eventos = list(Eventos.objects.filter(pk__in=[e.pk for e in self.eventos + [self.proprio]]))
+        with self.assertNumQueries(1):
+            status = status_do_visitante(eventos, self.visitante)
+
+        confirmado, espera, cancelado, sem_relacao = (status[evento.id] for evento in self.eventos)
+        self.assertTrue(confirmado.inscrito and confirmado.confirmado)
+        # Lista de espera não ocupa vaga: não conta como inscrito nem confirmado
+        self.assertTrue(espera.na_lista_espera and espera.participa)
+        self.assertFalse(espera.inscrito or espera.ocupa_vaga or espera.confirmado)
+        self.assertTrue(cancelado.cancelado and not cancelado.inscrito)
+        self.assertEqual(sem_relacao, SEM_RELACAO)
+        self.assertTrue(status[self.proprio.id].eh_organizador and status[self.proprio.id].confirmado)
+
+        # Anotado na própria query dos eventos: mesmo resultado
+        anotados = Eventos.objects.filter(pk__in=[e.pk for e in self.eventos]).com_status_visitante(self.visitante)
+        for evento in anotados:
+            self.assertEqual(status_anotado(evento, self.visitante), status[evento.id])
+
+    def test_anonimo_sem_queries(self):
+        with self.assertNumQueries(0):
+            status = status_do_visitante(self.eventos, None)
+        self.assertEqual(set(status.values()), {SEM_RELACAO})
+
+    def test_home_mostra_lista_de_espera_e_nao_no_role(self):
+        cache.clear()
+        Eventos.objects.exclude(pk=self.eventos[1].pk).delete()
+        self.client.force_login(self.visitante.usuario)
+
+        conteudo = self.client.get(reverse('home')).content.decode()
+
+        self.assertIn('Trilha de teste', conteudo)
+        self.assertIn('Lista de espera', conteudo)
+        self.assertNotIn('Você está no rolê!', conteudo)
+
+
+@HASH_RAPIDO
+class MeusEventosTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.perfil = criar_perfil(0)
+        outro = criar_perfil(1)
+        self.organiza = criar_evento(self.perfil, maximo_participantes=None)
+        self.organiza_cancelado = criar_evento(self.perfil, maximo_participantes=None)
+        Eventos.objects.filter(pk=self.organiza_cancelado.pk).update(status='CANCELADO')
+        self.inscrito = criar_evento(outro, maximo_participantes=None)
+        self.desistiu = criar_evento(outro, maximo_participantes=None)
+        self.terminou = criar_evento(outro, maximo_participantes=None)
+        ontem = timezone.now() - timedelta(days=1)
+        Eventos.objects.filter(pk=self.terminou.pk).update(data_inicio=ontem - timedelta(hours=2), data_termino=ontem)
+        for evento, status in [(self.inscrito, 'CONFIRMADO'), (self.desistiu, 'CANCELADO'), (self.terminou, 'CONFIRMADO')]:
+            Participacao.objects.create(evento=evento, participante=self.perfil, status=status)
+        criar_evento(outro, maximo_participantes=None)
+        self.client.force_login(self.perfil.usuario)
+
+    def aba(self, filtro):
+        resposta = self.client.get(reverse('eventos:meus_eventos'), {'filtro': filtro})
+        return resposta, {info['evento'].id for info in resposta.context['eventos_com_info']}
+
+    def test_contagem_e_eventos_de_cada_aba(self):
+        esperado = {
+            'all': {self.organiza.id, self.inscrito.id, self.terminou.id},
+            'created': {self.organiza.id},
+            'enrolled': {self.inscrito.id, self.terminou.id},
+            'cancelled': {self.organiza_cancelado.id, self.desistiu.id},
+            'completed': {self.terminou.id},
+        }
+        for filtro, ids in esperado.items():
+            with self.subTest(filtro=filtro):
+                resposta, encontrados = self.aba(filtro)
+                self.assertEqual(encontrados, ids)
+                self.assertEqual(resposta.context['contagem_abas'], {aba: len(ids) for aba, ids in esperado.items()})
+
+    def test_queries_nao_crescem_com_os_eventos(self):
+        def contar_queries():
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                self.aba('all')
+            return len(queries)
+
+        poucos = contar_queries()
+        outro = criar_perfil(2)
+        for _ in range(8):
+            Participacao.objects.create(
+                evento=criar_evento(outro, maximo_participantes=None), participante=self.perfil, status='CONFIRMADO',
+            )
+        self.assertEqual(contar_queries(), poucos)
@@ -5,8 +5,10 @@ app_name = "eventos"
 
 urlpatterns = [
     path("", views.lista_eventos, name="lista_eventos"),
+    path("carregar-mais/", views.carregar_mais_eventos, name="carregar_mais_eventos"),
     path("meus-eventos/", views.meus_eventos, name="meus_eventos"),
     path("visualizar/<int:evento_id>/", views.visualizar_evento, name="visualizar_evento"),
+    path("resumo/<int:evento_id>/", views.resumo_evento, name="resumo_evento"),
     path("confirmar-presenca/<int:evento_id>/", views.confirmar_presenca, name="confirmar_presenca"),
     path("criar/", views.criar_evento, name="criar_evento"),
     path("editar/<int:evento_id>/", views.editar_evento, name="editar_evento"),
@@ -1,252 +1,195 @@
+import logging
+
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
 from django.http import JsonResponse
+from django.template.loader import render_to_string
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
 from .models import Eventos, Participacao
 from django.contrib import messages
-from django.db.models import Q, Exists, OuterRef
-from perfil.models import Perfil
+from django.db.models import Count, Q
 from django.utils import timezone
+from core.cache_paginas import cache_anonimo
+from core.paginacao import CursorInvalido, paginar
+from .busca import buscar
+from .cards import anotar_versoes_cards
+from .condicional import condicional_evento
+from .participantes import (
+    AVATARES_VISUALIZAR, cards_das_participacoes, com_organizador, participantes_dos_cards, participantes_sob_demanda,
+)
+from .facetas import obter_facetas
+from .reservas import InscricaoRecusada, cancelar_participacao, reservar_vaga
+from .visitante import status_anotado, status_do_visitante
 
-def finalizar_eventos_vencidos():
-    """
-    Atualiza automaticamente o status dos eventos para FINALIZADO
-    quando a data atual for maior que a data_termino do evento.
+# Ordenação da listagem: a chave (data_inicio, id) é única, o que permite
+# paginação por cursor (keyset) sem OFFSET. Com busca, ordena por relevância.
+ORDENACAO_LISTAGEM = ('-data_inicio', '-id')
+ORDENACAO_BUSCA = ('-rank_busca', '-id')
+
+# Abas de meus_eventos (parâmetro `filtro`)
+ABAS_MEUS_EVENTOS = ('all', 'created', 'enrolled', 'cancelled', 'completed')
+
+logger = logging.getLogger(__name__)
+
+
+def _filtros_listagem(request):
+    """Lê os filtros da listagem a partir da querystring"""
+    return {
+        'categoria': request.GET.get('categoria', ''),
+        'cidade': request.GET.get('cidade', ''),
+        'busca': request.GET.get('busca', '').strip(),
+    }
+
+
+def _eventos_filtrados(filtros):
     """
-    agora = timezone.now()
-    
-    # Busca eventos ATIVOS cuja data_termino já passou
-    eventos_vencidos = Eventos.objects.filter(
-        status='ATIVO',
-        data_termino__lt=agora
-    )
-    
-    # Atualiza o status para FINALIZADO
-    eventos_atualizados = eventos_vencidos.update(status='FINALIZADO')
-    
-    return eventos_atualizados
+    QuerySet dos eventos ativos com os filtros da listagem aplicados.
 
-def lista_eventos(request):
-    # Atualiza automaticamente eventos vencidos para FINALIZADO
-    finalizar_eventos_vencidos()
-    eventos = Eventos.objects.filter(status='ATIVO').order_by("-data_inicio")
+    Eventos vencidos já ficam de fora aqui (ver EventosQuerySet.ativos);
+    o status no banco é atualizado pelo comando expirar_eventos.
+    """
+    eventos = Eventos.objects.ativos()
     
     # Filtro por categoria
-    categoria = request.GET.get('categoria', '')
-    if categoria:
-        eventos = eventos.filter(categoria=categoria)
+    if filtros['categoria']:
+        eventos = eventos.filter(categoria=filtros['categoria'])
     
     # Filtro por cidade
-    cidade = request.GET.get('cidade', '')
-    if cidade:
-        eventos = eventos.filter(endereco__cidade__iexact=cidade)
-    
-    # Busca textual - busca no título, descrição e endereço
-    busca_texto = request.GET.get('busca', '').strip()
-    if busca_texto:
-        eventos = eventos.filter(
-            Q(nome_evento__icontains=busca_texto) |
-            Q(descricao__icontains=busca_texto) |
-            Q(endereco__nome_do_local__icontains=busca_texto) |
-            Q(endereco__rua__icontains=busca_texto) |
-            Q(endereco__bairro__icontains=busca_texto) |
-            Q(endereco__cidade__icontains=busca_texto)
-        )
+    if filtros['cidade']:
+        eventos = eventos.filter(endereco__cidade__iexact=filtros['cidade'])
     
-    # Busca todas as categorias disponíveis para o filtro
-    categorias_disponiveis = Eventos.CATEGORIA_CHOICES
-    
-    # Busca todas as cidades disponíveis (de eventos ativos com endereço)
-    # Usa a query base antes dos filtros para mostrar todas as cidades possíveis
-    cidades_disponiveis = Eventos.objects.filter(
-        status='ATIVO',
-        endereco__isnull=False
-    ).exclude(
-        endereco__cidade__isnull=True
-    ).exclude(
-        endereco__cidade=''
-    ).values_list('endereco__cidade', flat=True).distinct().order_by('endereco__cidade')
-    
-    # Prefetch participantes e endereço para otimizar queries
-    eventos = eventos.prefetch_related(
-        'participacoes__participante',
-        'organizador',
-        'endereco'
-    )
+    # Busca textual no índice de busca (nome, descrição e local), com rank
+    if filtros['busca']:
+        eventos = buscar(eventos, filtros['busca'])
     
-    # Conta participantes ativos e busca fotos para cada evento
-    eventos_com_info = []
-    for evento in eventos:
-        # Busca participantes ativos (excluindo cancelados e ausentes)
-        participantes_ativos_qs = evento.participacoes.exclude(
-            status__in=['CANCELADO', 'AUSENTE']
-        ).exclude(participante__isnull=True).select_related('participante')
-        
-        # Lista de participantes para exibição (incluindo organizador se necessário)
-        participantes_para_exibicao = list(participantes_ativos_qs)
-        
-        # Verifica se organizador está na lista
-        organizador_na_lista = False
-        if evento.organizador:
-            organizador_na_lista = any(
-                p.participante and p.participante.id == evento.organizador.id 
-                for p in participantes_para_exibicao
-            )
-            if not organizador_na_lista:
-                # Cria participação virtual para organizador
-                class ParticipacaoVirtual:
-                    def __init__(self, participante):
-                        self.participante = participante
-                        self.status = 'CONFIRMADO'
-                
-                organizador_participacao = ParticipacaoVirtual(evento.organizador)
-                participantes_para_exibicao.insert(0, organizador_participacao)
-        
-        total_participantes = len(participantes_para_exibicao)
-        
-        eventos_com_info.append({
+    return eventos
+
+
+def _pagina_de_eventos(filtros, cursor):
+    """
+    Busca uma página da listagem (tamanho em settings.EVENTOS_POR_PAGINA).
+
+    Eventos com organizador e endereço no mesmo SELECT (para_card) e totais
+    vindos dos contadores do evento; os avatares saem de uma única query em
+    _montar_cards. Número fixo de queries por página, independente do
+    tamanho do catálogo.
+    """
+    eventos = _eventos_filtrados(filtros).para_card()
+    return paginar(
+        eventos,
+        ordenacao=ORDENACAO_BUSCA if filtros['busca'] else ORDENACAO_LISTAGEM,
+        cursor=cursor,
+        tamanho=settings.EVENTOS_POR_PAGINA,
+    )
+
+
+def _montar_cards(eventos, perfil_usuario):
+    """Monta os dados de cada card a partir dos eventos já anotados"""
+    # Relação do usuário logado e avatares dos participantes: uma consulta cada.
+    # Os avatares só são consultados se algum card não estiver no cache
+    visitante = status_do_visitante(eventos, perfil_usuario)
+    participantes = participantes_sob_demanda(eventos)
+    eventos_com_info = [
+        {
             'evento': evento,
-            'total_participantes': total_participantes,
-            'participantes_para_exibicao': participantes_para_exibicao,
-        })
+            'total_participantes': evento.total_participantes,
+            'participantes_para_exibicao': participantes[evento.id],
+            'visitante': visitante[evento.id],
+        }
+        for evento in eventos
+    ]
+    # Versão do fragmento em cache de cada card (eventos/cards.py)
+    return anotar_versoes_cards(eventos_com_info)
+
+
+# Anônimos recebem a página do cache, vencida quando eventos/participações mudam
+@cache_anonimo(tags=['eventos', 'perfis'], parametros=['categoria', 'cidade', 'busca'])
+def lista_eventos(request):
+    filtros = _filtros_listagem(request)
+    
+    # Cursor inválido (link antigo/adulterado) volta para a primeira página
+    try:
+        pagina = _pagina_de_eventos(filtros, request.GET.get('cursor'))
+    except CursorInvalido:
+        pagina = _pagina_de_eventos(filtros, None)
+    
+    # Opções dos filtros (com contagem de eventos ativos), vindas do cache
+    facetas = obter_facetas()
     
     context = {
-        'eventos_com_info': eventos_com_info,
-        'categorias_disponiveis': categorias_disponiveis,
-        'categoria_filtrada': categoria,
-        'cidades_disponiveis': cidades_disponiveis,
-        'cidade_filtrada': cidade,
-        'busca_texto': busca_texto,
+        'eventos_com_info': _montar_cards(pagina.itens, request.perfil),
+        'proximo_cursor': pagina.proximo_cursor,
+        'categorias_disponiveis': facetas['categorias'],
+        'categoria_filtrada': filtros['categoria'],
+        'cidades_disponiveis': facetas['cidades'],
+        'cidade_filtrada': filtros['cidade'],
+        'busca_texto': filtros['busca'],
     }
     
     return render(request, "eventos/lista_eventos.html", context)
 
 
-def visualizar_evento(request, evento_id):
-    # Atualiza automaticamente eventos vencidos para FINALIZADO
-    finalizar_eventos_vencidos()
-    evento = get_object_or_404(Eventos, id=evento_id)
+@require_http_methods(["GET"])
+def carregar_mais_eventos(request):
+    """
+    Endpoint JSON do botão "Carregar mais" da listagem.
 
-    # Verifica se o usuário autenticado é o organizador
-    eh_organizador = False
-    usuario_confirmado = False
-    
-    if request.user.is_authenticated:
-        try:
-            if hasattr(request.user, 'perfil') and request.user.perfil:
-                perfil_usuario = request.user.perfil
-                # Verifica se é o organizador
-                if evento.organizador and evento.organizador.id == perfil_usuario.id:
-                    eh_organizador = True
-                    usuario_confirmado = True  # Organizador está automaticamente confirmado
-                    print(f"DEBUG: Usuário {request.user.email} é organizador do evento {evento.id}")
-                else:
-                    # Verifica se já está inscrito/confirmado
-                    # Considera qualquer participação que não seja CANCELADO ou AUSENTE
-                    # Status válidos: INSCRITO, CONFIRMADO, LISTA_ESPERA, PRESENTE
-                    tem_participacao_valida = evento.participacoes.filter(
-                        participante=perfil_usuario
-                    ).exclude(status__in=['CANCELADO', 'AUSENTE']).exists()
-                    
-                    if tem_participacao_valida:
-                        usuario_confirmado = True
-                        # Pega o status para debug
-                        participacao = evento.participacoes.filter(
-                            participante=perfil_usuario
-                        ).exclude(status__in=['CANCELADO', 'AUSENTE']).first()
-                        print(f"DEBUG: Usuário {request.user.email} está inscrito no evento {evento.id} com status: {participacao.status if participacao else 'N/A'}")
-                    else:
-                        # Verifica se existe alguma participação (mesmo cancelada) para debug
-                        todas_participacoes = evento.participacoes.filter(participante=perfil_usuario).all()
-                        if todas_participacoes.exists():
-                            print(f"DEBUG: Usuário {request.user.email} tem participação no evento {evento.id} mas com status inválido:")
-                            for p in todas_participacoes:
-                                print(f"  - Status: {p.status}")
-                        else:
-                            print(f"DEBUG: Usuário {request.user.email} NÃO tem participação no evento {evento.id}")
-            else:
-                print(f"DEBUG: Usuário {request.user.email} não tem perfil associado")
-        except Exception as e:
-            print(f"DEBUG: Erro ao verificar participação do usuário {request.user.email if request.user.is_authenticated else 'anônimo'}: {e}")
-            import traceback
-            traceback.print_exc()
-
-    # Conta participantes ativos: INSCRITOS e CONFIRMADOS
-    # (exclui CANCELADOS, AUSENTES, etc e participantes sem perfil)
-    participantes_ativos = evento.participacoes.exclude(
-        status__in=['CANCELADO', 'AUSENTE']
-    ).exclude(
-        participante__isnull=True
-    )
+    Recebe os mesmos filtros da listagem + cursor e retorna o HTML dos
+    próximos cards e o cursor da página seguinte (None na última página).
+    """
+    filtros = _filtros_listagem(request)
+    try:
+        pagina = _pagina_de_eventos(filtros, request.GET.get('cursor'))
+    except CursorInvalido:
+        return JsonResponse({
+            'success': False,
+            'error': 'Cursor de paginação inválido.'
+        }, status=400)
     
-    # DEBUG: Log detalhado para diagnóstico
-    print(f"\n=== DEBUG CONTAGEM EVENTO {evento.id} ===")
-    print(f"Nome do evento: {evento.nome_evento}")
-    print(f"Organizador: {evento.organizador}")
-    
-    # Lista todas as participações para debug
-    todas_participacoes = evento.participacoes.all()
-    print(f"\nTotal de participações no banco: {todas_participacoes.count()}")
-    for p in todas_participacoes:
-        print(f"  - Participante: {p.participante}, Status: {p.status}, Participante é None: {p.participante is None}")
-    
-    print(f"\nParticipantes ativos (após filtros): {participantes_ativos.count()}")
-    for p in participantes_ativos:
-        print(f"  - Participante: {p.participante}, Status: {p.status}")
-    
-    # Se o organizador não estiver na lista de participantes, adiciona ele
-    if evento.organizador and not participantes_ativos.filter(participante=evento.organizador).exists():
-        # O organizador conta como participante confirmado automaticamente
-        pass  # Não vamos criar participação, apenas contar ele
-    
-    # Para exibição, mostra apenas CONFIRMADOS na galera
-    confirmados = evento.participacoes.filter(
-        status='CONFIRMADO',
-        participante__isnull=False
+    html = render_to_string(
+        'eventos/partials/cards_eventos.html',
+        {'eventos_com_info': _montar_cards(pagina.itens, request.perfil)},
+        request=request,
     )
     
-    # Total de participantes ativos (INSCRITO + CONFIRMADO + LISTA_ESPERA + PRESENTE)
-    # Conta o organizador também, pois ele é um participante
-    total_confirmados = participantes_ativos.count()
-    
-    # Se organizador não está na lista de participações, conta ele também
-    organizador_na_lista = False
-    if evento.organizador:
-        organizador_na_lista = participantes_ativos.filter(participante=evento.organizador).exists()
-        print(f"Organizador ID: {evento.organizador.id}")
-        print(f"Organizador na lista de participantes ativos: {organizador_na_lista}")
-        if not organizador_na_lista:
-            total_confirmados += 1  # Conta o organizador
-            print(f"Organizador adicionado ao total. Total agora: {total_confirmados}")
-        else:
-            print(f"Organizador já está na lista, não precisa adicionar. Total: {total_confirmados}")
-    
-    print(f"Total final de confirmados: {total_confirmados}")
-    print(f"Máximo de participantes: {evento.maximo_participantes}")
-    print(f"=== FIM DEBUG ===\n")
-    
-    # Adiciona organizador à lista de participantes ativos para exibição (se não estiver)
-    participantes_para_exibicao = list(participantes_ativos)
-    if evento.organizador and not organizador_na_lista:
-        # Cria um objeto simples para representar o organizador como participante
-        class ParticipacaoVirtual:
-            def __init__(self, participante):
-                self.participante = participante
-                self.status = 'CONFIRMADO'
-                self.id = None
-        
-        organizador_participacao = ParticipacaoVirtual(evento.organizador)
-        participantes_para_exibicao.insert(0, organizador_participacao)
+    return JsonResponse({
+        'success': True,
+        'html': html,
+        'proximo_cursor': pagina.proximo_cursor,
+    })
 
-    if evento.maximo_participantes:
-        try:
-            progresso = int((total_confirmados / evento.maximo_participantes) * 100)
-        except (TypeError, ZeroDivisionError):
-            progresso = 0
-        progresso = min(max(progresso, 0), 100)
-    else:
-        progresso = 0
 
+# 304 em visitas repetidas sem mudança no evento (ver eventos/condicional.py)
+@condicional_evento
+def visualizar_evento(request, evento_id):
+    # Organizador (com usuário) e endereço aparecem em toda a página
+    evento = get_object_or_404(Eventos.objects.select_related('organizador__usuario', 'endereco'), id=evento_id)
+
+    # Verifica se o usuário autenticado é o organizador ou já está inscrito
+    # (participação que ocupa vaga; lista de espera tem estado próprio)
+    perfil_usuario = request.perfil
+    visitante = status_do_visitante([evento], perfil_usuario)[evento.id]
+    eh_organizador = visitante.eh_organizador
+    # Lista de espera não é vaga: sem "NO ROLÊ!" nem link do grupo (como em confirmar_presenca)
+    na_lista_espera = visitante.na_lista_espera
+    usuario_confirmado = visitante.confirmado  # Organizador está automaticamente confirmado
+    
+    # Depuração apenas com ?diagnostico=1 (ver core/instrumentacao.py)
+    if getattr(request, 'diagnostico', False) and perfil_usuario:
+        logger.info(
+            'visualizar_evento: usuário %s no evento %s - organizador: %s, participação: %s',
+            request.user.email, evento.id, eh_organizador, visitante.status_participacao or 'nenhuma',
+        )
+
+    # Totais vêm dos contadores do evento (organizador incluído), sem COUNT
+    total_confirmados = evento.total_participantes
+    
+    # Só os avatares exibidos (participações que ocupam vaga, organizador
+    # incluído); o "+N" sai do total acima
+    participantes_para_exibicao = participantes_dos_cards([evento], limite=AVATARES_VISUALIZAR)[evento.id]
+
+    progresso = evento.percentual_ocupacao
     if evento.maximo_participantes:
         faltam = max(evento.maximo_participantes - total_confirmados, 0)
     else:
@@ -259,387 +202,184 @@ def visualizar_evento(request, evento_id):
 
     contexto = {
         "evento": evento,
-        "confirmados": confirmados,  # Apenas CONFIRMADOS para exibição na galera
-        "participantes_ativos": participantes_ativos,  # QuerySet original
-        "participantes_para_exibicao": participantes_para_exibicao,  # Lista com organizador incluído
+        "participantes_para_exibicao": participantes_para_exibicao,  # ParticipanteCards, organizador incluído
         "total_confirmados": total_confirmados,  # Total de participantes ativos
         "progresso": progresso,
         "faltam": faltam,
         "esta_lotado": esta_lotado,
         "eh_organizador": eh_organizador,
         "usuario_confirmado": usuario_confirmado,
+        "na_lista_espera": na_lista_espera,
     }
 
     return render(request, "eventos/visualizar_evento.html", contexto)
 
 
+@require_http_methods(["GET"])
+@condicional_evento
+def resumo_evento(request, evento_id):
+    """
+    Endpoint JSON com as vagas do evento e a situação de quem está vendo,
+    para clientes que acompanham o evento (polling). Com o ETag da última
+    resposta, sem mudanças, custa só a consulta do validador (304).
+    """
+    evento = get_object_or_404(Eventos, id=evento_id)
+    visitante = status_do_visitante([evento], request.perfil)[evento.id]
+
+    total_confirmados = evento.total_participantes
+    faltam = None
+    if evento.maximo_participantes:
+        faltam = max(evento.maximo_participantes - total_confirmados, 0)
+
+    return JsonResponse({
+        'success': True,
+        'status': evento.status_efetivo,
+        'total_confirmados': total_confirmados,
+        'total_lista_espera': evento.total_lista_espera,
+        'maximo_participantes': evento.maximo_participantes,
+        'progresso': evento.percentual_ocupacao,
+        'faltam': faltam,
+        'esta_lotado': faltam == 0,
+        'eh_organizador': visitante.eh_organizador,
+        'status_participacao': visitante.status_participacao,
+    })
+
+
 @login_required
 @require_http_methods(["POST"])
 def confirmar_presenca(request, evento_id):
     """
     View para confirmar presença em um evento via AJAX
+
+    A vaga é reservada em uma transação curta com o evento travado (ver
+    eventos/reservas.py). Se o evento estiver lotado, a inscrição entra na
+    lista de espera em vez de retornar erro.
     """
+    # Verifica se o usuário tem perfil
+    perfil = request.perfil
+    if perfil is None:
+        return JsonResponse({
+            'success': False,
+            'error': 'Perfil não encontrado. Complete seu cadastro primeiro.'
+        }, status=400)
+    
     try:
-        evento = get_object_or_404(Eventos, id=evento_id)
-        
-        # Verifica se o usuário tem perfil
-        if not hasattr(request.user, 'perfil') or request.user.perfil is None:
-            return JsonResponse({
-                'success': False,
-                'error': 'Perfil não encontrado. Complete seu cadastro primeiro.'
-            }, status=400)
-        
-        perfil = request.user.perfil
-        
-        # Verifica se é o organizador
-        if evento.organizador and evento.organizador.id == perfil.id:
-            return JsonResponse({
-                'success': False,
-                'error': 'Você é o organizador deste evento e já está automaticamente confirmado!'
-            }, status=400)
-        
-        # Verifica se já existe uma participação
-        participacao_existente = None
-        try:
-            participacao_existente = Participacao.objects.get(evento=evento, participante=perfil)
-        except Participacao.DoesNotExist:
-            pass
-        
-        # Se não existe participação, verifica se pode criar uma nova
-        if not participacao_existente:
-            # Debug: log do status do evento
-            print(f"DEBUG - Status do evento: {evento.status}")
-            print(f"DEBUG - Aceita participantes: {evento.aceita_participantes}")
-            
-            # Verifica se o evento está cancelado ou finalizado
-            if evento.status in ['CANCELADO', 'FINALIZADO']:
-                return JsonResponse({
-                    'success': False,
-                    'error': f'Este evento não está mais disponível para inscrições. (Status: {evento.get_status_display()})'
-                }, status=400)
-            
-            # Para eventos ATIVOS, sempre permite inscrição (ignora aceita_participantes)
-            # O campo aceita_participantes pode ser usado para controle administrativo,
-            # mas não bloqueia inscrições para eventos ativos
-            # Se necessário bloquear, o organizador deve cancelar ou finalizar o evento
-            
-            # Verifica se o evento está lotado (só para novos participantes)
-            # Conta o organizador também, pois ele ocupa uma vaga
-            participantes_ativos = evento.participacoes.exclude(
-                status__in=['CANCELADO', 'AUSENTE']
-            ).exclude(participante__isnull=True)
-            
-            total_confirmados = participantes_ativos.count()
-            # Se organizador não está na lista, conta ele também
-            if evento.organizador and not participantes_ativos.filter(participante=evento.organizador).exists():
-                total_confirmados += 1  # Conta o organizador
-            
-            # Debug: log dos valores
-            print(f"DEBUG - Evento ID: {evento.id}")
-            print(f"DEBUG - Total confirmados: {total_confirmados}")
-            print(f"DEBUG - Máximo participantes: {evento.maximo_participantes}")
-            print(f"DEBUG - Organizador na lista: {participantes_ativos.filter(participante=evento.organizador).exists() if evento.organizador else 'N/A'}")
-            print(f"DEBUG - Comparação lotação: {total_confirmados} >= {evento.maximo_participantes} = {total_confirmados >= evento.maximo_participantes if evento.maximo_participantes else 'N/A'}")
-            
-            # Só verifica lotação se tiver máximo definido
-            if evento.maximo_participantes is not None:
-                if total_confirmados >= evento.maximo_participantes:
-                    return JsonResponse({
-                        'success': False,
-                        'error': f'Este evento está lotado. ({total_confirmados}/{evento.maximo_participantes} participantes)'
-                    }, status=400)
-            
-            # Cria nova participação com status CONFIRMADO usando get_or_create para evitar duplicatas
-            try:
-                participacao, created = Participacao.objects.get_or_create(
-                    evento=evento,
-                    participante=perfil,
-                    defaults={'status': 'CONFIRMADO'}
-                )
-                # Se já existia mas estava cancelada/ausente, atualiza para CONFIRMADO
-                if not created and participacao.status in ['CANCELADO', 'AUSENTE']:
-                    participacao.status = 'CONFIRMADO'
-                    participacao.save()
-            except Exception as e:
-                # Se ainda assim der erro de duplicata, tenta buscar a existente
-                import traceback
-                print(f"Erro ao criar participação: {str(e)}")
-                print(traceback.format_exc())
-                try:
-                    participacao = Participacao.objects.get(evento=evento, participante=perfil)
-                    # Atualiza status se necessário
-                    if participacao.status in ['CANCELADO', 'AUSENTE']:
-                        participacao.status = 'CONFIRMADO'
-                        participacao.save()
-                except Participacao.DoesNotExist:
-                    # Se não encontrou, retorna erro
-                    return JsonResponse({
-                        'success': False,
-                        'error': 'Erro ao processar inscrição. Tente novamente.'
-                    }, status=400)
-        else:
-            # Se já existe participação, processa normalmente (mesmo se aceita_participantes=False)
-            participacao = participacao_existente
-            
-            # Se já existe e está confirmado ou inscrito
-            if participacao.status in ['CONFIRMADO', 'INSCRITO']:
-                # Se está apenas INSCRITO, atualiza para CONFIRMADO
-                if participacao.status == 'INSCRITO':
-                    participacao.status = 'CONFIRMADO'
-                    participacao.save()
-                
-                # Recalcula total após possível atualização
-                # Conta o organizador também, pois ele ocupa uma vaga
-                participantes_ativos = evento.participacoes.exclude(
-                    status__in=['CANCELADO', 'AUSENTE']
-                ).exclude(participante__isnull=True)
-                
-                total_confirmados = participantes_ativos.count()
-                # Se organizador não está na lista, conta ele também
-                if evento.organizador and not participantes_ativos.filter(participante=evento.organizador).exists():
-                    total_confirmados += 1
-                
-                # Calcula informações atualizadas
-                if evento.maximo_participantes:
-                    try:
-                        progresso = int((total_confirmados / evento.maximo_participantes) * 100)
-                    except (TypeError, ZeroDivisionError):
-                        progresso = 0
-                    progresso = min(max(progresso, 0), 100)
-                    faltam = max(evento.maximo_participantes - total_confirmados, 0)
-                    esta_lotado = total_confirmados >= evento.maximo_participantes
-                else:
-                    progresso = 0
-                    faltam = None
-                    esta_lotado = False
-                
-                return JsonResponse({
-                    'success': True,
-                    'total_confirmados': total_confirmados,
-                    'maximo_participantes': evento.maximo_participantes,
-                    'progresso': progresso,
-                    'faltam': faltam,
-                    'esta_lotado': esta_lotado,
-                    'grupo_whatsapp': evento.grupo_whatsapp,
-                    'message': 'Presença confirmada com sucesso!',
-                    'ja_confirmado': True
-                })
-            
-            # Se existe mas está cancelado ou ausente, atualiza o status
-            if participacao.status in ['CANCELADO', 'AUSENTE']:
-                participacao.status = 'CONFIRMADO'
-                participacao.save()
-        
-        # Recalcula total de confirmados (para ambos os casos: nova ou existente)
-        # Conta o organizador também, pois ele ocupa uma vaga
-        participantes_ativos = evento.participacoes.exclude(
-            status__in=['CANCELADO', 'AUSENTE']
-        ).exclude(participante__isnull=True)
-        
-        total_confirmados = participantes_ativos.count()
-        # Se organizador não está na lista, conta ele também
-        if evento.organizador and not participantes_ativos.filter(participante=evento.organizador).exists():
-            total_confirmados += 1
-        
-        # Calcula progresso e outras informações
-        if evento.maximo_participantes:
-            try:
-                progresso = int((total_confirmados / evento.maximo_participantes) * 100)
-            except (TypeError, ZeroDivisionError):
-                progresso = 0
-            progresso = min(max(progresso, 0), 100)
-            faltam = max(evento.maximo_participantes - total_confirmados, 0)
-            esta_lotado = total_confirmados >= evento.maximo_participantes
-        else:
-            progresso = 0
-            faltam = None
-            esta_lotado = False
-        
-        # Retorna resposta JSON com todas as informações atualizadas
+        reserva = reservar_vaga(evento_id, perfil)
+    except Eventos.DoesNotExist:
         return JsonResponse({
-            'success': True,
-            'total_confirmados': total_confirmados,
-            'maximo_participantes': evento.maximo_participantes,
-            'progresso': progresso,
-            'faltam': faltam,
-            'esta_lotado': esta_lotado,
-            'grupo_whatsapp': evento.grupo_whatsapp,
-            'message': 'Presença confirmada com sucesso!',
-            'ja_confirmado': False  # Sempre False para nova confirmação
-        })
-        
-    except Exception as e:
-        # Log do erro para debug
-        import traceback
-        error_msg = str(e)
-        print(f"Erro ao confirmar presença: {error_msg}")
-        print(traceback.format_exc())
-        
-        # Se for erro de duplicata, tenta buscar a participação existente e retornar sucesso
-        if 'UNIQUE constraint' in error_msg or 'duplicate key' in error_msg.lower():
-            try:
-                evento = get_object_or_404(Eventos, id=evento_id)
-                perfil = request.user.perfil
-                participacao = Participacao.objects.get(evento=evento, participante=perfil)
-                
-                # Recalcula totais
-                participantes_ativos = evento.participacoes.exclude(
-                    status__in=['CANCELADO', 'AUSENTE']
-                ).exclude(participante__isnull=True)
-                total_confirmados = participantes_ativos.count()
-                if evento.organizador and not participantes_ativos.filter(participante=evento.organizador).exists():
-                    total_confirmados += 1
-                
-                # Retorna sucesso mesmo sendo duplicata (usuário já estava inscrito)
-                return JsonResponse({
-                    'success': True,
-                    'total_confirmados': total_confirmados,
-                    'maximo_participantes': evento.maximo_participantes,
-                    'message': 'Você já está confirmado neste evento!',
-                    'ja_confirmado': True
-                })
-            except Exception:
-                # Se não conseguir buscar, retorna erro amigável
-                return JsonResponse({
-                    'success': False,
-                    'error': 'Você já está inscrito neste evento.'
-                }, status=400)
-        
-        # Para outros erros, retorna mensagem genérica
+            'success': False,
+            'error': 'Evento não encontrado.'
+        }, status=404)
+    except InscricaoRecusada as e:
         return JsonResponse({
             'success': False,
-            'error': 'Erro ao processar solicitação. Tente novamente.'
-        }, status=500)
+            'error': e.mensagem
+        }, status=400)
+    
+    evento = reserva.evento
+    total_confirmados = reserva.vagas_ocupadas
+    na_lista_espera = reserva.participacao.status == 'LISTA_ESPERA'
+    
+    # Calcula progresso e outras informações
+    if evento.maximo_participantes:
+        progresso = min(int((total_confirmados / evento.maximo_participantes) * 100), 100)
+        faltam = max(evento.maximo_participantes - total_confirmados, 0)
+        esta_lotado = total_confirmados >= evento.maximo_participantes
+    else:
+        progresso = 0
+        faltam = None
+        esta_lotado = False
+    
+    if na_lista_espera:
+        mensagem = 'O evento está lotado. Você entrou na lista de espera e será confirmado se uma vaga abrir.'
+    elif reserva.ja_confirmado:
+        mensagem = 'Você já está confirmado neste evento!'
+    else:
+        mensagem = 'Presença confirmada com sucesso!'
+    
+    return JsonResponse({
+        'success': True,
+        'total_confirmados': total_confirmados,
+        'maximo_participantes': evento.maximo_participantes,
+        'progresso': progresso,
+        'faltam': faltam,
+        'esta_lotado': esta_lotado,
+        # Link do grupo só para quem tem vaga garantida
+        'grupo_whatsapp': None if na_lista_espera else evento.grupo_whatsapp,
+        'message': mensagem,
+        'ja_confirmado': reserva.ja_confirmado,
+        'lista_espera': na_lista_espera,
+    })
+
+
+def _condicoes_abas(perfil):
+    """
+    Condição de cada aba de meus_eventos, sobre eventos anotados com
+    com_status_visitante(perfil). As mesmas condições servem para listar a
+    aba e para contar todas as abas de uma vez (agregação condicional).
+    """
+    organiza = Q(organizador=perfil)
+    # Participação válida: qualquer status exceto CANCELADO/AUSENTE
+    participa = Q(status_visitante__isnull=False) & ~Q(status_visitante__in=Participacao.STATUS_INATIVOS)
+    cancelado = Q(status='CANCELADO')
+    finalizado = Q(status='FINALIZADO') | Q(status='ATIVO', data_termino__lt=timezone.now())
+    return {
+        # Organizador ou participante, exceto eventos cancelados
+        'all': (organiza | participa) & ~cancelado,
+        # Criados pelo usuário (os cancelados vão para a aba cancelado)
+        'created': organiza & ~cancelado,
+        # Participação ativa em eventos não cancelados
+        'enrolled': participa & ~cancelado,
+        # Participação cancelada, ou evento cancelado que organiza/participa
+        'cancelled': Q(status_visitante='CANCELADO') | ((organiza | participa) & cancelado),
+        # Eventos concluídos que organizou ou participou
+        'completed': finalizado & (organiza | participa),
+    }
 
 
 @login_required
 def meus_eventos(request):
-    # Atualiza automaticamente eventos vencidos para FINALIZADO
-    finalizar_eventos_vencidos()
     filtro = request.GET.get('filtro', 'all')
     user = request.user
 
-    # Correção principal: usa get_or_create para garantir que o Perfil exista
-    perfil, criado = Perfil.objects.get_or_create(
-        usuario=user,
-        defaults={
-            'nome_social': user.username,  # ou user.get_full_name() se tiver nome
-            # Adicione outros campos default se necessário (ex: bio='', foto=None)
-        }
-    )
+    if filtro not in ABAS_MEUS_EVENTOS:
+        filtro = 'all'
 
-    # Se foi criado agora, você pode mostrar uma mensagem de boas-vindas
-    if criado:
-        messages.info(request, "Seu perfil foi criado automaticamente. Complete suas informações!")
-
-    # Agora todas as queries usam o 'perfil' (instância de Perfil)
-    if filtro == 'created':
-        # Eventos criados pelo usuário, excluindo cancelados (que vão para aba cancelado)
-        eventos = Eventos.objects.filter(organizador=perfil).exclude(status='CANCELADO')
-    elif filtro == 'enrolled':
-        # Busca eventos onde o usuário tem participação ativa (excluindo cancelados e ausentes)
-        # Exclui eventos cancelados (mesmo que o usuário esteja inscrito)
-        # Usa participacoes para filtrar pelo status específico do usuário
-        participacoes_ativas = Participacao.objects.filter(
-            evento=OuterRef('pk'),
-            participante=perfil
-        ).exclude(status__in=['CANCELADO', 'AUSENTE'])
-        
-        eventos = Eventos.objects.filter(
-            Exists(participacoes_ativas)
-        ).exclude(status='CANCELADO').distinct()
-    elif filtro == 'cancelled':
-        # Busca eventos onde:
-        # 1. O usuário cancelou a participação (status da participação = CANCELADO)
-        # 2. OU o usuário é organizador e o evento foi cancelado (status do evento = CANCELADO)
-        # 3. OU o usuário está inscrito/confirmado mas o evento foi cancelado (status do evento = CANCELADO)
-        participacoes_canceladas = Participacao.objects.filter(
-            evento=OuterRef('pk'),
-            participante=perfil,
-            status='CANCELADO'
-        )
-        
-        # Participações ativas (INSCRITO ou CONFIRMADO)
-        participacoes_ativas = Participacao.objects.filter(
-            evento=OuterRef('pk'),
-            participante=perfil
-        ).exclude(status__in=['CANCELADO', 'AUSENTE'])
-        
-        eventos = Eventos.objects.filter(
-            Q(Exists(participacoes_canceladas)) | 
-            Q(organizador=perfil, status='CANCELADO') |
-            Q(Exists(participacoes_ativas), status='CANCELADO')
-        ).distinct()
-    elif filtro == 'completed':
-        # Eventos concluídos onde o usuário é organizador ou tem participação ativa
-        participacoes_ativas = Participacao.objects.filter(
-            evento=OuterRef('pk'),
-            participante=perfil
-        ).exclude(status__in=['CANCELADO', 'AUSENTE'])
-        
-        eventos = Eventos.objects.filter(
-            Q(organizador=perfil) | 
-            Exists(participacoes_ativas),
-            status='FINALIZADO'
-        ).distinct()
-    else:  # 'all' ou qualquer outro
-        # Eventos onde o usuário é organizador ou tem participação ativa
-        # Exclui eventos cancelados da lista geral
-        participacoes_ativas = Participacao.objects.filter(
-            evento=OuterRef('pk'),
-            participante=perfil
-        ).exclude(status__in=['CANCELADO', 'AUSENTE'])
-        
-        eventos = Eventos.objects.filter(
-            Q(organizador=perfil) | 
-            Exists(participacoes_ativas)
-        ).exclude(status='CANCELADO').distinct()
-
-    eventos = eventos.order_by('-data_inicio').prefetch_related('participacoes', 'organizador')
-    
-    # Adiciona informações calculadas para cada evento
+    # Leitura não cria perfil: sem perfil, a página só orienta completar o cadastro
+    perfil = request.perfil
     eventos_com_info = []
-    for evento in eventos:
-        # Conta participantes ativos (excluindo cancelados e ausentes)
-        participantes_ativos = evento.participacoes.exclude(
-            status__in=['CANCELADO', 'AUSENTE']
-        ).exclude(participante__isnull=True).count()
-        
-        # Se tem organizador e ele não está na lista, conta ele também
-        if evento.organizador:
-            organizador_na_lista = evento.participacoes.filter(
-                participante=evento.organizador
-            ).exclude(status__in=['CANCELADO', 'AUSENTE']).exists()
-            if not organizador_na_lista:
-                participantes_ativos += 1
-        
-        # Verifica se o usuário está inscrito no evento (e não é o organizador)
-        usuario_inscrito = False
-        usuario_cancelado = False
-        eh_organizador = evento.organizador and evento.organizador.id == perfil.id
-        if not eh_organizador:
-            # Verifica se tem participação ativa
-            participacao_ativa = evento.participacoes.filter(
-                participante=perfil
-            ).exclude(status__in=['CANCELADO', 'AUSENTE']).first()
-            if participacao_ativa:
-                usuario_inscrito = True
-            
-            # Verifica se tem participação cancelada
-            participacao_cancelada = evento.participacoes.filter(
-                participante=perfil,
-                status='CANCELADO'
-            ).first()
-            if participacao_cancelada:
-                usuario_cancelado = True
-        
-        eventos_com_info.append({
-            'evento': evento,
-            'total_participantes': participantes_ativos,
-            'usuario_inscrito': usuario_inscrito,
-            'usuario_cancelado': usuario_cancelado,
+    proximo_cursor = None
+    contagem_abas = dict.fromkeys(ABAS_MEUS_EVENTOS, 0)
+
+    if perfil is None:
+        messages.info(request, "Complete seu perfil para criar e participar de eventos!")
+    else:
+        condicoes = _condicoes_abas(perfil)
+        # Só os eventos ligados ao perfil, já com o status da participação dele
+        eventos_do_perfil = Eventos.objects.do_perfil(perfil).com_status_visitante(perfil)
+
+        # Contadores de todas as abas em uma única query
+        contagem_abas = eventos_do_perfil.aggregate(**{
+            aba: Count('pk', filter=condicao) for aba, condicao in condicoes.items()
         })
 
+        # Página da aba: uma query para os eventos (com o status do usuário) + prefetch
+        eventos = eventos_do_perfil.filter(condicoes[filtro]).para_card()
+        try:
+            pagina = paginar(eventos, ORDENACAO_LISTAGEM, request.GET.get('cursor'), settings.EVENTOS_POR_PAGINA)
+        except CursorInvalido:
+            pagina = paginar(eventos, ORDENACAO_LISTAGEM, None, settings.EVENTOS_POR_PAGINA)
+        proximo_cursor = pagina.proximo_cursor
+
+        eventos_com_info = anotar_versoes_cards([
+            {
+                'evento': evento,
+                'total_participantes': evento.total_participantes,
+                'visitante': status_anotado(evento, perfil),
+            }
+            for evento in pagina.itens
+        ])
+
     # Verifica se o usuário é staff e está no grupo "Beta Teste"
     eh_beta_teste = False
     if user.is_staff:
@@ -648,6 +388,8 @@ def meus_eventos(request):
     context = {
         'eventos_com_info': eventos_com_info,
         'filtro_ativo': filtro,
+        'contagem_abas': contagem_abas,
+        'proximo_cursor': proximo_cursor,
         'eh_beta_teste': eh_beta_teste,
     }
 
@@ -679,11 +421,11 @@ def editar_evento(request, evento_id):
         return redirect('eventos:visualizar_evento', evento_id=evento_id)
     
     # Verifica se tem perfil
-    if not hasattr(request.user, 'perfil') or request.user.perfil is None:
+    if request.perfil is None:
         messages.error(request, "Perfil não encontrado. Complete seu cadastro primeiro.")
         return redirect('eventos:visualizar_evento', evento_id=evento_id)
     
-    perfil = request.user.perfil
+    perfil = request.perfil
     
     # Verifica se é o organizador
     if evento.organizador != perfil:
@@ -701,7 +443,8 @@ def participantes_evento(request, evento_id):
     View para visualizar os participantes de um evento
     Qualquer usuário autenticado pode ver a lista de participantes
     """
-    evento = get_object_or_404(Eventos, id=evento_id)
+    # Organizador com usuário: entra na lista como card (nome e avatar)
+    evento = get_object_or_404(Eventos.objects.select_related('organizador__usuario'), id=evento_id)
     
     # Verifica se o usuário está autenticado
     if not request.user.is_authenticated:
@@ -709,41 +452,29 @@ def participantes_evento(request, evento_id):
         return redirect('eventos:visualizar_evento', evento_id=evento_id)
     
     # Verifica se tem perfil
-    if not hasattr(request.user, 'perfil') or request.user.perfil is None:
+    if request.perfil is None:
         messages.error(request, "Perfil não encontrado. Complete seu cadastro primeiro.")
         return redirect('eventos:visualizar_evento', evento_id=evento_id)
     
-    perfil = request.user.perfil
+    perfil = request.perfil
     
     # Verifica se é o organizador (para possíveis funcionalidades extras no futuro)
-    eh_organizador = evento.organizador and evento.organizador.id == perfil.id
+    eh_organizador = evento.organizador_id == perfil.id
     
-    # Busca todas as participações ativas (excluindo cancelados e ausentes)
+    # Todas as participações ativas (excluindo cancelados e ausentes), já
+    # como ParticipanteCard: nome e avatar vêm na mesma query
     participantes = evento.participacoes.exclude(
         status__in=['CANCELADO', 'AUSENTE']
-    ).exclude(participante__isnull=True).select_related('participante').order_by('participante__nome_social', 'participante__usuario__first_name')
+    ).exclude(participante__isnull=True).order_by('participante__nome_social', 'participante__usuario__first_name')
+    cards = cards_das_participacoes(participantes)
     
     # Adiciona o organizador à lista se ele não estiver nas participações
-    lista_participantes = list(participantes)
-    organizador_na_lista = False
-    if evento.organizador:
-        organizador_na_lista = participantes.filter(participante=evento.organizador).exists()
-        if not organizador_na_lista:
-            # Cria um objeto virtual para o organizador
-            class ParticipacaoVirtual:
-                def __init__(self, participante):
-                    self.participante = participante
-                    self.status = 'CONFIRMADO'
-                    self.id = None
-                
-                def get_status_display(self):
-                    return 'Confirmado'
-            
-            organizador_participacao = ParticipacaoVirtual(evento.organizador)
-            lista_participantes.insert(0, organizador_participacao)
-    
-    # Conta total de participantes
-    total_participantes = len(lista_participantes)
+    organizador_na_lista = any(card.perfil_id == evento.organizador_id for card in cards)
+    lista_participantes = com_organizador(cards, evento)
+    
+    # Total de participantes ocupando vaga (contador do evento, com organizador);
+    # a lista de espera aparece na lista, mas não entra no total
+    total_participantes = evento.total_participantes
     
     context = {
         'evento': evento,
@@ -775,13 +506,13 @@ def cancelar_evento(request, evento_id):
         return redirect('eventos:visualizar_evento', evento_id=evento_id)
     
     # Verifica se tem perfil
-    if not hasattr(request.user, 'perfil') or request.user.perfil is None:
+    if request.perfil is None:
         if is_ajax:
             return JsonResponse({'success': False, 'error': 'Perfil não encontrado. Complete seu cadastro primeiro.'}, status=400)
         messages.error(request, "Perfil não encontrado. Complete seu cadastro primeiro.")
         return redirect('eventos:visualizar_evento', evento_id=evento_id)
     
-    perfil = request.user.perfil
+    perfil = request.perfil
     
     # Verifica se é o organizador
     if evento.organizador != perfil:
@@ -797,8 +528,8 @@ def cancelar_evento(request, evento_id):
         messages.warning(request, "Este evento já está cancelado.")
         return redirect('eventos:visualizar_evento', evento_id=evento_id)
     
-    # Verifica se o evento pode ser cancelado (não pode estar finalizado)
-    if evento.status == 'FINALIZADO':
+    # Verifica se o evento pode ser cancelado (não pode estar finalizado nem vencido)
+    if evento.status_efetivo == 'FINALIZADO':
         if is_ajax:
             return JsonResponse({'success': False, 'error': 'Não é possível cancelar um evento finalizado.'}, status=400)
         messages.error(request, "Não é possível cancelar um evento finalizado.")
@@ -842,7 +573,7 @@ def sair_evento(request, evento_id):
         return redirect('eventos:visualizar_evento', evento_id=evento_id)
     
     # Verifica se tem perfil
-    if not hasattr(request.user, 'perfil') or request.user.perfil is None:
+    if request.perfil is None:
         if is_ajax:
             return JsonResponse({
                 'success': False,
@@ -851,7 +582,7 @@ def sair_evento(request, evento_id):
         messages.error(request, "Perfil não encontrado. Complete seu cadastro primeiro.")
         return redirect('eventos:visualizar_evento', evento_id=evento_id)
     
-    perfil = request.user.perfil
+    perfil = request.perfil
     
     # Verifica se é o organizador (organizador não pode sair do próprio evento)
     if evento.organizador and evento.organizador.id == perfil.id:
@@ -863,8 +594,8 @@ def sair_evento(request, evento_id):
         messages.error(request, "Você é o organizador deste evento. Use 'Cancelar Evento' se desejar cancelá-lo.")
         return redirect('eventos:meus_eventos')
     
-    # Verifica se o evento está ativo
-    if evento.status != 'ATIVO':
+    # Verifica se o evento está ativo (e ainda não terminou)
+    if evento.status_efetivo != 'ATIVO':
         if is_ajax:
             return JsonResponse({
                 'success': False,
@@ -895,11 +626,8 @@ def sair_evento(request, evento_id):
         messages.info(request, "Você já saiu deste evento.")
         return redirect('eventos:meus_eventos')
     
-    # Atualiza o status para CANCELADO
-    from django.utils import timezone
-    participacao.status = 'CANCELADO'
-    participacao.data_cancelamento = timezone.now()
-    participacao.save()
+    # Atualiza o status para CANCELADO e repassa a vaga para a lista de espera
+    cancelar_participacao(participacao)
     
     if is_ajax:
         return JsonResponse({
@@ -0,0 +1,92 @@
+"""
+Relação do usuário logado (visitante) com uma lista de eventos.
+
+Resolve de uma vez só, para todos os eventos de uma página, se o visitante
+é o organizador e qual o status da participação dele: uma única query em
+Participacao, qualquer que seja o tamanho da lista.
+
+Uso:
+    visitante = status_do_visitante(eventos, perfil)
+    visitante[evento.id].inscrito         # ocupa uma vaga: INSCRITO, CONFIRMADO ou PRESENTE
+    visitante[evento.id].na_lista_espera  # aguarda vaga (não está no rolê)
+    visitante[evento.id].participa        # inscrito ou na lista de espera
+    visitante[evento.id].cancelado        # cancelou a participação
+    visitante[evento.id].eh_organizador
+
+Em querysets anotados com Eventos.objects.com_status_visitante(perfil), o
+status já vem na mesma query dos eventos: use status_anotado(evento, perfil).
+"""
+from collections import namedtuple
+
+from .models import Participacao
+
+
+class StatusVisitante(namedtuple('StatusVisitante', ['eh_organizador', 'status_participacao'])):
+    __slots__ = ()
+
+    @property
+    def ocupa_vaga(self):
+        """Participação que ocupa uma vaga (STATUS_OCUPAM_VAGA); nunca o organizador"""
+        return not self.eh_organizador and self.status_participacao in Participacao.STATUS_OCUPAM_VAGA
+
+    @property
+    def inscrito(self):
+        """Inscrito com vaga garantida; quem está na lista de espera não conta"""
+        return self.ocupa_vaga
+
+    @property
+    def participa(self):
+        """Tem participação válida (não cancelada nem ausente), com vaga ou na lista de espera"""
+        return (
+            not self.eh_organizador
+            and self.status_participacao is not None
+            and self.status_participacao not in Participacao.STATUS_INATIVOS
+        )
+
+    @property
+    def cancelado(self):
+        return not self.eh_organizador and self.status_participacao == 'CANCELADO'
+
+    @property
+    def na_lista_espera(self):
+        return not self.eh_organizador and self.status_participacao == 'LISTA_ESPERA'
+
+    @property
+    def confirmado(self):
+        """Organizador ou inscrito com vaga: o que as páginas mostram como "você está no rolê" """
+        return self.eh_organizador or self.inscrito
+
+
+SEM_RELACAO = StatusVisitante(eh_organizador=False, status_participacao=None)
+
+
+def status_do_visitante(eventos, perfil):
+    """
+    Retorna {evento.id: StatusVisitante} para todos os eventos da lista.
+    Visitante anônimo (perfil None) recebe SEM_RELACAO em todos.
+    """
+    eventos = list(eventos)
+    if perfil is None or not eventos:
+        return {evento.id: SEM_RELACAO for evento in eventos}
+
+    status_por_evento = dict(
+        Participacao.objects.filter(
+            participante=perfil,
+            evento_id__in=[evento.id for evento in eventos],
+        ).values_list('evento_id', 'status')
+    )
+    return {
+        evento.id: StatusVisitante(
+            eh_organizador=evento.organizador_id == perfil.id,
+            status_participacao=status_por_evento.get(evento.id),
+        )
+        for evento in eventos
+    }
+
+
+def status_anotado(evento, perfil):
+    """StatusVisitante de um evento anotado com com_status_visitante(perfil)"""
+    return StatusVisitante(
+        eh_organizador=evento.organizador_id == perfil.id,
+        status_participacao=evento.status_visitante,
+    )
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from .cpf import normalizar_cpf
 from .models import Usuario, Perfil
 
 
@@ -48,17 +49,17 @@ class CustomUserAdmin(UserAdmin):
 
 @admin.register(Perfil)
 class PerfilAdmin(admin.ModelAdmin):
+    # Sem o CPF: exibi-lo obrigaria a decifrar cada linha da listagem
     list_display = (
         'usuario',
         'nome_social',
-        'cpf',
         'genero',
         'data_nascimento',
         'idade',
     )
 
+    # O CPF é criptografado: a busca por CPF usa o índice cego (get_search_results)
     search_fields = (
-        'cpf',
         'nome_social',
         'usuario__email',
         'usuario__first_name',
@@ -67,6 +68,23 @@ class PerfilAdmin(admin.ModelAdmin):
 
     raw_id_fields = ('usuario', 'endereco')
 
+    # usuario é nulo: o select_related() automático do admin não o segue
+    list_select_related = ('usuario',)
+
+    def get_queryset(self, request):
+        perfis = super().get_queryset(request)
+        # Na listagem, o CPF e a descrição ficam fora da query (o formulário carrega tudo)
+        resolver_match = getattr(request, 'resolver_match', None)
+        if resolver_match and resolver_match.url_name == 'perfil_perfil_changelist':
+            return perfis.defer('cpf', 'descricao')
+        return perfis
+
+    def get_search_results(self, request, queryset, search_term):
+        resultados, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if normalizar_cpf(search_term):
+            resultados = resultados | queryset.por_cpf(search_term)
+        return resultados, may_have_duplicates
+
     def idade(self, obj):
         return obj.idade
 
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class UserConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'perfil'
+
+    def ready(self):
+        # Variantes redimensionadas das fotos de perfil
+        from core.imagens import monitorar_imagem
+        monitorar_imagem(self.get_model('Perfil'), 'foto_perfil')
@@ -0,0 +1,88 @@
+"""
+URL do avatar de um perfil: a imagem cadastrada (imagem_url) ou, sem ela,
+o avatar padrão com as iniciais da pessoa, gerado aqui mesmo em SVG.
+
+Funciona a partir dos valores já lidos (values()), sem precisar do Perfil:
+usado pela tag get_avatar_url e pelos cards de participante
+(eventos/participantes.py).
+
+O avatar padrão é determinístico: as iniciais e a cor (escolhida pelo nome)
+definem o SVG, e o endereço leva um hash do conteúdo:
+
+    /avatar/<cor>/<iniciais>/<hash>.svg
+
+Montar a URL não faz I/O (só formatação e hash, memorizados por
+iniciais+cor). A view avatar_padrao gera o mesmo SVG e o entrega com
+Cache-Control immutable: cada avatar é baixado uma vez por navegador, e
+qualquer mudança no desenho troca o hash e, com ele, a URL.
+"""
+import hashlib
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from django.urls import reverse
+
+# (fundo, texto) nas cores da marca; a cor de cada pessoa sai do nome
+CORES = (
+    ('#CCEE52', '#004AAD'),
+    ('#004AAD', '#FFFFFF'),
+    ('#FA7625', '#FFFFFF'),
+    ('#FFD639', '#004AAD'),
+)
+
+TAMANHO = 128
+
+SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="{tamanho}" height="{tamanho}" '
+    'viewBox="0 0 {tamanho} {tamanho}">'
+    '<rect width="100%" height="100%" fill="{fundo}"/>'
+    '<text x="50%" y="50%" dy=".35em" text-anchor="middle" '
+    'font-family="Helvetica, Arial, sans-serif" font-size="{fonte}" font-weight="600" '
+    'fill="{texto}">{iniciais}</text>'
+    '</svg>'
+)
+
+
+def iniciais(nome):
+    """Até duas iniciais (primeiro e último nome), em maiúsculas"""
+    letras = [
+        next((caractere for caractere in palavra if caractere.isalnum()), '')
+        for palavra in str(nome or '').split()
+    ]
+    letras = [letra for letra in letras if letra]
+    if not letras:
+        return '?'
+    if len(letras) == 1:
+        return letras[0].upper()
+    return (letras[0] + letras[-1]).upper()
+
+
+def cor_do_nome(nome):
+    """Índice em CORES, estável para o mesmo nome"""
+    return int(hashlib.md5(str(nome or '').encode()).hexdigest(), 16) % len(CORES)
+
+
+def svg_avatar(iniciais, cor):
+    fundo, texto = CORES[cor]
+    return SVG.format(
+        tamanho=TAMANHO, fundo=fundo, texto=texto, fonte=TAMANHO * 2 // 5, iniciais=escape(iniciais),
+    )
+
+
+def hash_avatar(iniciais, cor):
+    return hashlib.md5(svg_avatar(iniciais, cor).encode()).hexdigest()[:12]
+
+
+@lru_cache(maxsize=4096)
+def _url_avatar_padrao(iniciais, cor):
+    return reverse('perfil:avatar_padrao', args=[cor, iniciais, hash_avatar(iniciais, cor)])
+
+
+def url_avatar(imagem_url, nome):
+    """Avatar da imagem_url, ou o avatar padrão com as iniciais do nome (ou 'Usuário')"""
+    if imagem_url:
+        imagem_url = str(imagem_url).strip()
+        if imagem_url:
+            return imagem_url
+    nome = nome or 'Usuário'
+    return _url_avatar_padrao(iniciais(nome), cor_do_nome(nome))
@@ -0,0 +1,25 @@
+"""
+Backend de autenticação que carrega o usuário já com o perfil.
+
+O AuthenticationMiddleware busca o usuário da sessão em toda requisição
+(get_user). Com select_related('perfil', 'perfil__endereco') o perfil e o
+endereço vêm no mesmo SELECT, e request.user.perfil não dispara outra
+query. Usuários sem perfil também ficam resolvidos: o acesso a
+request.user.perfil levanta RelatedObjectDoesNotExist sem ir ao banco.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class UsuarioComPerfilBackend(ModelBackend):
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            usuario = UserModel._default_manager.select_related(
+                'perfil',
+                'perfil__endereco',
+            ).get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return usuario if self.user_can_authenticate(usuario) else None
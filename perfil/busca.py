@@ -0,0 +1,68 @@
+"""
+Busca de perfis por nome (página Rede).
+
+Cada perfil guarda em nome_busca o nome exibido (mesma regra de
+Perfil.nome_completo) em minúsculas e sem acentos. A coluna serve para:
+
+- ordenar a Rede por nome com paginação por cursor, pelo índice
+  (nome_busca, id), sem JOIN com o usuário;
+- buscar por trecho do nome: cada termo vira um nome_busca LIKE '%termo%'.
+  No PostgreSQL um índice GIN de trigramas (pg_trgm) atende esse LIKE; no
+  SQLite (desenvolvimento/testes) a busca percorre a coluna já normalizada.
+
+O nome_busca é recalculado ao salvar o Perfil e ao mudar o nome ou o email
+do Usuario (ver perfil/models.py).
+
+Uso:
+    perfis = buscar_perfis(Perfil.objects.all(), 'joão')
+"""
+import unicodedata
+
+
+def normalizar(texto):
+    """Minúsculas, sem acentos e com espaços colapsados"""
+    decomposto = unicodedata.normalize('NFKD', texto or '')
+    sem_acentos = ''.join(caractere for caractere in decomposto if not unicodedata.combining(caractere))
+    return ' '.join(sem_acentos.lower().split())
+
+
+def nome_busca(nome_social, first_name, last_name, email):
+    """Nome exibido do perfil, normalizado (vazio para perfil sem usuário nem nome social)"""
+    if nome_social:
+        return normalizar(nome_social)
+    return normalizar(f'{first_name or ""} {last_name or ""}') or normalizar(email)
+
+
+def nome_busca_do_perfil(perfil):
+    usuario = perfil.usuario if perfil.usuario_id else None
+    if usuario is None:
+        return nome_busca(perfil.nome_social, None, None, None)
+    return nome_busca(perfil.nome_social, usuario.first_name, usuario.last_name, usuario.email)
+
+
+def buscar_perfis(queryset, texto):
+    """Filtra os perfis cujo nome contém todos os termos do texto"""
+    for termo in normalizar(texto).split():
+        queryset = queryset.filter(nome_busca__contains=termo)
+    return queryset
+
+
+def reindexar_nomes(perfis, tamanho_lote=500):
+    """Recalcula o nome_busca dos perfis do queryset em lotes (bulk_update)"""
+    total = 0
+    lote = []
+    linhas = perfis.order_by('pk').values(
+        'pk', 'nome_busca', 'nome_social', 'usuario__first_name', 'usuario__last_name', 'usuario__email',
+    )
+    for linha in linhas.iterator(chunk_size=tamanho_lote):
+        novo = nome_busca(
+            linha['nome_social'], linha['usuario__first_name'], linha['usuario__last_name'], linha['usuario__email'],
+        )
+        if novo != linha['nome_busca']:
+            lote.append(perfis.model(pk=linha['pk'], nome_busca=novo))
+        if len(lote) >= tamanho_lote:
+            total += perfis.model.objects.bulk_update(lote, ['nome_busca'])
+            lote = []
+    if lote:
+        total += perfis.model.objects.bulk_update(lote, ['nome_busca'])
+    return total
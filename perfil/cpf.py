@@ -0,0 +1,78 @@
+"""
+Índice cego (blind index) do CPF.
+
+Perfil.cpf é criptografado: o texto cifrado muda a cada gravação, então nem
+a constraint unique nem uma busca por igualdade funcionam sobre ele. O
+cpf_hash guarda um HMAC-SHA256 dos 11 dígitos do CPF, com chave própria
+(CPF_HASH_CHAVE), e é o que o banco indexa e mantém único: buscar um CPF é
+uma igualdade no índice, sem decifrar nenhuma linha.
+
+Trocar a CPF_HASH_CHAVE invalida todos os hashes; rode `make indexar-cpf`
+em seguida.
+
+Uso:
+    Perfil.objects.por_cpf('123.456.789-09').first()
+    hash_cpf('12345678909')
+"""
+import hashlib
+import hmac
+import re
+
+from django.conf import settings
+
+
+def normalizar_cpf(valor):
+    """Só os 11 dígitos do CPF, ou None se o valor não for um CPF"""
+    if not valor:
+        return None
+    digitos = re.sub(r'\D', '', str(valor))
+    return digitos if len(digitos) == 11 else None
+
+
+def hash_cpf(valor):
+    """HMAC do CPF normalizado (hex, 64 caracteres), ou None se não for um CPF"""
+    digitos = normalizar_cpf(valor)
+    if digitos is None:
+        return None
+    chave = str(settings.CPF_HASH_CHAVE).encode()
+    return hmac.new(chave, digitos.encode(), hashlib.sha256).hexdigest()
+
+
+def indexar_cpfs(perfis, tamanho_lote=500):
+    """
+    Recalcula o cpf_hash dos perfis do queryset em lotes (bulk_update).
+
+    Retorna (atualizados, conflitos): os conflitos são perfis com um CPF já
+    indexado em outro perfil; ficam sem hash para correção manual.
+    """
+    atualizados = 0
+    conflitos = []
+    vistos = set(
+        perfis.model.objects.exclude(pk__in=perfis.values('pk'))
+        .exclude(cpf_hash=None)
+        .values_list('cpf_hash', flat=True)
+    )
+    lote = []
+    for perfil in perfis.only('pk', 'cpf', 'cpf_hash').order_by('pk').iterator(chunk_size=tamanho_lote):
+        novo_hash = hash_cpf(perfil.cpf)
+        if novo_hash is not None and novo_hash in vistos:
+            conflitos.append(perfil.pk)
+            novo_hash = None
+        elif novo_hash is not None:
+            vistos.add(novo_hash)
+        if novo_hash != perfil.cpf_hash:
+            perfil.cpf_hash = novo_hash
+            lote.append(perfil)
+        if len(lote) >= tamanho_lote:
+            atualizados += _gravar(perfis.model, lote)
+            lote = []
+    if lote:
+        atualizados += _gravar(perfis.model, lote)
+    return atualizados, conflitos
+
+
+def _gravar(modelo, lote):
+    # Zera antes de gravar: dois perfis trocando de hash no mesmo lote não colidem no unique
+    modelo.objects.filter(pk__in=[perfil.pk for perfil in lote]).update(cpf_hash=None)
+    modelo.objects.bulk_update(lote, ['cpf_hash'])
+    return len(lote)
@@ -0,0 +1,36 @@
+"""
+Comando Django para recalcular o índice cego dos CPFs (Perfil.cpf_hash).
+
+O cpf_hash é mantido a cada save() do perfil (ver perfil/cpf.py). Use este
+comando após trocar a CPF_HASH_CHAVE ou após cargas em massa que não passam
+pelo save() (bulk_create, update(), SQL direto).
+
+Perfis com um CPF já indexado em outro perfil ficam sem hash e são listados
+para correção manual.
+
+Uso:
+    python manage.py indexar_cpf
+    python manage.py indexar_cpf --lote 1000
+"""
+from django.core.management.base import BaseCommand
+
+from perfil.cpf import indexar_cpfs
+from perfil.models import Perfil
+
+
+class Command(BaseCommand):
+    help = 'Recalcula o índice cego (cpf_hash) dos CPFs dos perfis'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=500,
+            help='Quantidade de perfis lidos e gravados por vez (padrão: 500)',
+        )
+
+    def handle(self, *args, **options):
+        atualizados, conflitos = indexar_cpfs(Perfil.objects.all(), tamanho_lote=options['lote'])
+        for perfil_id in conflitos:
+            self.stdout.write(self.style.WARNING(f'⚠ Perfil #{perfil_id}: CPF já cadastrado em outro perfil'))
+        self.stdout.write(self.style.SUCCESS(f'✓ {atualizados} perfil(is) atualizado(s)'))
@@ -0,0 +1,24 @@
+"""
+request.perfil: o Perfil do usuário logado (ou None), compartilhado por
+views e templates ({{ request.perfil }}) durante a requisição.
+
+Com o UsuarioComPerfilBackend o perfil vem na mesma query do usuário da
+sessão, então resolver request.perfil aqui não custa uma query a mais.
+Precisa vir depois do AuthenticationMiddleware.
+"""
+
+
+def perfil_do_usuario(usuario):
+    """Perfil do usuário, ou None (anônimo ou sem perfil)"""
+    if not usuario.is_authenticated:
+        return None
+    return getattr(usuario, 'perfil', None)
+
+
+class PerfilMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.perfil = perfil_do_usuario(request.user)
+        return self.get_response(request)
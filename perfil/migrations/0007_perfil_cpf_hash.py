@@ -0,0 +1,58 @@
+# Generated by Django 5.1.14 on 2026-10-18 18:22
+
+import hashlib
+import hmac
+import re
+
+import django.core.validators
+import encrypted_model_fields.fields
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Cópia de perfil.cpf no momento desta migração (hash_cpf e indexar_cpfs)
+def hash_cpf(valor):
+    digitos = re.sub(r'\D', '', str(valor or ''))
+    if len(digitos) != 11:
+        return None
+    return hmac.new(str(settings.CPF_HASH_CHAVE).encode(), digitos.encode(), hashlib.sha256).hexdigest()
+
+
+def preencher_cpf_hash(apps, schema_editor):
+    """Mesmo cálculo do comando indexar_cpf (CPFs repetidos ficam sem hash)"""
+    Perfil = apps.get_model('perfil', 'Perfil')
+    vistos = set()
+    lote = []
+    for perfil in Perfil.objects.only('pk', 'cpf').order_by('pk').iterator(chunk_size=500):
+        novo_hash = hash_cpf(perfil.cpf)
+        if novo_hash is None or novo_hash in vistos:
+            continue
+        vistos.add(novo_hash)
+        perfil.cpf_hash = novo_hash
+        lote.append(perfil)
+        if len(lote) >= 500:
+            Perfil.objects.bulk_update(lote, ['cpf_hash'])
+            lote = []
+    if lote:
+        Perfil.objects.bulk_update(lote, ['cpf_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('perfil', '0006_alter_perfil_imagem_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='perfil',
+            name='cpf_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='perfil',
+            name='cpf',
+            field=encrypted_model_fields.fields.EncryptedCharField(blank=True, help_text='Digite um CPF válido (com ou sem pontuação).', null=True, validators=[django.core.validators.RegexValidator(message='Digite um CPF válido (com ou sem pontuação).', regex='^(\\d{3}\\.?\\d{3}\\.?\\d{3}-?\\d{2})$')]),
+        ),
+        migrations.RunPython(preencher_cpf_hash, migrations.RunPython.noop),
+    ]
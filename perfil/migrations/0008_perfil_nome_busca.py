@@ -0,0 +1,81 @@
+# Generated by Django 5.1.14 on 2026-10-18 18:26
+
+import unicodedata
+
+from django.db import migrations, models
+
+# Índice de trigramas para o LIKE '%termo%' da busca por nome (ver perfil/busca.py).
+# Só no PostgreSQL; no SQLite a busca percorre a coluna normalizada.
+POSTGRES_CRIAR = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS perfil_nome_busca_trgm ON perfil_perfil USING gin (nome_busca gin_trgm_ops)',
+]
+
+POSTGRES_REMOVER = [
+    'DROP INDEX IF EXISTS perfil_nome_busca_trgm',
+]
+
+
+# Cópia de perfil.busca no momento desta migração (normalizar e nome_busca)
+def normalizar(texto):
+    decomposto = unicodedata.normalize('NFKD', texto or '')
+    sem_acentos = ''.join(caractere for caractere in decomposto if not unicodedata.combining(caractere))
+    return ' '.join(sem_acentos.lower().split())
+
+
+def nome_busca(nome_social, first_name, last_name, email):
+    if nome_social:
+        return normalizar(nome_social)
+    return normalizar(f'{first_name or ""} {last_name or ""}') or normalizar(email)
+
+
+def preencher_nome_busca(apps, schema_editor):
+    """Mesmo cálculo de perfil.busca.reindexar_nomes"""
+    Perfil = apps.get_model('perfil', 'Perfil')
+    linhas = Perfil.objects.order_by('pk').values(
+        'pk', 'nome_social', 'usuario__first_name', 'usuario__last_name', 'usuario__email',
+    )
+    lote = []
+    for linha in linhas.iterator(chunk_size=500):
+        lote.append(Perfil(pk=linha['pk'], nome_busca=nome_busca(
+            linha['nome_social'], linha['usuario__first_name'], linha['usuario__last_name'], linha['usuario__email'],
+        )))
+        if len(lote) >= 500:
+            Perfil.objects.bulk_update(lote, ['nome_busca'])
+            lote = []
+    if lote:
+        Perfil.objects.bulk_update(lote, ['nome_busca'])
+
+
+def criar_indice_trigramas(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in POSTGRES_CRIAR:
+            schema_editor.execute(sql)
+
+
+def remover_indice_trigramas(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in POSTGRES_REMOVER:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_endereco_nome_do_local'),
+        ('perfil', '0007_perfil_cpf_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='perfil',
+            name='nome_busca',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='perfil',
+            index=models.Index(fields=['nome_busca', 'id'], name='perfil_rede_cursor_idx'),
+        ),
+        migrations.RunPython(preencher_nome_busca, migrations.RunPython.noop),
+        migrations.RunPython(criar_indice_trigramas, remover_indice_trigramas),
+    ]
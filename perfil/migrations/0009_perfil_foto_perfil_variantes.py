@@ -0,0 +1,18 @@
+# Generated by Django 5.1.14 on 2026-10-18 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('perfil', '0008_perfil_nome_busca'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='perfil',
+            name='foto_perfil_variantes',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
@@ -6,6 +6,9 @@ from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
 from encrypted_model_fields.fields import EncryptedCharField
 
+from .busca import nome_busca_do_perfil
+from .cpf import hash_cpf
+
 cpf_validator = RegexValidator(
     regex=r'^(\d{3}\.?\d{3}\.?\d{3}-?\d{2})$',
     message='Digite um CPF válido (com ou sem pontuação).'
@@ -57,6 +60,13 @@ class Usuario(AbstractUser):
             self.username = self.email
         super().save(*args, **kwargs)
 
+        # O nome do perfil na busca da Rede vem do usuário (ver perfil/busca.py)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'first_name', 'last_name', 'email'} & set(update_fields):
+            for perfil in Perfil.objects.filter(usuario_id=self.pk).only('nome_social', 'usuario_id'):
+                perfil.usuario = self
+                Perfil.objects.filter(pk=perfil.pk).update(nome_busca=nome_busca_do_perfil(perfil))
+
     def __str__(self):
         return self.nome_completo or self.email
     
@@ -64,21 +74,57 @@ class Usuario(AbstractUser):
     def nome_completo(self): #retorna o nome completo a partir do first_name e last_name que já são nativos do django
         return f"{self.first_name} {self.last_name}".strip()
     
-        
+
+
+# Colunas usadas nas listagens de perfis (nome e avatar)
+CAMPOS_LISTAGEM = (
+    'nome_social',
+    'imagem_url',
+    'usuario__first_name',
+    'usuario__last_name',
+    'usuario__email',
+)
+
+
+class PerfilQuerySet(models.QuerySet):
+
+    def para_listagem(self):
+        """
+        Perfis com o usuário (select_related) e só as colunas das listagens:
+        sem decifrar o CPF nem trazer a descrição de cada linha.
+        """
+        return self.select_related('usuario').only(*CAMPOS_LISTAGEM)
+
+    def por_cpf(self, cpf):
+        """Perfis com o CPF informado (com ou sem pontuação), pelo índice cpf_hash"""
+        cpf_hash = hash_cpf(cpf)
+        if cpf_hash is None:
+            return self.none()
+        return self.filter(cpf_hash=cpf_hash)
+
+
 class Perfil(models.Model):
     nome_social = models.CharField(max_length=100, blank=True, null=True)
 
+    # Criptografado: unicidade e buscas usam o cpf_hash (ver perfil/cpf.py)
     cpf = EncryptedCharField( 
         max_length=14,
-        unique=True,
         blank=True,
         null=True,
         validators=[cpf_validator],
         help_text='Digite um CPF válido (com ou sem pontuação).'
     )
 
+    cpf_hash = models.CharField(max_length=64, unique=True, blank=True, null=True, editable=False)
+
+    # Nome exibido, minúsculo e sem acentos: ordenação e busca da Rede (ver perfil/busca.py)
+    nome_busca = models.CharField(max_length=255, blank=True, default='', editable=False)
+
     foto_perfil = models.ImageField(upload_to='fotos_perfil/', default="fotos_perfil/default.jpg", blank=True, null=True) 
 
+    # Variantes redimensionadas da foto prontas (ver core/imagens.py)
+    foto_perfil_variantes = models.BooleanField(default=False, editable=False)
+
     imagem_url = models.URLField(max_length=250, blank=True, null=True)
 
     descricao = models.TextField(
@@ -130,8 +176,33 @@ class Perfil(models.Model):
 
     data_nascimento = models.DateField()
 
+    objects = PerfilQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Ordenação e paginação por cursor da Rede
+            models.Index(fields=['nome_busca', 'id'], name='perfil_rede_cursor_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Mantém o cpf_hash e o nome_busca em dia com o CPF e o nome"""
+        self.cpf_hash = hash_cpf(self.cpf)
+        self.nome_busca = nome_busca_do_perfil(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'cpf' in update_fields:
+                update_fields.add('cpf_hash')
+            if update_fields & {'nome_social', 'usuario'}:
+                update_fields.add('nome_busca')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
     def clean(self):
         super().clean()
+        cpf_hash = hash_cpf(self.cpf)
+        if cpf_hash and Perfil.objects.filter(cpf_hash=cpf_hash).exclude(pk=self.pk).exists():
+            raise ValidationError({'cpf': 'Já existe um perfil com este CPF.'})
         hoje = date.today()
 
         # Se data_nascimento estiver vazia, não valida nada ainda
@@ -1,29 +1,22 @@
 from django import template
-from urllib.parse import quote
+
+from perfil.avatar import url_avatar
 
 register = template.Library()
 
 @register.simple_tag(takes_context=True)
 def get_user_perfil(context):
     """Retorna o perfil do usuário de forma segura, ou None se não existir"""
-    # Tenta pegar o usuário do request primeiro (mais confiável)
+    # request.perfil já vem resolvido pelo PerfilMiddleware (sem query extra)
     request = context.get('request')
-    if request and hasattr(request, 'user') and request.user.is_authenticated:
-        user = request.user
-    else:
-        # Fallback para o contexto padrão do Django
-        user = context.get('user')
+    if request is not None and hasattr(request, 'perfil'):
+        return request.perfil
     
+    # Fallback para o contexto padrão do Django (ex: render sem request)
+    user = context.get('user')
     if not user or not user.is_authenticated:
         return None
-    
-    try:
-        # Tenta acessar o perfil via relacionamento OneToOne
-        if hasattr(user, 'perfil'):
-            return user.perfil
-        return None
-    except Exception:
-        return None
+    return getattr(user, 'perfil', None)
 
 @register.simple_tag
 def get_avatar_url(perfil, nome_fallback=None):
@@ -42,14 +35,11 @@ def get_avatar_url(perfil, nome_fallback=None):
         URL da imagem do avatar
     """
     # PRIORIDADE 1: Se tem perfil e imagem_url válida, retorna imagem_url
-    if perfil and perfil.imagem_url:
-        imagem_url = str(perfil.imagem_url).strip()
-        if imagem_url:  # Verifica se não está vazio
-            return imagem_url
-    
-    # Se não tem imagem_url, sempre retorna avatar padrão
+    # (sem resolver o nome, que pode carregar o usuário do perfil)
+    if perfil and perfil.imagem_url and str(perfil.imagem_url).strip():
+        return url_avatar(perfil.imagem_url, None)
     
-    # Avatar padrão usando ui-avatars.com (mesmo padrão das outras páginas)
+    # Avatar padrão com as iniciais, gerado localmente (ver perfil/avatar.py)
     # Tenta obter nome do perfil, senão usa nome_fallback, senão 'Usuário'
     nome_avatar = 'Usuário'
     
@@ -70,5 +60,4 @@ def get_avatar_url(perfil, nome_fallback=None):
     elif nome_fallback:
         nome_avatar = nome_fallback
     
-    nome_encoded = quote(str(nome_avatar))
-    return f"https://ui-avatars.com/api/?name={nome_encoded}&background=CCEE52&color=004AAD&size=128"
+    return url_avatar(None, nome_avatar)
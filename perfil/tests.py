@@ -1,3 +1,212 @@
-from django.test import TestCase
+import uuid
+from datetime import date
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.admin.sites import site
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import Endereco
+
+from .avatar import iniciais, url_avatar
+from .backends import UsuarioComPerfilBackend
+from .busca import normalizar
+from .cpf import hash_cpf, normalizar_cpf
+from .middleware import perfil_do_usuario
+from .models import Perfil, Usuario
+
+
+def criar_perfil(cpf=None):
+    return Perfil.objects.create(cpf=cpf, data_nascimento=date(1990, 1, 1))
+
+
+class IndiceCpfTests(TestCase):
+    """cpf_hash: índice cego do CPF criptografado"""
+
+    def test_normaliza_pontuacao(self):
+        self.assertEqual(normalizar_cpf('123.456.789-09'), '12345678909')
+        self.assertEqual(hash_cpf('123.456.789-09'), hash_cpf('12345678909'))
+        self.assertIsNone(hash_cpf('123'))
+        self.assertIsNone(hash_cpf(None))
+
+    def test_save_mantem_o_hash(self):
+        perfil = criar_perfil('123.456.789-09')
+        self.assertEqual(perfil.cpf_hash, hash_cpf('12345678909'))
+
+        perfil.cpf = '98765432100'
+        perfil.save(update_fields=['cpf'])
+        perfil.refresh_from_db()
+        self.assertEqual(perfil.cpf_hash, hash_cpf('98765432100'))
+
+    def test_por_cpf_em_uma_query_sem_decifrar(self):
+        perfil = criar_perfil('123.456.789-09')
+        criar_perfil('98765432100')
+        with self.assertNumQueries(1):
+            self.assertEqual(list(Perfil.objects.por_cpf('12345678909').values_list('pk', flat=True)), [perfil.pk])
+        self.assertFalse(Perfil.objects.por_cpf('invalido').exists())
+
+    def test_cpf_repetido(self):
+        criar_perfil('123.456.789-09')
+        duplicado = Perfil(cpf='12345678909', data_nascimento=date(1990, 1, 1))
+        with self.assertRaises(ValidationError):
+            duplicado.full_clean()
+        with self.assertRaises(IntegrityError):
+            duplicado.save()
+
+    def test_busca_do_admin_por_cpf(self):
+        perfil = criar_perfil('123.456.789-09')
+        criar_perfil('98765432100')
+        request = RequestFactory().get('/')
+        resultados, _ = site._registry[Perfil].get_search_results(request, Perfil.objects.all(), '123.456.789-09')
+        self.assertEqual(list(resultados), [perfil])
+
+    def test_comando_indexar_cpf(self):
+        perfil = criar_perfil('123.456.789-09')
+        repetido = criar_perfil()
+        # Cargas que não passam pelo save(): o hash fica faltando
+        Perfil.objects.filter(pk=perfil.pk).update(cpf_hash=None)
+        Perfil.objects.filter(pk=repetido.pk).update(cpf=perfil.cpf)
+
+        saida = StringIO()
+        call_command('indexar_cpf', lote=1, stdout=saida)
+
+        self.assertEqual(Perfil.objects.por_cpf('12345678909').get(), perfil)
+        self.assertIsNone(Perfil.objects.get(pk=repetido.pk).cpf_hash)
+        self.assertIn(f'Perfil #{repetido.pk}', saida.getvalue())
+
+
+class ListagemPerfisTests(TestCase):
+    def test_para_listagem_sem_cpf_nem_descricao(self):
+        usuario = Usuario.objects.create_user('ana@simbora.test', first_name='Ana', last_name='Lima')
+        Perfil.objects.create(
+            usuario=usuario, cpf='12345678909', descricao='texto', data_nascimento=date(1990, 1, 1)
+        )
+
+        perfil = Perfil.objects.para_listagem().get()
+        self.assertTrue({'cpf', 'cpf_hash', 'descricao'} <= perfil.get_deferred_fields())
+        with self.assertNumQueries(0):
+            self.assertEqual(perfil.nome_completo, 'Ana Lima')
+
+    def test_listagem_do_admin_com_queries_constantes(self):
+        admin = Usuario.objects.create_superuser('admin@simbora.test', 'senha', first_name='Admin')
+        self.client.force_login(admin)
+
+        def contar_queries(total):
+            for indice in range(total):
+                usuario = Usuario.objects.create_user(f'p{Perfil.objects.count()}@simbora.test', first_name='P')
+                Perfil.objects.create(usuario=usuario, data_nascimento=date(1990, 1, 1))
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(reverse('admin:perfil_perfil_changelist')).status_code, 200)
+            return len(queries)
+
+        self.assertEqual(contar_queries(2), contar_queries(10))
+
+
+@override_settings(REDE_POR_PAGINA=2)
+class RedeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        recife = Endereco.objects.create(rua='Rua A', numero='1', bairro='Centro', cidade='Recife', estado='PE', cep='50000-000')
+        self.perfis = {}
+        for email, nome, nome_social, endereco in [
+            ('joao@simbora.test', 'João', None, recife),
+            ('ana@simbora.test', 'Ana', None, None),
+            ('bea@simbora.test', 'Beatriz', 'Béa', recife),
+            ('carlos@simbora.test', 'Carlos', None, None),
+        ]:
+            usuario = Usuario.objects.create_user(email, first_name=nome, last_name='Souza')
+            self.perfis[nome] = Perfil.objects.create(
+                usuario=usuario, nome_social=nome_social, endereco=endereco, data_nascimento=date(1990, 1, 1)
+            )
+        self.client.force_login(self.perfis['Ana'].usuario)
+
+    def nomes(self, resposta):
+        return [perfil.nome_completo for perfil in resposta.context['perfis']]
+
+    def test_nome_busca_normalizado_e_atualizado(self):
+        self.assertEqual(normalizar('  JOÃO   Souza '), 'joao souza')
+        self.assertEqual(self.perfis['Beatriz'].nome_busca, 'bea')
+
+        usuario = self.perfis['João'].usuario
+        usuario.first_name = 'Joãozinho'
+        usuario.save(update_fields=['first_name'])
+        self.assertEqual(Perfil.objects.get(usuario=usuario).nome_busca, 'joaozinho souza')
+
+    def test_paginas_por_cursor_em_ordem_de_nome(self):
+        url = reverse('perfil:listar_usuarios')
+        primeira = self.client.get(url)
+        self.assertEqual(self.nomes(primeira), ['Ana Souza', 'Béa'])
+        self.assertEqual(primeira.context['total_usuarios'], 4)
+
+        segunda = self.client.get(url, {'cursor': primeira.context['proximo_cursor']})
+        self.assertEqual(self.nomes(segunda), ['Carlos Souza', 'João Souza'])
+        self.assertIsNone(segunda.context['proximo_cursor'])
+
+        # Cursor adulterado volta para a primeira página
+        self.assertEqual(self.nomes(self.client.get(url, {'cursor': 'xyz'})), ['Ana Souza', 'Béa'])
+
+    def test_busca_por_nome_sem_acento_e_cidade(self):
+        url = reverse('perfil:listar_usuarios')
+        self.assertEqual(self.nomes(self.client.get(url, {'busca': 'joao sou'})), ['João Souza'])
+        self.assertEqual(self.nomes(self.client.get(url, {'busca': 'BÉA'})), ['Béa'])
+        self.assertEqual(self.nomes(self.client.get(url, {'cidade': 'recife'})), ['Béa', 'João Souza'])
+        self.assertEqual(self.nomes(self.client.get(url, {'busca': 'ana', 'cidade': 'Recife'})), [])
+
+
+class AvatarPadraoTests(TestCase):
+    def test_url_local_e_deterministica(self):
+        self.assertEqual(iniciais('joão da silva'), 'JS')
+        self.assertEqual(iniciais('ana'), 'A')
+        self.assertEqual(iniciais(''), '?')
+
+        url = url_avatar(None, 'João da Silva')
+        self.assertTrue(url.startswith('/avatar/'))
+        self.assertTrue(url.endswith('.svg'))
+        self.assertEqual(url, url_avatar('  ', 'João da Silva'))
+        self.assertEqual(url_avatar('https://exemplo.test/foto.png', 'João'), 'https://exemplo.test/foto.png')
+
+    def test_svg_servido_sem_queries_e_imutavel(self):
+        url = url_avatar(None, 'Maria <Souza>')
+        with self.assertNumQueries(0):
+            resposta = self.client.get(url)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta['Content-Type'], 'image/svg+xml')
+        self.assertIn('>MS</text>', resposta.content.decode())
+        self.assertIn('immutable', resposta['Cache-Control'])
+
+    def test_hash_antigo_nao_fica_imutavel(self):
+        resposta = self.client.get(reverse('perfil:avatar_padrao', args=[0, 'MS', 'antigo']))
+        self.assertEqual(resposta.status_code, 200)
+        self.assertNotIn('immutable', resposta['Cache-Control'])
+        self.assertEqual(self.client.get(reverse('perfil:avatar_padrao', args=[99, 'MS', 'x'])).status_code, 404)
+
+
+class UsuarioComPerfilBackendTests(TestCase):
+    def test_usuario_perfil_e_endereco_em_uma_query(self):
+        endereco = Endereco.objects.create(rua='Rua A', numero='1', bairro='Centro', cidade='Recife', estado='PE', cep='50000-000')
+        usuario = Usuario.objects.create_user('ana@simbora.test', first_name='Ana')
+        perfil = Perfil.objects.create(usuario=usuario, endereco=endereco, data_nascimento=date(1990, 1, 1))
+
+        with self.assertNumQueries(1):
+            carregado = UsuarioComPerfilBackend().get_user(usuario.pk)
+            self.assertEqual(perfil_do_usuario(carregado), perfil)
+            self.assertEqual(carregado.perfil.endereco.cidade, 'Recife')
+
+    def test_usuario_sem_perfil_sem_query_extra(self):
+        usuario = Usuario.objects.create_user('bia@simbora.test', first_name='Bia')
+        with self.assertNumQueries(1):
+            self.assertIsNone(perfil_do_usuario(UsuarioComPerfilBackend().get_user(usuario.pk)))
+        self.assertIsNone(UsuarioComPerfilBackend().get_user(uuid.UUID(int=0)))
+
+    def test_sessao_carrega_o_perfil_junto(self):
+        usuario = Usuario.objects.create_user('caio@simbora.test', first_name='Caio')
+        Perfil.objects.create(usuario=usuario, data_nascimento=date(1990, 1, 1))
+        self.client.force_login(usuario)
+        # Sessão vem do cache; usuário e perfil numa query só (a view do avatar não consulta nada)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url_avatar(None, 'Caio')).status_code, 200)
@@ -18,5 +18,6 @@ urlpatterns = [
     path('password_reset_complete/', auth_views.PasswordResetCompleteView.as_view(), name='password_reset_complete'),
     path('editar/', views.edit_profile_view, name='edit_profile'),
     path('rede/', views.listar_usuarios, name='listar_usuarios'),
+    path('avatar/<int:cor>/<str:iniciais>/<slug:conteudo>.svg', views.avatar_padrao, name='avatar_padrao'),
 
 ]
\ No newline at end of file
@@ -1,19 +1,45 @@
 import logging
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
+from django.conf import settings
 from django.db import transaction
+from django.http import Http404, HttpResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_http_methods
 from django.contrib import messages
+from core.cache import chave, obter_ou_calcular
 from core.models import Endereco
+from core.paginacao import CursorInvalido, paginar
 
 from perfil.models import Perfil
 
+from .avatar import CORES, hash_avatar, svg_avatar
+from .busca import buscar_perfis
 from .forms import CadastroCompletoForm, LoginForm, PerfilForm
 
+# Ordenação da Rede: (nome_busca, id) é única e indexada, o que permite
+# paginação por cursor (keyset) sem OFFSET
+ORDENACAO_REDE = ('nome_busca', 'id')
+
+NAMESPACE_REDE = 'rede'
+
+# Avatares padrão: a URL muda com o conteúdo, então o navegador guarda por um ano
+AVATAR_MAX_AGE = 365 * 24 * 60 * 60
+
 logger = logging.getLogger(__name__)
 
 
+def obter_total_rede():
+    """Total de perfis com usuário, do cache (vence em REDE_TOTAL_CACHE_TIMEOUT)"""
+    return obter_ou_calcular(
+        chave(NAMESPACE_REDE, 'total'),
+        lambda: Perfil.objects.filter(usuario__isnull=False).count(),
+        settings.REDE_TOTAL_CACHE_TIMEOUT,
+    )
+
+
 def signup_view(request):
     logger.info(f"signup_view: Acesso à página de cadastro - IP: {request.META.get('REMOTE_ADDR')}")
     
@@ -104,13 +130,12 @@ def edit_profile_view(request):
     user_email = request.user.email
     logger.info(f"edit_profile_view: Acesso à edição de perfil - Usuário: {user_email}, IP: {request.META.get('REMOTE_ADDR')}")
 
-    try:
-        perfil = request.user.perfil  # pega o perfil do usuário logado
-        logger.debug(f"edit_profile_view: Perfil encontrado - Perfil ID: {perfil.id}, Usuário: {user_email}")
-    except AttributeError:
-        logger.error(f"edit_profile_view: Perfil não encontrado para usuário {user_email}", exc_info=True)
+    perfil = request.perfil  # perfil do usuário logado (PerfilMiddleware)
+    if perfil is None:
+        logger.error(f"edit_profile_view: Perfil não encontrado para usuário {user_email}")
         # Redirecionar ou criar perfil se necessário
         return redirect('home')
+    logger.debug(f"edit_profile_view: Perfil encontrado - Perfil ID: {perfil.id}, Usuário: {user_email}")
     
     endereco = perfil.endereco if perfil.endereco else None
     logger.debug(f"edit_profile_view: Endereço {'encontrado' if endereco else 'não encontrado'} - Perfil ID: {perfil.id}")
@@ -187,8 +212,11 @@ def edit_profile_view(request):
 @login_required
 def listar_usuarios(request):
     """
-    View para listar todos os usuários/perfis do Simbora
+    View para listar os usuários/perfis do Simbora (Rede), por nome
     Acessível apenas para usuários logados
+
+    Busca por nome (`busca`) e cidade (`cidade`), paginada por cursor
+    (`cursor`) com REDE_POR_PAGINA perfis por página.
     """
     # Verifica se o usuário está autenticado
     if not request.user.is_authenticated:
@@ -196,21 +224,53 @@ def listar_usuarios(request):
         return redirect('signin')
     
     # Verifica se tem perfil
-    if not hasattr(request.user, 'perfil') or request.user.perfil is None:
+    if request.perfil is None:
         messages.error(request, "Perfil não encontrado. Complete seu cadastro primeiro.")
         return redirect('home')
     
-    # Busca todos os perfis que têm usuário associado, ordenados por nome
-    perfis = Perfil.objects.filter(
-        usuario__isnull=False
-    ).select_related('usuario').order_by('nome_social', 'usuario__first_name', 'usuario__last_name')
-    
-    # Conta total de perfis
-    total_usuarios = perfis.count()
-    
+    busca = request.GET.get('busca', '').strip()
+    cidade = request.GET.get('cidade', '').strip()
+
+    # Perfis com usuário, ordenados pelo nome normalizado (índice nome_busca, id)
+    perfis = Perfil.objects.filter(usuario__isnull=False).para_listagem()
+    if busca:
+        perfis = buscar_perfis(perfis, busca)
+    if cidade:
+        perfis = perfis.filter(endereco__cidade__iexact=cidade)
+
+    # Cursor inválido (link antigo/adulterado) volta para a primeira página
+    try:
+        pagina = paginar(perfis, ORDENACAO_REDE, request.GET.get('cursor'), settings.REDE_POR_PAGINA)
+    except CursorInvalido:
+        pagina = paginar(perfis, ORDENACAO_REDE, None, settings.REDE_POR_PAGINA)
+
     context = {
-        'perfis': perfis,
-        'total_usuarios': total_usuarios,
+        'perfis': pagina.itens,
+        'proximo_cursor': pagina.proximo_cursor,
+        # Total da comunidade do cache (aproximado); com filtros não há contagem
+        'total_usuarios': obter_total_rede(),
+        'busca_texto': busca,
+        'cidade_filtrada': cidade,
     }
     
     return render(request, 'perfil/page/rede.html', context)
+
+
+@require_http_methods(["GET", "HEAD"])
+def avatar_padrao(request, cor, iniciais, conteudo):
+    """
+    Avatar padrão (SVG com as iniciais) gerado na hora, sem banco nem
+    arquivos; a URL vem de perfil/avatar.py com o hash do conteúdo.
+    """
+    if cor >= len(CORES) or not 0 < len(iniciais) <= 2:
+        raise Http404("Avatar não encontrado")
+
+    resposta = HttpResponse(svg_avatar(iniciais, cor), content_type='image/svg+xml')
+    # SVG aberto direto no navegador: sem scripts nem recursos externos
+    resposta['Content-Security-Policy'] = "default-src 'none'; style-src 'unsafe-inline'"
+    if conteudo == hash_avatar(iniciais, cor):
+        patch_cache_control(resposta, public=True, max_age=AVATAR_MAX_AGE, immutable=True)
+    else:
+        # URL de um desenho anterior (página antiga em cache): entrega o atual sem fixá-lo
+        patch_cache_control(resposta, public=True, max_age=3600)
+    return resposta
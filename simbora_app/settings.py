@@ -1,6 +1,10 @@
 from pathlib import Path
+import hashlib
+import hmac
+import logging
 import os
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 from config import settings
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -8,6 +12,19 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = settings.get('SECRET_KEY')
 FIELD_ENCRYPTION_KEY = settings.get('FIELD_ENCRYPTION_KEY')
+# Chave do HMAC do índice cego do CPF (ver perfil/cpf.py). Deve ser própria:
+# sem ela, é derivada da FIELD_ENCRYPTION_KEY com um rótulo fixo (nunca a
+# mesma chave usada na criptografia), com um aviso fora dos testes
+CPF_HASH_CHAVE = settings.get('CPF_HASH_CHAVE', None)
+if not CPF_HASH_CHAVE:
+    CPF_HASH_CHAVE = hmac.new(
+        str(FIELD_ENCRYPTION_KEY).encode(), b'simbora:cpf_hash:v1', hashlib.sha256
+    ).hexdigest()
+    if settings.current_env != 'testing':
+        logging.getLogger(__name__).warning(
+            'CPF_HASH_CHAVE não definida: usando uma chave derivada da FIELD_ENCRYPTION_KEY. '
+            'Defina SIMBORA_CPF_HASH_CHAVE e rode `make indexar-cpf`.'
+        )
 
 
 DEBUG = settings.get('DEBUG', False)
@@ -42,10 +59,14 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Adicionado para servir static files no Render
+    # Queries e tempos por requisição; logo no início, para medir também os
+    # middlewares seguintes (sessão, usuário e perfil fazem queries)
+    'core.instrumentacao.InstrumentacaoMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'perfil.middleware.PerfilMiddleware',  # request.perfil
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -54,7 +75,8 @@ ROOT_URLCONF = 'simbora_app.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates com medição do tempo de render (ver core/instrumentacao.py)
+        'BACKEND': 'core.instrumentacao.TemplatesInstrumentados',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -88,12 +110,76 @@ DATABASES = {
     )
 }
 
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # SQLite ignora SELECT ... FOR UPDATE: BEGIN IMMEDIATE faz cada transação
+    # pegar o lock de escrita no início, serializando as reservas de vagas
+    # (ver eventos/reservas.py). O timeout espera o lock em vez de falhar.
+    # Mescla com as OPTIONS já configuradas (ex: vindas da DATABASE_URL)
+    DATABASES['default'].setdefault('OPTIONS', {}).update({
+        'transaction_mode': 'IMMEDIATE',
+        'timeout': 20,
+    })
+    # Banco de testes em arquivo (no .gitignore): o SQLite em memória
+    # compartilhada não respeita o timeout acima nos testes de concorrência
+    # com threads
+    DATABASES['default'].setdefault('TEST', {}).setdefault('NAME', str(BASE_DIR / 'test_db.sqlite3'))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# Backend escolhido por ambiente em settings.toml (cache_backend):
+#   locmem  - memória do processo (desenvolvimento e testes)
+#   arquivo - diretório compartilhado pelos workers do mesmo servidor
+#             (add/incr não atômicos entre processos: ver core/cache.py)
+#   redis   - servidor Redis (requer o extra redis, uv sync --extra redis,
+#             e CACHE_LOCATION ou REDIS_URL)
+#   dummy   - sem cache
+# Chaves com namespace e versão por funcionalidade: ver core/cache.py
+BACKENDS_CACHE = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'arquivo': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+cache_backend = settings.get('CACHE_BACKEND', 'locmem')
+cache_location = settings.get('CACHE_LOCATION', None)
+if cache_backend == 'arquivo':
+    cache_location = cache_location or str(BASE_DIR / '.cache')
+elif cache_backend == 'redis':
+    cache_location = cache_location or os.environ.get('REDIS_URL')
+    if not cache_location:
+        raise ImproperlyConfigured('cache_backend "redis" requer SIMBORA_CACHE_LOCATION ou REDIS_URL')
+
+CACHES = {
+    'default': {
+        'BACKEND': BACKENDS_CACHE[cache_backend],
+        'LOCATION': cache_location or 'simbora',
+        # Prefixo e versão globais: incrementar CACHE_VERSAO descarta todo o cache
+        'KEY_PREFIX': settings.get('CACHE_PREFIXO', 'simbora'),
+        'VERSION': settings.get('CACHE_VERSAO', 1),
+        'TIMEOUT': settings.get('CACHE_TIMEOUT', 300),
+    }
+}
+if cache_backend in ('locmem', 'arquivo'):
+    # O padrão do Django (300 chaves) não comporta sessões e fragmentos de card
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': settings.get('CACHE_MAX_ENTRADAS', 5000)}
+
+# Sessão lida do cache, com o banco como cópia durável: requisições
+# autenticadas não consultam django_session enquanto a sessão está no cache
+SESSION_ENGINE = settings.get('SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
 AUTH_USER_MODEL = 'perfil.Usuario'
 
+# ModelBackend que carrega o usuário da sessão junto com o perfil (uma query só)
+AUTHENTICATION_BACKENDS = [
+    'perfil.backends.UsuarioComPerfilBackend',
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -137,6 +223,40 @@ if not DEBUG:
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Paginação por cursor da listagem de eventos (ver core/paginacao.py)
+EVENTOS_POR_PAGINA = settings.get('EVENTOS_POR_PAGINA', 12)
+
+# Perfis por página da Rede (paginação por cursor, ver perfil/views.py)
+REDE_POR_PAGINA = settings.get('REDE_POR_PAGINA', 24)
+# Tempo (segundos) do total de pessoas da Rede no cache (contagem aproximada)
+REDE_TOTAL_CACHE_TIMEOUT = settings.get('REDE_TOTAL_CACHE_TIMEOUT', 300)
+
+# Variantes das fotos enviadas (ver core/imagens.py): geradas num pool de
+# threads depois da requisição (ou na hora, se desligado) e quantas threads
+IMAGENS_EM_SEGUNDO_PLANO = settings.get('IMAGENS_EM_SEGUNDO_PLANO', True)
+IMAGENS_WORKERS = settings.get('IMAGENS_WORKERS', 2)
+
+# Tempo (segundos) das facetas de cidade/categoria no cache (ver eventos/facetas.py)
+FACETAS_CACHE_TIMEOUT = settings.get('FACETAS_CACHE_TIMEOUT', 300)
+
+# Tempo (segundos) dos fragmentos de card de evento no cache (ver eventos/cards.py)
+CARDS_CACHE_TIMEOUT = settings.get('CARDS_CACHE_TIMEOUT', 3600)
+
+# Cache das páginas para anônimos (ver core/cache_paginas.py)
+# Tempo (segundos) em que a página é servida do cache sem regenerar
+PAGINAS_CACHE_TIMEOUT = settings.get('PAGINAS_CACHE_TIMEOUT', 60)
+# Tempo (segundos) máximo em que a versão vencida ainda é entregue durante a regeneração
+PAGINAS_CACHE_VALIDADE_MAXIMA = settings.get('PAGINAS_CACHE_VALIDADE_MAXIMA', 3600)
+
+# Tempo (segundos) dos widgets de comunidade da home no cache (ver core/feed.py)
+HOME_COMUNIDADE_CACHE_TIMEOUT = settings.get('HOME_COMUNIDADE_CACHE_TIMEOUT', 60)
+
+# Instrumentação das requisições (ver core/instrumentacao.py)
+# Fração das requisições registradas no log (0.0 a 1.0)
+INSTRUMENTACAO_AMOSTRAGEM = settings.get('INSTRUMENTACAO_AMOSTRAGEM', 0.05)
+# Requisições a partir deste tempo (ms) são sempre registradas; 0 desliga
+INSTRUMENTACAO_LIMITE_LENTO_MS = settings.get('INSTRUMENTACAO_LIMITE_LENTO_MS', 1000)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 